@@ -0,0 +1,151 @@
+"""
+OCR-Benchmark über einen gelabelten Korpus.
+
+Korpus-Format: ein Verzeichnis mit Bildern und je einer Label-Datei
+'<bild>.txt' (25 Werte, zeilenweise, Mitte 'FREE'), siehe storage/corpus.
+
+    python bench_ocr.py [corpus_dir] [--repeat N] [--json out.json] [--compare old.json] [--debug-dir DIR]
+
+Misst Zell- und Board-Genauigkeit, Durchsatz sowie p50/p95 pro Pipeline-Stufe
+über die Profiling-Hooks in ocr.py; --debug-dir legt zusätzlich die Zwischenbilder
+der schlechtesten Boards ab (wie OCR_DEBUG_DIR im Bot).
+Große Korpora für Durchsatz-Messungen erzeugt synth_cards.py.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import ocr  # noqa: E402 – TEMPL_DIR & Co. kommen ggf. aus .env
+from utils import cell_name  # noqa: E402
+
+# Pipeline-Stufen in Ausgabereihenfolge (Zeiten kommen aus ocr.last_trace(), Summe je Board)
+STAGES = ("_load_store", "_load_image", "_find_board_roi", "_cell_boxes", "_segment_board", "_classify")
+
+
+def _pct(values, q):
+    return round(float(np.percentile(values, q)) * 1000, 3) if values else None
+
+
+def run(corpus_dir, repeat=1, debug_dir=None):
+    corpus = list(ocr.iter_corpus(corpus_dir))
+    if not corpus:
+        raise SystemExit(f"No labeled images in {corpus_dir!r} (expected '<image>.txt' next to each image).")
+
+    stage_times = defaultdict(list)
+    totals = []
+    cells_ok = cells_total = boards_ok = unresolved = 0
+    per_image = []
+
+    was_on = ocr.profiling_enabled()
+    ocr.set_profiling(True, debug_dir)
+    ocr.reset_profile()
+    try:
+        for path, labels in corpus:
+            for i in range(repeat):
+                grid = ocr.read_board(path)["grid"]
+                trace = ocr.last_trace()
+                totals.append(trace["total_s"])
+                for name, secs in trace["stages"].items():
+                    stage_times[name].append(secs)
+
+            # Genauigkeit aus dem letzten Lauf (deterministisch)
+            wrong = [(r, c) for r in range(5) for c in range(5)
+                     if (r, c) != (2, 2) and grid[r][c] != labels[r][c]]
+            n_err = sum(1 for row in grid for v in row if v == "ERR")
+            cells_total += 24
+            cells_ok += 24 - len(wrong)
+            boards_ok += 0 if wrong else 1
+            unresolved += n_err
+            per_image.append({
+                "image": os.path.basename(path),
+                "ok": not wrong,
+                "wrong_cells": [cell_name(r, c) for r, c in wrong],
+                "unresolved": n_err,
+                "min_score": trace["min_score"] and round(trace["min_score"], 4),
+                "rois": trace["rois"],
+                "megapixels": round(trace["image"][0] * trace["image"][1] / 1e6, 2),
+            })
+        histograms = ocr.profile_snapshot()
+    finally:
+        ocr.set_profiling(was_on)
+
+    stages = {
+        name: {"p50_ms": _pct(stage_times[name], 50), "p95_ms": _pct(stage_times[name], 95)}
+        for name in STAGES if stage_times[name]
+    }
+    stages["total"] = {"p50_ms": _pct(totals, 50), "p95_ms": _pct(totals, 95)}
+
+    return {
+        "corpus": corpus_dir,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "env": {
+            "python": platform.python_version(),
+            "opencv": ocr.cv2.__version__,
+            "board_size": ocr.BOARD_SIZE,
+            "locate_max_side": ocr.LOCATE_MAX_SIDE,
+        },
+        "boards": len(corpus),
+        "repeat": repeat,
+        "cell_accuracy": round(cells_ok / cells_total, 4),
+        "board_accuracy": round(boards_ok / len(corpus), 4),
+        "unresolved_cells": unresolved,
+        "throughput_boards_per_s": round(len(totals) / sum(totals), 2),
+        "stages": stages,
+        "per_image": per_image,
+        "histograms": histograms,
+    }
+
+
+def _print_report(res, old=None):
+    def delta(new, prev):
+        if prev is None or new is None:
+            return ""
+        return f"  ({new - prev:+.3f})"
+
+    print(f"Corpus: {res['corpus']} – {res['boards']} boards x {res['repeat']}")
+    print(f"Cell accuracy:  {res['cell_accuracy']:.4f}" + delta(res['cell_accuracy'], old and old.get('cell_accuracy')))
+    print(f"Board accuracy: {res['board_accuracy']:.4f}" + delta(res['board_accuracy'], old and old.get('board_accuracy')))
+    print(f"Unresolved cells: {res['unresolved_cells']}")
+    print(f"Throughput: {res['throughput_boards_per_s']:.1f} boards/s (single thread)")
+    print(f"{'stage':<18}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, st in res["stages"].items():
+        prev = (old or {}).get("stages", {}).get(name, {})
+        print(f"{name:<18}{st['p50_ms']:>10.3f}{st['p95_ms']:>10.3f}" + delta(st['p50_ms'], prev.get('p50_ms')))
+    for img in res["per_image"]:
+        if not img["ok"]:
+            print(f"  ✗ {img['image']}: {', '.join(img['wrong_cells'])}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark image_to_grid on a labeled corpus.")
+    ap.add_argument("corpus", nargs="?", default=os.getenv("OCR_CORPUS_DIR", "storage/corpus"))
+    ap.add_argument("--repeat", type=int, default=3, help="runs per image (timings)")
+    ap.add_argument("--json", help="write results as JSON to this file")
+    ap.add_argument("--compare", help="previous JSON result to diff against")
+    ap.add_argument("--debug-dir", help="dump intermediate images of the worst boards here")
+    args = ap.parse_args(argv)
+
+    res = run(args.corpus, args.repeat, args.debug_dir)
+    old = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+    _print_report(res, old)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+    return 0 if res["boards"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,8 @@
 
 # --- AUTO-BOOTSTRAP (optional, for local use) ---
-import os, sys
+import os, sys, time
+
+_T_START = time.perf_counter()  # Basis für den Startup-Report
 
 USE_AUTO_BOOTSTRAP = os.getenv("USE_AUTO_BOOTSTRAP", "1") == "1"
 
@@ -24,25 +26,41 @@ if USE_AUTO_BOOTSTRAP:
         os.execv(VENV_PY, [VENV_PY] + sys.argv)
 # --- /AUTO-BOOTSTRAP ---
 
-import logging
-import random
-from collections import defaultdict
-
+# .env vor allen Projekt-Imports laden: db, metrics, outbox, uploads lesen ihre
+# Einstellungen beim Import
+from dotenv import load_dotenv
+load_dotenv()
 
+import asyncio
+import csv
+import functools
+import hashlib
+import io
+import json
 import logging
 import random
+import re
+import secrets
+import threading
+import weakref
+import zipfile
 from collections import defaultdict
+from urllib.parse import urlsplit
 
-from dotenv import load_dotenv
-from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
-from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, ContextTypes, filters
+from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton, ForceReply
+from telegram.error import BadRequest
+from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, TypeHandler, ContextTypes, filters
 
 import db
-from utils import mark_hits, check_bingo, has_bingo_corners
-from ocr import image_to_grid, train_templates_from_board, templates_available
+import metrics
+import outbox
+import uploads
+from router import CallbackRouter
+from utils import completion_index, cell_name, COLUMN_RANGES, TTLCache
+
+# ocr (cv2/numpy) wird erst bei der ersten Nutzung importiert, siehe _ocr()
 
 # ---------- ENV + Logging ----------
-load_dotenv()
 TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 IMAGES_DIR = os.getenv("IMAGES_DIR", "storage/images")
 WELCOME_IMAGE = os.getenv("WELCOME_IMAGE", "storage/images/welcome.jpg")
@@ -51,9 +69,10 @@ CARD_HELP_IMAGE = os.getenv("CARD_HELP_IMAGE", "storage/images/card_number_examp
 
 os.makedirs(IMAGES_DIR, exist_ok=True)
 
-# Einschränkung auf bestimmte Gruppe + Topic (optional)
+# Einschränkung auf bestimmte Gruppe + Topics (optional)
 BINGO_CHAT_ID = os.getenv("BINGO_CHAT_ID")
-BINGO_TOPIC_ID = os.getenv("BINGO_TOPIC_ID")
+BINGO_TOPIC_ID = os.getenv("BINGO_TOPIC_ID")  # alt: genau ein Topic
+BINGO_TOPIC_IDS = os.getenv("BINGO_TOPIC_IDS", "")  # kommagetrennt, leer = alle Topics
 
 # Admin-User-IDs (dürfen kritische Kommandos wie /resetall benutzen)
 ADMIN_IDS = set()
@@ -85,15 +104,58 @@ if BINGO_TOPIC_ID is not None:
         logger.warning("Invalid BINGO_TOPIC_ID in .env, ignoring.")
         BINGO_TOPIC_ID = None
 
+_topic_ids = set()
+for part in BINGO_TOPIC_IDS.split(","):
+    part = part.strip()
+    if not part:
+        continue
+    try:
+        _topic_ids.add(int(part))
+    except ValueError:
+        logger.warning(f"Invalid topic id in BINGO_TOPIC_IDS: {part!r}, ignoring.")
+if BINGO_TOPIC_ID is not None:
+    _topic_ids.add(BINGO_TOPIC_ID)
+BINGO_TOPIC_IDS = _topic_ids
+
 logger.info(f"Using WELCOME_IMAGE={WELCOME_IMAGE}, exists={os.path.exists(WELCOME_IMAGE)}")
 logger.info(f"Using BINGO_IMAGE={BINGO_IMAGE}, exists={os.path.exists(BINGO_IMAGE)}")
 logger.info(f"Using CARD_HELP_IMAGE={CARD_HELP_IMAGE}, exists={os.path.exists(CARD_HELP_IMAGE)}")
 logger.info(f"Images directory: {IMAGES_DIR} (exists={os.path.exists(IMAGES_DIR)})")
-logger.info(f"BINGO_CHAT_ID={BINGO_CHAT_ID}, BINGO_TOPIC_ID={BINGO_TOPIC_ID}")
+logger.info(f"Upload audit: {'on -> ' + uploads.UPLOAD_DIR if uploads.UPLOAD_AUDIT else 'off'}")
+logger.info(f"BINGO_CHAT_ID={BINGO_CHAT_ID}, BINGO_TOPIC_IDS={sorted(BINGO_TOPIC_IDS) or 'all'}")
 logger.info(f"ADMIN_IDS={ADMIN_IDS}")
 
+# Updates verschiedener Chats parallel verarbeiten (Mutationen einer Session laufen trotzdem nacheinander)
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "64"))
+
+# Betriebsart: "polling" (Default) oder "webhook" (lokaler HTTP-Server, z.B. hinter einem Reverse-Proxy)
+BOT_MODE = os.getenv("BOT_MODE", "polling").strip().lower()
+POLL_INTERVAL = float(os.getenv("POLL_INTERVAL", "0"))  # Pause zwischen getUpdates (Long-Polling wartet ohnehin)
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "127.0.0.1")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram")
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")  # öffentliche https-URL inkl. Pfad; ohne nur mit lokalem TELEGRAM_BASE_URL
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")  # X-Telegram-Bot-Api-Secret-Token, leer = pro Start zufällig
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+# Eigener Bot-API-Server (lokaler telegram-bot-api, Test-Server), z.B. http://127.0.0.1:8081
+TELEGRAM_BASE_URL = os.getenv("TELEGRAM_BASE_URL", "").rstrip("/")
+# Eingehende Updates als JSON-Zeilen mitschreiben (für replay_updates.py), leer = aus
+UPDATE_LOG = os.getenv("UPDATE_LOG")
+
+# Auto-Draw: Intervall in Sekunden (Gruppen vertragen ~20 Nachrichten/min -> nicht unter 3 s)
+AUTO_DRAW_INTERVAL = float(os.getenv("AUTO_DRAW_INTERVAL", "20"))
+AUTO_DRAW_MIN_INTERVAL = float(os.getenv("AUTO_DRAW_MIN_INTERVAL", "3"))
+AUTO_DRAW_MAX_INTERVAL = float(os.getenv("AUTO_DRAW_MAX_INTERVAL", "600"))
+AUTO_DRAW_TICK_TIMEOUT = float(os.getenv("AUTO_DRAW_TICK_TIMEOUT", "30"))  # max. Warten auf den Session-Lock pro Ziehung
+AUTO_DRAW_PAUSE_ON_BINGO = os.getenv("AUTO_DRAW_PAUSE_ON_BINGO", "1") == "1"
+
+# OCR-Modul nach dem Start im Hintergrund vorwärmen (0 = erst beim ersten Upload laden)
+OCR_PRELOAD = os.getenv("OCR_PRELOAD", "1") == "1"
+
+_T_IMPORTED = time.perf_counter()
+
 # ---------- In-Memory Auto-Join ----------
-# AUTO_JOIN[chat_id] -> set(user_id)
+# AUTO_JOIN[chat_id] -> set(user_id); Spiegel der Tabelle auto_join (geladen in build_application)
 AUTO_JOIN = defaultdict(set)
 
 # Pending boards per user_id:
@@ -104,33 +166,177 @@ PENDING_BOARD_DATA = {}  # user_id -> {"grid": ..., "card_number": ...}
 
 MAX_BOARDS_PER_USER = 20
 
+# Mehr unklare Zellen -> OCR gilt als gescheitert, Board neu senden
+MAX_UNRESOLVED_CELLS = 5
+
+# Alle ausgehenden Requests laufen durch die Token-Buckets (outbox.py, als Rate-Limiter der Application)
+OUTBOX = outbox.Outbox()
+
+# Anzeigenamen: jedes Update schreibt Username/Vorname in die users-Tabelle,
+# gelesen wird über diesen Cache -> Ansagen/Leaderboard ohne get_member
+NAME_CACHE_TTL = int(os.getenv("NAME_CACHE_TTL", "21600"))  # Sekunden
+NAME_CACHE_SIZE = int(os.getenv("NAME_CACHE_SIZE", "5000"))
+_NAMES = TTLCache(NAME_CACHE_SIZE, NAME_CACHE_TTL)  # user_id -> (username, first_name, last_name)
+
+# Hashes der statischen Bilder (Welcome/Bingo/Card-Help), file_ids liegen in media_cache
+_MEDIA_HASHES = {}  # path -> ((mtime_ns, size), sha256)
+
+# ---------- Session-Locks ----------
+# Updates laufen parallel (concurrent_updates). Alles, was eine Session verändert
+# (call, undo, join, end, host, Auto-Draw-Tick), läuft pro (Chat, Topic) nacheinander;
+# andere Chats und private Uploads warten nicht darauf. Auto-Draw-Steuerung (/autodraw,
+# h_auto_*) läuft ebenfalls unter dem Lock, damit Pause/Stop nicht mitten in einen Tick fallen.
+# Weak-Dict: ein Lock lebt, solange ein Handler ihn hält oder auf ihn wartet – danach
+# verschwindet er von selbst, ohne dass ein Wartender je einen zweiten Lock bekommt.
+_SESSION_LOCKS = weakref.WeakValueDictionary()  # (chat_id, thread_id) -> asyncio.Lock
+
+def _thread_id(msg) -> int:
+    """Forum-Topic einer Nachricht, 0 = kein Topic (normale Gruppe, General, privat)."""
+    if msg is not None and getattr(msg, "is_topic_message", False):
+        return msg.message_thread_id or 0
+    return 0
+
+def _session_key(update) -> tuple:
+    return (update.effective_chat.id, _thread_id(update.effective_message))
+
+class _MessageUpdate:
+    """Minimal-Update um eine bestehende Nachricht – für Buttons, Auto-Draw-Ticks und _session_key."""
+    def __init__(self, message, user=None):
+        self.effective_chat = message.chat
+        self.effective_message = self.message = message
+        self.effective_user = user
+
+def session_lock(update) -> asyncio.Lock:
+    key = _session_key(update)
+    lock = _SESSION_LOCKS.get(key)
+    if lock is None:
+        lock = _SESSION_LOCKS[key] = asyncio.Lock()
+    return lock
+
+def serialized(handler):
+    """Handler läuft exklusiv pro (Chat, Topic). Nicht verschachteln – asyncio.Lock ist nicht reentrant."""
+    @functools.wraps(handler)
+    async def wrapper(update, ctx, *args, **kwargs):
+        async with session_lock(update):
+            return await handler(update, ctx, *args, **kwargs)
+    return wrapper
+
+# ---------- Sessions pro (Chat, Topic) ----------
+# Jede Gruppe kann pro Forum-Topic eine eigene Session haben. Laufende Sessions und
+# ihre Metadaten (Host, Pattern – ändern sich nie) werden im Speicher gehalten, damit
+# /call & Co. nicht bei jedem Update dieselben Lookups machen.
+_LIVE_SESSIONS = {}  # (chat_id, thread_id) -> session_id
+_SESSION_META = {}   # session_id -> {"chat_id", "thread_id", "host", "pattern"}
+
+def _live_session(update):
+    key = _session_key(update)
+    sid = _LIVE_SESSIONS.get(key)
+    if sid is None:
+        sid = db.get_live_session(*key)
+        if sid:
+            _LIVE_SESSIONS[key] = sid
+    return sid
+
+def _session_meta(sid: int):
+    meta = _SESSION_META.get(sid)
+    if meta is None:
+        row = db.get_session_meta(sid)
+        if row is None:
+            return None
+        chat_id, thread_id, host_id, pattern = row
+        meta = _SESSION_META[sid] = {"chat_id": chat_id, "thread_id": thread_id, "host": host_id, "pattern": pattern}
+    return meta
+
+def _session_host(sid: int):
+    meta = _session_meta(sid)
+    return meta["host"] if meta else None
+
+def _forget_session(sid: int):
+    meta = _SESSION_META.pop(sid, None)
+    if meta and _LIVE_SESSIONS.get((meta["chat_id"], meta["thread_id"])) == sid:
+        del _LIVE_SESSIONS[(meta["chat_id"], meta["thread_id"])]
+
 # ---------- Helper ----------
 
+def _ocr():
+    """Importiert das OCR-Modul (cv2/numpy) erst bei der ersten Nutzung."""
+    import ocr
+    if metrics.ENABLED and not ocr.profiling_enabled():
+        ocr.set_profiling(True)  # Stufen-Histogramme für /metrics
+    return ocr
+
+def _media_hash(path: str) -> str:
+    """sha256 einer Bilddatei – neu gelesen nur, wenn sich mtime oder Größe geändert haben."""
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _MEDIA_HASHES.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    with open(path, "rb") as f:
+        digest = uploads.content_hash(f.read())
+    _MEDIA_HASHES[path] = (key, digest)
+    return digest
+
+async def _send_cached_photo(send, path: str, **kwargs):
+    """
+    Schickt ein Bild von der Platte über `send` (ctx.bot.send_photo, msg.reply_photo, ...).
+    Hochgeladen wird nur beim ersten Mal bzw. nach einer Änderung des Inhalts,
+    danach geht nur noch die gespeicherte file_id raus.
+    """
+    digest = _media_hash(path)
+    file_id = db.get_media_file_id(digest)
+    if file_id:
+        try:
+            return await send(photo=file_id, **kwargs)
+        except BadRequest as e:
+            if "file" not in str(e).lower():
+                raise
+            # file_id gehört z.B. zu einem anderen Bot-Token -> neu hochladen
+            logger.info(f"Cached file_id for '{path}' rejected ({e}), uploading again")
+            db.delete_media_file_id(digest)
+    with open(path, "rb") as f:
+        message = await send(photo=f, **kwargs)
+    if message and message.photo:
+        db.set_media_file_id(digest, message.photo[-1].file_id, path)
+    return message
+
+def _read_upload_sync(data: bytes, ext: str):
+    """Worker-Thread: Upload ggf. für Audits ablegen, dann OCR direkt aus dem Speicher."""
+    uploads.store(data, ext)
+    return _ocr().read_board(data)
+
+def _read_uploads_sync(items):
+    """Batch-Variante für den Bulk-Import, items = [(name, bytes, ...)]."""
+    for name, data, *_ in items:
+        uploads.store(data, os.path.splitext(name)[1] or ".jpg")
+    return _ocr().read_boards([data for _, data, *_ in items])
+
 def in_allowed_topic(update: Update) -> bool:
     """
     Filtert nach:
     - BINGO_CHAT_ID (Gruppe)
-    - BINGO_TOPIC_ID (Topic innerhalb dieser Gruppe, optional)
+    - BINGO_TOPIC_IDS (Topics innerhalb dieser Gruppe, optional)
     Private Chats bleiben immer erlaubt.
     """
     msg = update.effective_message or getattr(update, "message", None)
     if not msg:
         return True
+    return _chat_allowed(msg)
 
+def _chat_allowed(msg) -> bool:
     chat = msg.chat
+    if chat.type not in ("group", "supergroup"):
+        return True  # private
 
     # Nur diese Gruppe (falls gesetzt)
-    if BINGO_CHAT_ID is not None and chat.type in ("group", "supergroup"):
-        if chat.id != BINGO_CHAT_ID:
-            return False
+    if BINGO_CHAT_ID is not None and chat.id != BINGO_CHAT_ID:
+        return False
 
-    # Nur dieses Topic in der Gruppe (falls gesetzt)
-    if BINGO_TOPIC_ID is not None and chat.type in ("group", "supergroup"):
-        thread_id = getattr(msg, "message_thread_id", None)
-        if thread_id != BINGO_TOPIC_ID:
-            return False
+    # Nur diese Topics in der Gruppe (falls gesetzt)
+    if BINGO_TOPIC_IDS and _thread_id(msg) not in BINGO_TOPIC_IDS:
+        return False
 
-    return True  # private und erlaubte Gruppe/Topic
+    return True
 
 def back_button():
     """Creates a universal 'Back to Start' button."""
@@ -148,28 +354,76 @@ def host_quick_keyboard():
     return InlineKeyboardMarkup([
         [
             InlineKeyboardButton("🔢 Enter Number (/call)", callback_data="h_call"),
-            InlineKeyboardButton("↩️ Undo Last", callback_data="h_undo"),
+            InlineKeyboardButton("🔢🔢 Several Numbers", callback_data="h_call_batch"),
         ],
         [
+            InlineKeyboardButton("↩️ Undo Last", callback_data="h_undo"),
             InlineKeyboardButton("📋 Status", callback_data="h_status"),
             InlineKeyboardButton("🏠 Back to Start", callback_data="go_home"),
         ],
     ])
 
-async def _display_name(update: Update, uid: int) -> str:
+def _format_name(username, first_name, last_name):
+    if username:
+        return f"@{username}"
+    return " ".join(p for p in (first_name or "", last_name or "") if p).strip() or None
+
+def _remember_user(user):
+    """
+    Namen eines Telegram-Users in Cache und users-Tabelle übernehmen. Geschrieben
+    wird nur bei Änderung bzw. wenn der Cache-Eintrag abgelaufen ist.
+    """
+    if user is None or user.is_bot:
+        return None
+    names = (user.username, user.first_name, user.last_name)
+    if _NAMES.get(user.id) != names:
+        _NAMES.set(user.id, names)
+        try:
+            db.upsert_user_names([(user.id, *names)])
+        except Exception as e:
+            logger.warning(f"Could not store name of {user.id}: {e}")
+    return _format_name(*names)
+
+def _cached_names(uids) -> dict:
+    """{user_id: Anzeigename} aus Cache bzw. DB (ein SELECT für alle Misses), ohne Bot-API."""
+    out, missing = {}, []
+    for uid in uids:
+        names = _NAMES.get(uid)
+        if names is None:
+            missing.append(uid)
+        else:
+            out[uid] = _format_name(*names)
+    if missing:
+        for uid, names in db.get_user_names(missing).items():
+            _NAMES.set(uid, names)
+            out[uid] = _format_name(*names)
+    return {uid: name for uid, name in out.items() if name}
+
+async def _member_name(chat, uid: int) -> str:
+    """Fallback für User, die der Bot noch nie gesehen hat: get_member im Chat."""
     try:
-        member = await update.effective_chat.get_member(uid)
+        member = await chat.get_member(uid)
         if member and member.user:
-            if member.user.username:
-                return f"@{member.user.username}"
-            name_parts = [member.user.first_name or "", member.user.last_name or ""]
-            name = " ".join(p for p in name_parts if p).strip()
+            name = _remember_user(member.user)
             if name:
                 return name
     except Exception as e:
         logger.debug(f"Could not resolve display name for {uid}: {e}")
     return f"id:{uid}"
 
+async def _display_names(chat, uids) -> dict:
+    """uid -> Anzeigename; get_member nur für User, die weder Cache noch DB kennen."""
+    names = _cached_names(uids)
+    missing = [uid for uid in dict.fromkeys(uids) if uid not in names]
+    if missing:
+        resolved = await asyncio.gather(*(_member_name(chat, uid) for uid in missing))
+        names.update(zip(missing, resolved))
+    return names
+
+async def _capture_user(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
+    """Läuft (Gruppe -1) vor allen Handlern: aktuellen Namen des Absenders merken."""
+    _remember_user(update.effective_user)
+
 def player_keyboard():
     return InlineKeyboardMarkup([
         [InlineKeyboardButton("🧩 Add Board", callback_data="p_addboard"),
@@ -186,8 +440,10 @@ def host_keyboard():
         [InlineKeyboardButton("🚀 Start Session", callback_data="h_host"),
          InlineKeyboardButton("🧪 Train Templates", callback_data="h_train")],
         [InlineKeyboardButton("🔢 Enter Number (/call)", callback_data="h_call"),
-         InlineKeyboardButton("↩️ Undo Last", callback_data="h_undo")],
-        [InlineKeyboardButton("📋 Status", callback_data="h_status")],
+         InlineKeyboardButton("🔢🔢 Several Numbers", callback_data="h_call_batch")],
+        [InlineKeyboardButton("↩️ Undo Last", callback_data="h_undo"),
+         InlineKeyboardButton("📋 Status", callback_data="h_status")],
+        [InlineKeyboardButton("🤖 Auto Draw", callback_data="h_auto_start")],
         [InlineKeyboardButton("🛑 End Session", callback_data="h_end")],
         [InlineKeyboardButton("📜 Game Rules", callback_data="show_rules")]
     ])
@@ -272,14 +528,13 @@ async def start(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     # Welcome-Bild + Text direkt in den Chat/Topic schicken
     if WELCOME_IMAGE and os.path.exists(WELCOME_IMAGE):
         try:
-            with open(WELCOME_IMAGE, "rb") as f:
-                await ctx.bot.send_photo(
-                    chat_id=chat.id,
-                    photo=f,
-                    caption=WELCOME_TEXT,
-                    parse_mode="Markdown",
-                    message_thread_id=thread_id,  # wichtig für Topic
-                )
+            await _send_cached_photo(
+                ctx.bot.send_photo, WELCOME_IMAGE,
+                chat_id=chat.id,
+                caption=WELCOME_TEXT,
+                parse_mode="Markdown",
+                message_thread_id=thread_id,  # wichtig für Topic
+            )
         except Exception as e:
             logger.warning(f"Couldn't send image '{WELCOME_IMAGE}': {e}")
             await ctx.bot.send_message(
@@ -316,7 +571,7 @@ async def templ_status(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     if not in_allowed_topic(update):
         return
 
-    ok = templates_available()
+    ok = await asyncio.to_thread(lambda: _ocr().templates_available())
     msg = "Templates: ✅ ready" if ok else "Templates: ❌ not trained yet (/train)"
     await update.message.reply_text(msg, reply_markup=back_button())
 
@@ -346,7 +601,9 @@ async def addboard(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(
         "🧩 Add a board (private only):\n"
         "• Send the ORIGINAL IMAGE as a FILE (Document) for best accuracy.\n"
-        "• Or send 25 values (numbers/'FREE') row by row.\n\n"
+        "• Or send 25 values (numbers/'FREE') row by row.\n"
+        "• Several boards at once: send them as an album or one ZIP file – name the files "
+        "by Card Number (e.g. 852.jpg) or put the numbers in the album caption.\n\n"
         "After upload I'll ask you for the **Card Number** printed on the card – not the rank.\n"
         "Then you must provide the **wallet address** where you hold this bingo card.\n\n"
         "🔢 You can store up to **20 boards** per player.\n"
@@ -464,6 +721,7 @@ async def deleteboard(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
 
 # ---------- Host & Join ----------
 
+@serialized
 async def host(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     """Startet eine neue Session und zeigt direkt das Host-Panel mit Buttons."""
     if not in_allowed_topic(update):
@@ -488,23 +746,25 @@ async def host(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
         )
 
     chat_id = chat.id
-    sid = db.create_session(chat_id, uid)
+    key = _session_key(update)
+    old_sid = _LIVE_SESSIONS.get(key)
+    sid = db.create_session(chat_id, uid, thread_id=key[1])
+    if old_sid is not None:
+        _forget_session(old_sid)  # ersetzte Session: Metadaten nicht ewig im Cache halten
+    _LIVE_SESSIONS[key] = sid
     uname = user.username or uid
 
     # Auto-Join: alle Nutzer, die in diesem Chat Auto-Join aktiviert haben, automatisch hinzufügen
-    auto_users = AUTO_JOIN.get(chat_id, set())
-    for auto_uid in auto_users:
-        db.add_player(sid, auto_uid)
-        user_board_ids = db.get_user_board_ids(auto_uid)
-        for bid in user_board_ids:
-            db.add_session_board(sid, bid)
-        db.bump_participation(sid, auto_uid, len(user_board_ids))
+    if AUTO_JOIN.get(chat_id):
+        players, boards = db.auto_join_session(sid, chat_id)
+        logger.info(f"Session {sid}: auto-joined {players} players with {boards} boards")
 
     text = (
         f"🚀 Session #{sid} started by @{uname}.\n\n"
         "Players: /join or use the Player Panel to connect their boards.\n\n"
         "📋 **Host Controls:**\n"
         "• 🔢 Enter Number – use `/call <number>` (e.g. `/call 42`)\n"
+        "• 🤖 Auto Draw – let the bot draw, `/autodraw [seconds]`\n"
         "• ↩️ Undo Last – remove the last number\n"
         "• 📋 Status – see pattern, players, boards, last numbers\n"
         "• 🛑 End Session – finish this round\n\n"
@@ -518,6 +778,7 @@ async def host(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     )
 
 
+@serialized
 async def join(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     if not in_allowed_topic(update):
         return
@@ -529,7 +790,7 @@ async def join(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
 
     chat_id = update.effective_chat.id
     user_id = update.effective_user.id
-    sid = db.get_live_session(chat_id)
+    sid = _live_session(update)
     if not sid:
         return await update.message.reply_text("No active session.", reply_markup=back_button())
 
@@ -563,153 +824,232 @@ async def call_number(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
         return
 
     chat_id, uid = update.effective_chat.id, update.effective_user.id
-    sid = db.get_live_session(chat_id)
+    sid = _live_session(update)
     if not sid:
         return await update.message.reply_text("No active session.", reply_markup=back_button())
-    if db.get_session_host(sid) != uid:
+    if _session_host(sid) != uid:
         return await update.message.reply_text("Only host can call numbers.", reply_markup=back_button())
     if not ctx.args:
-        return await update.message.reply_text("Usage: /call 42", reply_markup=back_button())
-
-    try:
-        n = int(ctx.args[0])
-    except ValueError:
-        return await update.message.reply_text("Please enter a number (1–75).", reply_markup=back_button())
-
-    return await _process_called_number(update, ctx, sid, n)
-
-async def _process_called_number(update: Update, ctx: ContextTypes.DEFAULT_TYPE, sid: int, n: int):
-    if n < 1 or n > 75:
-        return await update.message.reply_text(
-            "Number must be between 1 and 75.",
-            reply_markup=host_quick_keyboard()
-        )
-
-    if db.draw_exists(sid, n):
         return await update.message.reply_text(
-            f"{n} already entered.",
-            reply_markup=host_quick_keyboard()
+            "Usage: /call 42 (or several at once: /call 5 12 33)", reply_markup=back_button()
         )
 
-    db.insert_draw(sid, n, db.next_draw_index(sid))
-    drawn = set(db.get_drawn_numbers(sid))
-
-    pattern = db.get_pattern(sid)
+    numbers = _parse_call_numbers(" ".join(ctx.args))
+    if numbers is None:
+        return await update.message.reply_text("Please enter a number (1–75).", reply_markup=back_button())
 
-    winner_entries = []  # [{owner, bid}]
-    winner_ids = set()
+    return await _process_called_numbers(update, ctx, sid, numbers)
 
-    for bid in db.get_session_board_ids(sid):
-        grid = db.load_board(bid)
-        hit = mark_hits(grid, drawn)
+def _parse_call_numbers(text: str):
+    """'5 12, 33' -> [5, 12, 33]; None, wenn etwas anderes als Zahlen drinsteht."""
+    parts = [p for p in re.split(r"[\s,;]+", text.strip()) if p]
+    if not parts or not all(p.isdigit() for p in parts):
+        return None
+    return [int(p) for p in parts]
 
+@serialized
+async def _process_called_numbers(update: Update, ctx: ContextTypes.DEFAULT_TYPE, sid: int, numbers):
+    """
+    Eine oder mehrere gezogene Zahlen eintragen (eine Transaktion), alle Boards
+    einmal gegen die neue Ziehung prüfen und eine gemeinsame Ansage schicken.
+    Jeder Gewinner wird der Zahl zugeordnet, die sein Board komplettiert hat.
+    """
+    # erneut prüfen: während auf den Session-Lock gewartet wurde, kann /end gelaufen sein
+    if _live_session(update) != sid:
+        await update.message.reply_text("No active session.", reply_markup=back_button())
+        return []
+
+    numbers = list(dict.fromkeys(numbers))
+    out_of_range = [n for n in numbers if not 1 <= n <= 75]
+    new = db.insert_draws(sid, [n for n in numbers if 1 <= n <= 75])  # [(idx, number)]
+    new_numbers = [n for _, n in new]
+    already = [n for n in numbers if 1 <= n <= 75 and n not in new_numbers]
+
+    if not new:
+        if len(numbers) == 1:
+            text = "Number must be between 1 and 75." if out_of_range else f"{numbers[0]} already entered."
+        else:
+            text = _skipped_text(out_of_range, already) or "Nothing to enter."
+        await update.message.reply_text(text, reply_markup=host_quick_keyboard())
+        return []
+
+    pattern = _session_meta(sid)["pattern"]
+    order = db.get_draw_order(sid)
+    number_at = dict(new)
+    first_idx = new[0][0]
+    claimed = db.get_claimed_board_ids(sid)
+
+    winner_entries = []  # [{owner, bid, number}], in Ziehungsreihenfolge
+    for bid, (owner, grid) in db.load_session_boards(sid).items():
+        if bid in claimed:
+            continue
         # Hauptmuster ODER immer aktive Four Corners
-        has_win = check_bingo(hit, pattern) or has_bingo_corners(hit)
-
-        if has_win and not db.claim_exists(sid, bid):
-            owner = db.get_board_owner(bid)
-            if owner is None:
-                continue
-            db.insert_claim(sid, bid, owner, pattern)
-            db.bump_bingo(owner)
-            winner_entries.append({"owner": owner, "bid": bid})
-            winner_ids.add(owner)
-
-            # 🎯 Private Nachricht an Gewinner – lustiger Gratulationstext
-            try:
-                line = random.choice(FUNNY_BINGO_LINES)
-                user_chat = await ctx.bot.get_chat(owner)
-                await user_chat.send_message(
-                    f"🎯 *BINGO!* 🎉\n{line}\n\n"
-                    "Your board just hit a winning pattern.\n"
-                    "Go flex that card number in chat. 😎",
-                    parse_mode="Markdown"
-                )
-            except Exception as e:
-                logger.warning(f"Cannot DM winner {owner}: {e}")
+        done_at = completion_index(grid, order, pattern)
+        if done_at is None:
+            continue
+        # schon vorher komplett (z.B. nach /undo) -> zählt zur ersten neuen Zahl
+        done_at = max(done_at, first_idx)
+        winner_entries.append({"owner": owner, "bid": bid, "number": number_at[done_at], "_idx": done_at})
+    winner_entries.sort(key=lambda e: e.pop("_idx"))
+    if winner_entries:
+        db.insert_claims(sid, [(e["bid"], e["owner"]) for e in winner_entries], pattern)
 
-    chat = update.effective_chat
     msg_obj = update.effective_message or update.message  # Nachricht im Topic/Thread
-    msg = f"📣 Entered: *{n}*\n"
+    msg = f"📣 Entered: *{', '.join(map(str, new_numbers))}*\n"
+    skipped = _skipped_text(out_of_range, already)
+    if skipped:
+        msg += f"{skipped}\n"
 
     if winner_entries:
         line = random.choice(FUNNY_BINGO_LINES)
-        ats = [await _display_name(update, w) for w in winner_ids]
+        # Namen aus Cache/DB, sonst Mention-Link – ohne auf Telegram zu warten
+        names = _cached_names({e["owner"] for e in winner_entries})
+        credits = list(dict.fromkeys((e["owner"], e["number"]) for e in winner_entries))
+        ats = []
+        for owner, number in credits:
+            name = names.get(owner) or f"[player](tg://user?id={owner})"
+            ats.append(name if len(new) == 1 else f"{name} – on *{number}*")
         msg += f"\n🏆 *BINGO!* 🎉\n{line}\n" + "\n".join([f"👉 {a}" for a in ats])
+    else:
+        msg += "No bingo yet."
+
+    # Gruppen-Ansage zuerst – Dauer hängt nicht von der Zahl der Gewinner ab.
+    # Draws und Claims sind schon gespeichert, die Ansage darf also nicht einfach ausfallen.
+    try:
+        await msg_obj.reply_markdown(msg, reply_markup=host_quick_keyboard())
+    except Exception as e:
+        logger.warning(f"Announcement for session {sid} failed ({e}), sending catch-up")
+        await _catch_up_announcement(ctx, msg_obj, msg)
+
+    # Bild, DMs und Host-Übersicht laufen danach parallel im Hintergrund
+    if winner_entries:
+        ctx.application.create_task(_notify_winners(update, ctx, sid, winner_entries), update=update)
+    return winner_entries
+
+async def _catch_up_announcement(ctx: ContextTypes.DEFAULT_TYPE, msg_obj, text: str):
+    """Ansage nachholen: ohne Markdown (Namen mit _ oder *) und ohne Antwort-Bezug (Anker gelöscht)."""
+    try:
+        await ctx.bot.send_message(
+            chat_id=msg_obj.chat_id,
+            text="📣 Catch-up (announcement failed):\n" + text.replace("*", ""),
+            message_thread_id=msg_obj.message_thread_id if msg_obj.is_topic_message else None,
+            reply_markup=host_quick_keyboard(),
+        )
+    except Exception as e:
+        logger.exception(f"Catch-up announcement in chat {msg_obj.chat_id} failed too: {e}")
+
+def _skipped_text(out_of_range, already) -> str:
+    parts = []
+    if out_of_range:
+        parts.append(f"not 1–75: {', '.join(map(str, out_of_range))}")
+    if already:
+        parts.append(f"already entered: {', '.join(map(str, already))}")
+    return f"Skipped ({'; '.join(parts)})" if parts else ""
+
+async def _send_bingo_image(ctx: ContextTypes.DEFAULT_TYPE, msg_obj):
+    """📸 Bingo-Bild im gleichen Topic/Thread senden (noch wartende Bilder desselben Topics werden zusammengefasst)."""
+    if not BINGO_IMAGE:
+        return logger.warning("BINGO_IMAGE is not set (empty).")
+    if not os.path.exists(BINGO_IMAGE):
+        return logger.warning(f"BINGO_IMAGE path does not exist: '{BINGO_IMAGE}'")
+    try:
+        logger.info(f"Sending BINGO_IMAGE from '{BINGO_IMAGE}'")
+        await _send_cached_photo(
+            ctx.bot.send_photo, BINGO_IMAGE,
+            chat_id=msg_obj.chat_id,
+            caption="🎉 **BINGO!** We have a winner on the board!",
+            parse_mode="Markdown",
+            reply_to_message_id=msg_obj.message_id,
+            message_thread_id=msg_obj.message_thread_id if msg_obj.is_topic_message else None,
+            # pro (Chat, Topic) wie der Session-Lock – sonst ersetzt Topic B das Bild von Topic A
+            rate_limit_args={"lane": "low", "coalesce": f"bingo-image:{msg_obj.chat_id}:{_thread_id(msg_obj)}"},
+        )
+    except Exception as e:
+        logger.exception(f"Couldn't send BINGO_IMAGE '{BINGO_IMAGE}': {e}")
+        # Fallback, damit im Chat sichtbar ist, dass das Bild failed
+        await msg_obj.reply_text(
+            "🎉 BINGO! (image failed to send, check logs / file path)"
+        )
+
+async def _dm_winner(ctx: ContextTypes.DEFAULT_TYPE, owner: int):
+    """🎯 Private Nachricht an Gewinner – lustiger Gratulationstext."""
+    try:
+        line = random.choice(FUNNY_BINGO_LINES)
+        await ctx.bot.send_message(
+            chat_id=owner,
+            text=f"🎯 *BINGO!* 🎉\n{line}\n\n"
+                 "Your board just hit a winning pattern.\n"
+                 "Go flex that card number in chat. 😎",
+            parse_mode="Markdown",
+            # mehrere Gewinner-Boards desselben Users -> eine DM
+            rate_limit_args={"lane": "low", "coalesce": f"bingo-dm:{owner}"},
+        )
+    except Exception as e:
+        logger.warning(f"Cannot DM winner {owner}: {e}")
 
-        # 📸 Bingo-Bild im gleichen Topic/Thread senden
-        if BINGO_IMAGE:
-            if os.path.exists(BINGO_IMAGE):
-                try:
-                    logger.info(f"Sending BINGO_IMAGE from '{BINGO_IMAGE}' via reply_photo")
-                    with open(BINGO_IMAGE, "rb") as f:
-                        await msg_obj.reply_photo(
-                            photo=f,
-                            caption="🎉 **BINGO!** We have a winner on the board!",
-                            parse_mode="Markdown"
-                        )
-                except Exception as e:
-                    logger.exception(f"Couldn't send BINGO_IMAGE '{BINGO_IMAGE}': {e}")
-                    # Fallback, damit im Chat sichtbar ist, dass das Bild failed
-                    await msg_obj.reply_text(
-                        "🎉 BINGO! (image failed to send, check logs / file path)"
-                    )
+async def _dm_host_summary(ctx: ContextTypes.DEFAULT_TYPE, sid: int, winner_entries, names: dict):
+    """🔔 Host privat informieren (Winner + Board + Wallet)."""
+    try:
+        host_id = _session_host(sid)
+        if not host_id:
+            return
+        lines = ["👀 *Bingo check for this session:*"]
+        for entry in winner_entries:
+            owner = entry["owner"]
+            bid = entry["bid"]
+            card = None
+            try:
+                card = db.get_board_token(bid)
+            except Exception:
+                card = None
+            wallet = db.get_user_wallet(owner)
+
+            line_board = f"• {names.get(owner, f'id:{owner}')} – Board #{bid}"
+            if entry.get("number") is not None:
+                line_board += f" on {entry['number']}"
+            if card:
+                line_board += f" (Card {card})"
+            if wallet:
+                line_board += f" | Wallet: `{wallet}`"
             else:
-                logger.warning(f"BINGO_IMAGE path does not exist: '{BINGO_IMAGE}'")
-        else:
-            logger.warning("BINGO_IMAGE is not set (empty).")
+                line_board += " | Wallet: (not set)"
 
-        # 🔔 Extra: Host privat informieren (Winner + Board + Wallet)
-        try:
-            host_id = db.get_session_host(sid)
-            if host_id:
-                host_chat = await ctx.bot.get_chat(host_id)
-                lines = ["👀 *Bingo check for this session:*"]
-                for entry in winner_entries:
-                    owner = entry["owner"]
-                    bid = entry["bid"]
-                    card = None
-                    try:
-                        card = db.get_board_token(bid)
-                    except Exception:
-                        card = None
-                    wallet = db.get_user_wallet(owner)
-                    name = f"id:{owner}"
-                    try:
-                        name = await _display_name(update, owner)
-                    except Exception:
-                        pass
-
-                    line_board = f"• {name} – Board #{bid}"
-                    if card:
-                        line_board += f" (Card {card})"
-                    if wallet:
-                        line_board += f" | Wallet: `{wallet}`"
-                    else:
-                        line_board += " | Wallet: (not set)"
-
-                    lines.append(line_board)
-
-                await host_chat.send_message(
-                    "\n".join(lines),
-                    parse_mode="Markdown"
-                )
-        except Exception as e:
-            logger.warning(f"Couldn't DM host with bingo info: {e}")
-    else:
-        msg += "No bingo yet."
+            lines.append(line_board)
 
-    await msg_obj.reply_markdown(msg, reply_markup=host_quick_keyboard())
+        await ctx.bot.send_message(
+            chat_id=host_id,
+            text="\n".join(lines),
+            parse_mode="Markdown"
+        )
+    except Exception as e:
+        logger.warning(f"Couldn't DM host with bingo info: {e}")
+
+async def _notify_winners(update: Update, ctx: ContextTypes.DEFAULT_TYPE, sid: int, winner_entries):
+    """Nach der Gruppen-Ansage: Bingo-Bild, DMs (eine pro Gewinner-Board) und Host-Übersicht parallel."""
+    msg_obj = update.effective_message or update.message
+    owners = list(dict.fromkeys(e["owner"] for e in winner_entries))
+
+    async def host_summary():
+        names = await _display_names(update.effective_chat, owners)
+        await _dm_host_summary(ctx, sid, winner_entries, names)
+
+    await asyncio.gather(
+        _send_bingo_image(ctx, msg_obj),
+        *(_dm_winner(ctx, e["owner"]) for e in winner_entries),
+        host_summary(),
+        return_exceptions=True,
+    )
 
+@serialized
 async def undo(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     if not in_allowed_topic(update):
         return
 
     chat_id, uid = update.effective_chat.id, update.effective_user.id
-    sid = db.get_live_session(chat_id)
+    sid = _live_session(update)
     if not sid:
         return await update.message.reply_text("No session.", reply_markup=back_button())
-    if db.get_session_host(sid) != uid:
+    if _session_host(sid) != uid:
         return await update.message.reply_text("Only host can undo.", reply_markup=back_button())
 
     last = db.get_last_draw(sid)
@@ -722,6 +1062,7 @@ async def undo(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
         reply_markup=host_quick_keyboard()
     )
 
+@serialized
 async def end_session(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     if not in_allowed_topic(update):
         return
@@ -730,11 +1071,11 @@ async def end_session(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
     chat_id, uid = chat.id, user.id
 
-    sid = db.get_live_session(chat_id)
+    sid = _live_session(update)
     if not sid:
         return await update.message.reply_text("No session.", reply_markup=back_button())
 
-    host_id = db.get_session_host(sid)
+    host_id = _session_host(sid)
 
     # Nur Host ODER Admin darf beenden
     if uid != host_id and uid not in ADMIN_IDS:
@@ -743,8 +1084,214 @@ async def end_session(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
             reply_markup=back_button()
         )
 
+    auto = _stop_auto_draw(sid)
     db.end_session(sid)
-    await update.message.reply_text("🛑 Session ended.", reply_markup=back_button())
+    _forget_session(sid)
+    text = "🛑 Session ended."
+    if auto:
+        text += f"\n🔓 Auto-draw seed: {auto['seed']}"
+    await update.message.reply_text(text, reply_markup=back_button())
+
+
+# ---------- Auto-Draw ----------
+# Der Bot zieht selbst: Reihenfolge = mit einem Seed gemischte 1..75 (übersprungen wird,
+# was schon gezogen ist – /call und /undo mischen sich also sauber ein). Beim Start
+# wird nur sha256(Session:Seed) gezeigt, der Seed selbst erst beim Stoppen.
+# Jeder Tick plant den nächsten erst nach seinem Ende -> Ticks überlappen nie.
+
+AUTO_DRAWS = {}  # session_id -> {"seed", "order", "interval", "paused", "job", "running", "anchor"}
+
+def auto_draw_keyboard(paused: bool = False):
+    return InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton("▶️ Resume" if paused else "⏸ Pause",
+                                 callback_data="h_auto_resume" if paused else "h_auto_pause"),
+            InlineKeyboardButton("⏹ Stop", callback_data="h_auto_stop"),
+        ],
+        [
+            InlineKeyboardButton("🐢 Slower", callback_data="h_auto_slower"),
+            InlineKeyboardButton("⏩ Faster", callback_data="h_auto_faster"),
+        ],
+    ])
+
+def _auto_order(seed: int):
+    order = list(range(1, 76))
+    random.Random(seed).shuffle(order)
+    return order
+
+def _auto_commitment(sid: int, seed: int) -> str:
+    return hashlib.sha256(f"{sid}:{seed}".encode()).hexdigest()
+
+def _clamp_interval(seconds: float) -> float:
+    return min(AUTO_DRAW_MAX_INTERVAL, max(AUTO_DRAW_MIN_INTERVAL, seconds))
+
+def _schedule_auto_tick(app: Application, sid: int, delay: float):
+    state = AUTO_DRAWS[sid]
+    if state["job"] is not None:
+        state["job"].schedule_removal()
+    state["job"] = app.job_queue.run_once(_auto_draw_tick, when=delay, data=sid, name=f"autodraw-{sid}")
+
+def _stop_auto_draw(sid: int):
+    """Auto-Draw beenden (z.B. bei /end); gibt den alten Zustand zurück oder None."""
+    state = AUTO_DRAWS.pop(sid, None)
+    if state and state["job"] is not None:
+        state["job"].schedule_removal()
+    return state
+
+async def _auto_draw_tick(ctx: ContextTypes.DEFAULT_TYPE):
+    """
+    Zieht eine Nummer und plant danach selbst den nächsten Tick. Solange ein Tick
+    läuft (state["running"]), ändern Resume/Tempo nur den Zustand – neu geplant
+    wird erst hier am Ende, Ticks überlappen also nie.
+    """
+    sid = ctx.job.data
+    state = AUTO_DRAWS.get(sid)
+    if state is None or state["paused"] or state["running"]:
+        return
+    state["job"] = None
+    state["running"] = True
+    try:
+        winners = await _auto_draw_once(ctx, sid, state)
+    finally:
+        state["running"] = False
+
+    if winners is None or AUTO_DRAWS.get(sid) is not state:  # beendet oder während des Ticks gestoppt
+        return
+    if winners and AUTO_DRAW_PAUSE_ON_BINGO:
+        state["paused"] = True
+        return await state["anchor"].reply_text(
+            "⏸ Auto-draw paused after a BINGO – check the claims, then resume.",
+            reply_markup=auto_draw_keyboard(paused=True)
+        )
+    if not state["paused"]:
+        _schedule_auto_tick(ctx.application, sid, state["interval"])
+
+async def _auto_draw_once(ctx: ContextTypes.DEFAULT_TYPE, sid: int, state: dict):
+    """Eine Ziehung; Gewinner-Liste, oder None wenn der Auto-Draw damit endet."""
+    anchor = state["anchor"]
+    if _live_session(_MessageUpdate(anchor)) != sid:
+        _stop_auto_draw(sid)
+        return None
+
+    drawn = set(db.get_drawn_numbers(sid))
+    n = next((x for x in state["order"] if x not in drawn), None)
+    if n is None:
+        _stop_auto_draw(sid)
+        await anchor.reply_text(
+            f"🏁 All 75 numbers drawn – auto-draw finished.\n🔓 Seed: {state['seed']}",
+            reply_markup=host_quick_keyboard()
+        )
+        return None
+
+    # Das Timeout gilt nur fürs Warten auf den Session-Lock. Ist der Lock da, läuft die
+    # Auswertung wie bei /call (Eintragen, Claims, Ansage als Antwort auf die Auto-Draw-
+    # Nachricht) unter shield zu Ende – eine eingetragene Zahl bleibt nie unangesagt.
+    update = _MessageUpdate(anchor)
+    lock = session_lock(update)
+    try:
+        await asyncio.wait_for(lock.acquire(), AUTO_DRAW_TICK_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning(f"Auto-draw tick for session {sid} skipped: session busy for over {AUTO_DRAW_TICK_TIMEOUT}s")
+        return []
+
+    async def draw():
+        try:
+            # __wrapped__ = ohne @serialized, den Lock halten wir hier schon
+            return await _process_called_numbers.__wrapped__(update, ctx, sid, [n])
+        finally:
+            lock.release()
+
+    try:
+        return await asyncio.shield(asyncio.ensure_future(draw()))
+    except Exception as e:
+        logger.exception(f"Auto-draw tick for session {sid} (number {n}) failed: {e}")
+    return []
+
+@serialized
+async def autodraw(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
+    """
+    /autodraw [Sekunden]            – Bot zieht selbst (Default AUTO_DRAW_INTERVAL)
+    /autodraw pause|resume|stop     – steuern
+    /autodraw <Sekunden>            – bei laufendem Auto-Draw: Tempo ändern
+    """
+    if not in_allowed_topic(update):
+        return
+
+    chat_id, uid = update.effective_chat.id, update.effective_user.id
+    sid = _live_session(update)
+    if not sid:
+        return await update.message.reply_text("No active session.", reply_markup=back_button())
+    if _session_host(sid) != uid:
+        return await update.message.reply_text("Only host can control auto-draw.", reply_markup=back_button())
+    if ctx.application.job_queue is None:
+        return await update.message.reply_text(
+            "Auto-draw needs the JobQueue (pip install 'python-telegram-bot[job-queue]')."
+        )
+
+    arg = ctx.args[0].lower() if ctx.args else ""
+    if arg in ("pause", "resume", "stop", "faster", "slower"):
+        return await _auto_draw_control(update.message, ctx, sid, arg)
+
+    try:
+        interval = float(arg) if arg else AUTO_DRAW_INTERVAL
+    except ValueError:
+        return await update.message.reply_text(
+            "Usage: /autodraw [seconds] | pause | resume | stop", reply_markup=back_button()
+        )
+
+    if sid in AUTO_DRAWS:
+        AUTO_DRAWS[sid]["interval"] = _clamp_interval(interval)
+        return await _auto_draw_control(update.message, ctx, sid, "speed")
+    return await _start_auto_draw(update.message, ctx, sid, interval)
+
+async def _start_auto_draw(message, ctx: ContextTypes.DEFAULT_TYPE, sid: int, interval: float):
+    seed = secrets.randbits(64)
+    interval = _clamp_interval(interval)
+    anchor = await message.reply_text(
+        f"🤖 Auto-draw started: one number every {interval:g}s.\n"
+        f"🔒 Draw order commitment: sha256(\"{sid}:seed\") = {_auto_commitment(sid, seed)}\n"
+        "The seed is revealed when auto-draw stops.",
+        reply_markup=auto_draw_keyboard()
+    )
+    AUTO_DRAWS[sid] = {
+        "seed": seed, "order": _auto_order(seed), "interval": interval, "paused": False,
+        "job": None, "running": False, "anchor": anchor,
+    }
+    _schedule_auto_tick(ctx.application, sid, interval)
+
+async def _auto_draw_control(message, ctx: ContextTypes.DEFAULT_TYPE, sid: int, action: str):
+    """pause / resume / stop / faster / slower / speed (Intervall schon gesetzt)."""
+    state = AUTO_DRAWS.get(sid)
+    if state is None:
+        return await message.reply_text("Auto-draw is not running. Start it with /autodraw.")
+
+    if action == "stop":
+        _stop_auto_draw(sid)
+        return await message.reply_text(
+            f"⏹ Auto-draw stopped.\n🔓 Seed: {state['seed']}", reply_markup=host_quick_keyboard()
+        )
+    if action == "pause":
+        state["paused"] = True
+        if state["job"] is not None:
+            state["job"].schedule_removal()
+            state["job"] = None
+        return await message.reply_text("⏸ Auto-draw paused.", reply_markup=auto_draw_keyboard(paused=True))
+
+    if action == "faster":
+        state["interval"] = _clamp_interval(state["interval"] / 1.5)
+    elif action == "slower":
+        state["interval"] = _clamp_interval(state["interval"] * 1.5)
+    if action == "resume":
+        state["paused"] = False
+    # ein laufender Tick plant am Ende selbst neu (mit dem neuen Intervall);
+    # sonst den wartenden Tick ersetzen bzw. nach Pause einen neuen planen
+    if not state["paused"] and not state["running"] and (action == "resume" or state["job"] is not None):
+        _schedule_auto_tick(ctx.application, sid, state["interval"])
+    verb = "resumed" if action == "resume" else "speed set"
+    return await message.reply_text(
+        f"🤖 Auto-draw {verb}: one number every {state['interval']:g}s.",
+        reply_markup=auto_draw_keyboard(paused=state["paused"])
+    )
 
 
 # ---------- Status ----------
@@ -761,14 +1308,14 @@ async def status(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
         )
 
     chat_id = chat.id
-    sid = db.get_live_session(chat_id)
+    sid = _live_session(update)
     if not sid:
         return await update.message.reply_text("No active session.", reply_markup=back_button())
 
     drawn = db.get_drawn_numbers(sid)
     players = db.count_players(sid)
     boards = db.count_session_boards(sid)
-    pattern = db.get_pattern(sid)
+    pattern = _session_meta(sid)["pattern"]
 
     last_numbers = ", ".join(map(str, drawn[-10:])) if drawn else "—"
     total = len(drawn)
@@ -798,13 +1345,60 @@ async def debug_id(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
 
 # ---------- OCR & Board Upload ----------
 
-async def _save_board_from_grid(update: Update, ctx: ContextTypes.DEFAULT_TYPE, grid, uid: int):
+async def _ask_card_number(update: Update):
+    """Fragt die Card Number ab – mit Beispielbild falls vorhanden."""
+    if CARD_HELP_IMAGE and os.path.exists(CARD_HELP_IMAGE):
+        try:
+            await _send_cached_photo(
+                update.effective_message.reply_photo, CARD_HELP_IMAGE,
+                caption=(
+                    "🏷 **Card Number needed**\n\n"
+                    "Please enter the **Card Number** printed on your bingo card now.\n"
+                    "👉 This is *not* the rank, not a game position – just the ID printed on the card."
+                ),
+                parse_mode="Markdown"
+            )
+        except Exception as e:
+            logger.warning(f"Couldn't send CARD_HELP_IMAGE '{CARD_HELP_IMAGE}': {e}")
+            await update.effective_message.reply_text(
+                "🏷 Please enter the **Card Number** printed on your bingo card now "
+                "(not the rank).",
+                parse_mode="Markdown"
+            )
+    else:
+        await update.effective_message.reply_text(
+            "🏷 Please enter the **Card Number** printed on your bingo card now "
+            "(not the rank).",
+            parse_mode="Markdown"
+        )
+
+async def _ask_unresolved_cells(update: Update, grid, unresolved, candidates=None):
+    """Fragt nur die Zellen ab, die die OCR nicht sicher lesen konnte."""
+    lines = []
+    for r, c in unresolved:
+        lo, hi = COLUMN_RANGES[c]
+        line = f"• {cell_name(r, c)} ({lo}–{hi})"
+        cands = candidates[r][c] if candidates else None
+        if cands:
+            line += " – maybe " + " / ".join(str(v) for v, _ in cands)
+        lines.append(line)
+    example = " ".join(str(COLUMN_RANGES[c][0] + i) for i, (_, c) in enumerate(unresolved))
+    await update.effective_message.reply_text(
+        f"📖 Detected grid for your new board:\n{_grid_to_text(grid)}\n\n"
+        f"🔍 I couldn't read {len(unresolved)} cell(s) for sure:\n"
+        + "\n".join(lines) + "\n\n"
+        f"Please reply with the {len(unresolved)} value(s) in this order, e.g. `{example}`.",
+        parse_mode="Markdown"
+    )
+
+async def _save_board_from_grid(update: Update, ctx: ContextTypes.DEFAULT_TYPE, grid, uid: int, candidates=None):
     """
     Nimmt ein erkanntes Grid, speichert es zunächst nur im RAM und
-    fragt die Card Number ab. Erst nach Card Number + Wallet wird
-    das Board in die Datenbank geschrieben.
+    fragt ggf. unklare Zellen und dann die Card Number ab. Erst nach
+    Card Number + Wallet wird das Board in die Datenbank geschrieben.
     """
-    if any(v == "ERR" for row in grid for v in row):
+    unresolved = [(r, c) for r in range(5) for c in range(5) if grid[r][c] == "ERR"]
+    if len(unresolved) > MAX_UNRESOLVED_CELLS:
         return await update.message.reply_text(
             "⚠️ OCR uncertain – please resend as FILE.",
             reply_markup=back_button()
@@ -822,36 +1416,16 @@ async def _save_board_from_grid(update: Update, ctx: ContextTypes.DEFAULT_TYPE,
     global PENDING_BOARD_DATA
     PENDING_BOARD_DATA[uid] = {"grid": grid}
 
+    # Unklare Zellen einzeln nachfragen statt das ganze Board abzulehnen
+    if unresolved:
+        PENDING_BOARD_DATA[uid]["unresolved"] = unresolved
+        return await _ask_unresolved_cells(update, grid, unresolved, candidates)
+
     await update.message.reply_text(
         f"📖 Detected grid for your new board:\n{_grid_to_text(grid)}"
     )
 
-    # Card Number abfragen – mit Beispielbild falls vorhanden
-    if CARD_HELP_IMAGE and os.path.exists(CARD_HELP_IMAGE):
-        try:
-            with open(CARD_HELP_IMAGE, "rb") as f:
-                await update.message.reply_photo(
-                    photo=f,
-                    caption=(
-                        "🏷 **Card Number needed**\n\n"
-                        "Please enter the **Card Number** printed on your bingo card now.\n"
-                        "👉 This is *not* the rank, not a game position – just the ID printed on the card."
-                    ),
-                    parse_mode="Markdown"
-                )
-        except Exception as e:
-            logger.warning(f"Couldn't send CARD_HELP_IMAGE '{CARD_HELP_IMAGE}': {e}")
-            await update.message.reply_text(
-                "🏷 Please enter the **Card Number** printed on your bingo card now "
-                "(not the rank).",
-                parse_mode="Markdown"
-            )
-    else:
-        await update.message.reply_text(
-            "🏷 Please enter the **Card Number** printed on your bingo card now "
-            "(not the rank).",
-            parse_mode="Markdown"
-        )
+    await _ask_card_number(update)
 
 async def handle_photo(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     if not in_allowed_topic(update):
@@ -864,6 +1438,10 @@ async def handle_photo(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
             reply_markup=back_button()
         )
 
+    # Album (mehrere Boards auf einmal) -> Bulk-Import
+    if update.message.media_group_id:
+        return _queue_album_item(update, ctx, update.message.photo[-1], None)
+
     uid = update.effective_user.id
     if _user_board_count(uid) >= MAX_BOARDS_PER_USER:
         return await update.message.reply_text(
@@ -873,14 +1451,13 @@ async def handle_photo(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
         )
 
     f = await update.message.photo[-1].get_file()
-    path = os.path.join(IMAGES_DIR, f"u{uid}.jpg")
-    await f.download_to_drive(path)
+    data = bytes(await f.download_as_bytearray())
     try:
-        grid = image_to_grid(path)
+        result = await asyncio.to_thread(_read_upload_sync, data, ".jpg")
     except Exception as e:
         logger.warning(f"OCR failed for photo: {e}")
         return await update.message.reply_text(f"OCR failed: {e}", reply_markup=back_button())
-    await _save_board_from_grid(update, ctx, grid, uid)
+    await _save_board_from_grid(update, ctx, result["grid"], uid, result["candidates"])
 
 async def handle_document_image(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     if not in_allowed_topic(update):
@@ -893,6 +1470,10 @@ async def handle_document_image(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
             reply_markup=back_button()
         )
 
+    if update.message.media_group_id:
+        doc = update.message.document
+        return _queue_album_item(update, ctx, doc, doc.file_name)
+
     uid = update.effective_user.id
     if _user_board_count(uid) >= MAX_BOARDS_PER_USER:
         return await update.message.reply_text(
@@ -903,14 +1484,262 @@ async def handle_document_image(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
 
     f = await update.message.document.get_file()
     ext = os.path.splitext(update.message.document.file_name or ".png")[1]
-    path = os.path.join(IMAGES_DIR, f"u{uid}{ext}")
-    await f.download_to_drive(path)
+    data = bytes(await f.download_as_bytearray())
     try:
-        grid = image_to_grid(path)
+        result = await asyncio.to_thread(_read_upload_sync, data, ext)
     except Exception as e:
         logger.warning(f"OCR failed for document image: {e}")
         return await update.message.reply_text(f"OCR failed: {e}", reply_markup=back_button())
-    await _save_board_from_grid(update, ctx, grid, uid)
+    await _save_board_from_grid(update, ctx, result["grid"], uid, result["candidates"])
+
+# ---------- Bulk-Import (Alben / ZIP) ----------
+# Mehrere Boards auf einmal: Telegram-Album (Fotos oder Dateien) oder ZIP-Datei.
+# Card Numbers kommen aus manifest.csv (ZIP), der Album-Caption oder dem Dateinamen;
+# fertige Boards werden nach einer einzigen Wallet-Abfrage gemeinsam gespeichert,
+# unklare Boards danach einzeln über den normalen Ablauf nachgefragt.
+
+MEDIA_GROUP_WAIT = float(os.getenv("MEDIA_GROUP_WAIT", "1.5"))  # Sekunden, bis ein Album als vollständig gilt
+MAX_ZIP_BYTES = int(os.getenv("MAX_ZIP_BYTES", str(50 * 1024 * 1024)))  # Obergrenze ZIP + entpackter Inhalt
+BULK_IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+MEDIA_GROUPS = {}  # media_group_id -> {"update": erstes Update, "items": [(message_id, name, media)], "caption": str}
+PENDING_BULK = {}  # user_id -> {"ready": [entry], "review": [entry], "wallet": str}
+
+_CARD_NAME_RE = re.compile(r"^(?:card[\s_-]*)?#?(\d{1,6})$", re.IGNORECASE)
+
+def _card_from_filename(name):
+    """'852.jpg', 'card_852.png', '#852.jpg' -> '852', sonst None."""
+    stem = os.path.splitext(os.path.basename(name or ""))[0].strip()
+    m = _CARD_NAME_RE.match(stem)
+    return m.group(1) if m else None
+
+def _parse_manifest(text):
+    """CSV 'datei,card_number' (Kopfzeile optional) -> {dateiname (klein): card_number}."""
+    cards = {}
+    for row in csv.reader(io.StringIO(text)):
+        if len(row) < 2:
+            continue
+        name, card = os.path.basename(row[0].strip()).lower(), row[1].strip().lstrip("#")
+        if name and card.isdigit():
+            cards[name] = card
+    return cards
+
+def _read_zip(data: bytes):
+    """ZIP -> [(name, bytes, card_number|None)] in Dateinamen-Reihenfolge."""
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        infos = [i for i in zf.infolist() if not i.is_dir() and not i.filename.startswith("__MACOSX/")]
+        if sum(i.file_size for i in infos) > MAX_ZIP_BYTES:
+            raise ValueError("archive is too large")
+        manifest = {}
+        for i in infos:
+            if i.filename.lower().endswith(".csv"):
+                manifest.update(_parse_manifest(zf.read(i).decode("utf-8-sig", "replace")))
+        items = []
+        for i in sorted(infos, key=lambda i: i.filename):
+            name = os.path.basename(i.filename)
+            if os.path.splitext(name)[1].lower() not in BULK_IMAGE_EXTS:
+                continue
+            items.append((name, zf.read(i), manifest.get(name.lower()) or _card_from_filename(name)))
+    return items
+
+def _queue_album_item(update: Update, ctx: ContextTypes.DEFAULT_TYPE, media, name):
+    """Sammelt die Einzel-Updates eines Albums; ausgewertet wird MEDIA_GROUP_WAIT s nach dem ersten Bild."""
+    msg = update.message
+    group = MEDIA_GROUPS.get(msg.media_group_id)
+    if group is None:
+        group = MEDIA_GROUPS[msg.media_group_id] = {"update": update, "items": [], "caption": ""}
+        ctx.application.create_task(_flush_album(msg.media_group_id, ctx))
+    group["items"].append((msg.message_id, name, media))
+    if msg.caption:
+        group["caption"] = msg.caption
+
+async def _flush_album(group_id, ctx: ContextTypes.DEFAULT_TYPE):
+    await asyncio.sleep(MEDIA_GROUP_WAIT)
+    group = MEDIA_GROUPS.pop(group_id, None)
+    if not group:
+        return
+    update = group["update"]
+    entries = sorted(group["items"], key=lambda it: it[0])
+    try:
+        files = await asyncio.gather(*(media.get_file() for _, _, media in entries))
+        blobs = await asyncio.gather(*(f.download_as_bytearray() for f in files))
+    except Exception as e:
+        logger.warning(f"Album download failed: {e}")
+        return await update.message.reply_text(f"Download failed: {e}", reply_markup=back_button())
+
+    # Caption "852 853 854" -> Card Numbers in Album-Reihenfolge
+    caption_cards = re.findall(r"\d+", group["caption"])
+    if len(caption_cards) != len(entries):
+        caption_cards = [None] * len(entries)
+
+    items = []
+    for i, ((_, name, _), data, card) in enumerate(zip(entries, blobs, caption_cards), start=1):
+        items.append((name or f"Photo {i}", bytes(data), card or _card_from_filename(name)))
+    await _run_bulk_import(update, ctx, update.effective_user.id, items)
+
+async def handle_document_zip(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
+    if not in_allowed_topic(update):
+        return
+
+    if update.effective_chat.type != "private":
+        return await update.message.reply_text(
+            "📥 Please send your bingo board as FILE (Document) in a private chat with me.\n"
+            "Boards can’t be added inside the game group.",
+            reply_markup=back_button()
+        )
+
+    doc = update.message.document
+    if doc.file_size and doc.file_size > MAX_ZIP_BYTES:
+        return await update.message.reply_text("📦 This ZIP is too large.", reply_markup=back_button())
+
+    f = await doc.get_file()
+    data = await f.download_as_bytearray()
+    try:
+        items = await asyncio.to_thread(_read_zip, bytes(data))
+    except (zipfile.BadZipFile, ValueError) as e:
+        return await update.message.reply_text(f"📦 Could not open ZIP: {e}", reply_markup=back_button())
+    await _run_bulk_import(update, ctx, update.effective_user.id, items)
+
+async def _run_bulk_import(update: Update, ctx: ContextTypes.DEFAULT_TYPE, uid: int, items):
+    """items: [(name, bytes, card_number|None)] -> Batch-OCR, fertige Boards sammeln, Rest zur Prüfung."""
+    msg = update.effective_message
+    if not items:
+        return await msg.reply_text("🖼 No board images found.", reply_markup=back_button())
+
+    free = MAX_BOARDS_PER_USER - _user_board_count(uid)
+    if free <= 0:
+        return await msg.reply_text(
+            f"🧩 You already have {MAX_BOARDS_PER_USER} boards saved.\n"
+            "Please delete some boards before adding new ones.",
+            reply_markup=back_button()
+        )
+    skipped = [name for name, _, _ in items[free:]]
+    items = items[:free]
+
+    await msg.reply_text(f"🔎 Reading {len(items)} board(s) …")
+    try:
+        results = await asyncio.to_thread(_read_uploads_sync, items)
+    except Exception as e:
+        logger.warning(f"Bulk OCR failed: {e}")
+        return await msg.reply_text(f"OCR failed: {e}", reply_markup=back_button())
+
+    ready, review, failed = [], [], []
+    for (name, _, card), res in zip(items, results):
+        if "error" in res or len(res["unresolved"]) > MAX_UNRESOLVED_CELLS:
+            failed.append(name)
+            continue
+        entry = {"name": name, "card_number": card, **res}
+        (review if res["unresolved"] or not card else ready).append(entry)
+
+    lines = [f"✅ {len(ready)} board(s) read completely."]
+    if review:
+        lines.append(f"🔍 {len(review)} board(s) need a quick check afterwards: "
+                     + ", ".join(e["name"] for e in review))
+    if failed:
+        lines.append("⚠️ Could not read (please resend as FILE): " + ", ".join(failed))
+    if skipped:
+        lines.append(f"🧩 Board limit ({MAX_BOARDS_PER_USER}) reached, skipped: " + ", ".join(skipped))
+    await msg.reply_text("\n".join(lines))
+
+    if not ready and not review:
+        return
+    PENDING_BOARD_DATA.pop(uid, None)
+    PENDING_BULK[uid] = {"ready": ready, "review": review, "wallet": None}
+
+    existing_wallet = db.get_user_wallet(uid)
+    if existing_wallet:
+        keyboard = InlineKeyboardMarkup([
+            [InlineKeyboardButton("✅ Use saved wallet", callback_data="bulk_wallet_default")],
+            [InlineKeyboardButton("✏️ Enter another wallet", callback_data="bulk_wallet_new")],
+            [InlineKeyboardButton("🏠 Back to Start", callback_data="go_home")]
+        ])
+        return await msg.reply_text(
+            "💼 Use your saved wallet for all of these boards?\n"
+            f"`{existing_wallet}`",
+            parse_mode="Markdown",
+            reply_markup=keyboard
+        )
+    ctx.user_data["awaiting_bulk_wallet"] = True
+    await msg.reply_text(
+        "💼 Please enter the **wallet address** where you hold these bingo cards.",
+        parse_mode="Markdown",
+        reply_markup=back_button()
+    )
+
+async def _save_bulk(update: Update, uid: int, wallet: str):
+    """Speichert alle fertigen Boards des Bulk-Imports und startet die Einzelprüfung für den Rest."""
+    bulk = PENDING_BULK.get(uid)
+    msg = update.effective_message
+    if not bulk:
+        return await msg.reply_text(
+            "Something went wrong while saving your boards. Please upload them again.",
+            reply_markup=back_button()
+        )
+    if bulk["wallet"]:
+        return  # schon gespeichert (z.B. Button doppelt gedrückt)
+    bulk["wallet"] = wallet
+    ready = bulk.pop("ready")
+    try:
+        db.set_user_wallet(uid, wallet)
+    except Exception as e:
+        logger.warning(f"Could not save user wallet for {uid}: {e}")
+
+    if ready:
+        ids = db.create_boards(uid, [(e["card_number"], e["grid"]) for e in ready])
+        await msg.reply_text(
+            f"✅ {len(ids)} board(s) saved:\n"
+            + "\n".join(f"• Board #{bid} (Card {e['card_number']})" for bid, e in zip(ids, ready))
+        )
+    await _next_bulk_review(update, uid)
+
+async def _next_bulk_review(update: Update, uid: int):
+    """Legt das nächste unklare Bulk-Board in PENDING_BOARD_DATA und fragt nach, was fehlt."""
+    bulk = PENDING_BULK.get(uid)
+    msg = update.effective_message
+    if not bulk or not bulk["review"]:
+        PENDING_BULK.pop(uid, None)
+        return await msg.reply_text("🎉 Bulk import finished.", reply_markup=addboard_continue_keyboard())
+
+    entry = bulk["review"].pop(0)
+    pending = {"grid": entry["grid"], "wallet": bulk["wallet"]}
+    if entry["card_number"]:
+        pending["card_number"] = entry["card_number"]
+    PENDING_BOARD_DATA[uid] = pending
+
+    await msg.reply_text(f"📄 {entry['name']} ({len(bulk['review'])} more after this):")
+    if entry["unresolved"]:
+        pending["unresolved"] = entry["unresolved"]
+        return await _ask_unresolved_cells(update, entry["grid"], entry["unresolved"], entry["candidates"])
+    await msg.reply_text(f"📖 Detected grid for your new board:\n{_grid_to_text(entry['grid'])}")
+    await _ask_card_number(update)
+
+async def _save_reviewed_bulk_board(update: Update, uid: int):
+    """Geprüftes Bulk-Board mit der Wallet des Imports speichern, dann weiter zum nächsten."""
+    data = PENDING_BOARD_DATA.pop(uid)
+    bid = db.create_board(uid, data["card_number"], True)
+    db.save_board_numbers(bid, data["grid"])
+    await update.effective_message.reply_text(f"✅ Board #{bid} (Card {data['card_number']}) saved.")
+    await _next_bulk_review(update, uid)
+
+# ---------- Upload-Ablage (Hintergrund-Jobs) ----------
+
+async def _prune_uploads_job(ctx: ContextTypes.DEFAULT_TYPE):
+    """Hält UPLOAD_DIR unter UPLOAD_QUOTA_MB – Scan + Löschen im Worker-Thread."""
+    try:
+        removed, freed, total = await asyncio.to_thread(uploads.prune)
+    except Exception as e:
+        return logger.warning(f"Upload pruning failed: {e}")
+    if removed:
+        logger.info(f"Pruned {removed} upload(s), freed {freed / 1e6:.1f} MB, {total / 1e6:.1f} MB kept")
+
+async def _migrate_legacy_uploads_job(ctx: ContextTypes.DEFAULT_TYPE):
+    """Einmalig nach dem Start: alte u<id>.jpg/.png aus IMAGES_DIR in die Ablage verschieben."""
+    try:
+        moved = await asyncio.to_thread(uploads.migrate_legacy, IMAGES_DIR)
+    except Exception as e:
+        return logger.warning(f"Legacy upload migration failed: {e}")
+    if moved:
+        logger.info(f"Moved {len(moved)} legacy upload file(s) from {IMAGES_DIR} to {uploads.UPLOAD_DIR}")
 
 # ---------- Training ----------
 
@@ -936,7 +1765,27 @@ async def handle_text_for_addboard(update: Update, ctx: ContextTypes.DEFAULT_TYP
 
     global PENDING_BOARD_DATA
 
-    # 0) Wallet wird erwartet?
+    # 0a) Host trägt mehrere Zahlen über den Batch-Call-Button ein – nur im Chat/Topic
+    # des Buttons, Texte woanders (Wallet per DM, OCR-Korrektur) laufen normal weiter
+    pending_calls = ctx.user_data.get("awaiting_call_numbers")
+    sid = pending_calls.pop(_session_key(update), None) if pending_calls else None
+    if sid is not None:
+        if _live_session(update) != sid or _session_host(sid) != uid:
+            return await update.message.reply_text("No active session.", reply_markup=back_button())
+        numbers = _parse_call_numbers(text)
+        if numbers is None:
+            return await update.message.reply_text(
+                "Please send numbers only (e.g. 5 12 33) – press the button again to retry.",
+                reply_markup=host_quick_keyboard()
+            )
+        return await _process_called_numbers(update, ctx, sid, numbers)
+
+    # 0b) Wallet für einen Bulk-Import
+    if ctx.user_data.get("awaiting_bulk_wallet"):
+        ctx.user_data["awaiting_bulk_wallet"] = False
+        return await _save_bulk(update, uid, text)
+
+    # 0c) Wallet wird erwartet?
     if ctx.user_data.get("awaiting_wallet"):
         ctx.user_data["awaiting_wallet"] = False
 
@@ -976,10 +1825,58 @@ async def handle_text_for_addboard(update: Update, ctx: ContextTypes.DEFAULT_TYP
         )
         return
 
+    # 0d) Korrektur unklarer OCR-Zellen
+    if uid in PENDING_BOARD_DATA and PENDING_BOARD_DATA[uid].get("unresolved"):
+        pending = PENDING_BOARD_DATA[uid]
+        cells = pending["unresolved"]
+        vals = text.replace(",", " ").split()
+        if len(vals) != len(cells):
+            return await update.message.reply_text(
+                f"Please send exactly {len(cells)} value(s) for: "
+                + ", ".join(cell_name(r, c) for r, c in cells),
+                reply_markup=back_button()
+            )
+        try:
+            nums = [int(v) for v in vals]
+        except ValueError:
+            return await update.message.reply_text("Use only numbers.", reply_markup=back_button())
+
+        grid = pending["grid"]
+        for (r, c), v in zip(cells, nums):
+            lo, hi = COLUMN_RANGES[c]
+            if not lo <= v <= hi:
+                return await update.message.reply_text(
+                    f"{cell_name(r, c)} must be between {lo} and {hi}.",
+                    reply_markup=back_button()
+                )
+            column = [grid[i][c] for i in range(5) if (i, c) != (r, c)]
+            if v in column or nums.count(v) > 1:
+                return await update.message.reply_text(
+                    f"{v} appears twice on this card – please check {cell_name(r, c)}.",
+                    reply_markup=back_button()
+                )
+        for (r, c), v in zip(cells, nums):
+            grid[r][c] = v
+        del pending["unresolved"]
+
+        # Bulk-Board mit Card Number aus Dateiname/Manifest: direkt speichern
+        if pending.get("wallet") and "card_number" in pending:
+            return await _save_reviewed_bulk_board(update, uid)
+
+        await update.message.reply_text(
+            f"📖 Detected grid for your new board:\n{_grid_to_text(grid)}"
+        )
+        await _ask_card_number(update)
+        return
+
     # 1) Card Number erfassen, falls für diesen User ein Board im RAM liegt (aber noch keine Card Number)
     if uid in PENDING_BOARD_DATA and "card_number" not in PENDING_BOARD_DATA[uid]:
         PENDING_BOARD_DATA[uid]["card_number"] = text  # z.B. "852" oder "#852"
 
+        # Bulk-Board: Wallet wurde schon für den ganzen Import gewählt
+        if PENDING_BOARD_DATA[uid].get("wallet"):
+            return await _save_reviewed_bulk_board(update, uid)
+
         # Gibt es bereits eine gespeicherte Wallet für diesen User?
         existing_wallet = db.get_user_wallet(uid)
         if existing_wallet:
@@ -1033,360 +1930,372 @@ async def handle_text_for_addboard(update: Update, ctx: ContextTypes.DEFAULT_TYP
         )
 
         # Card Number abfragen – gleicher Text wie oben
-        if CARD_HELP_IMAGE and os.path.exists(CARD_HELP_IMAGE):
-            try:
-                with open(CARD_HELP_IMAGE, "rb") as f:
-                    await update.message.reply_photo(
-                        photo=f,
-                        caption=(
-                            "🏷 **Card Number needed**\n\n"
-                            "Please enter the **Card Number** printed on your bingo card now.\n"
-                            "👉 This is *not* the rank, not a game position – just the ID printed on the card."
-                        ),
-                        parse_mode="Markdown"
-                    )
-            except Exception as e:
-                logger.warning(f"Couldn't send CARD_HELP_IMAGE '{CARD_HELP_IMAGE}': {e}")
-                await update.message.reply_text(
-                    "🏷 Please enter the **Card Number** printed on your bingo card now "
-                    "(not the rank).",
-                    parse_mode="Markdown"
-                )
-        else:
-            await update.message.reply_text(
-                "🏷 Please enter the **Card Number** printed on your bingo card now "
-                "(not the rank).",
-                parse_mode="Markdown"
-            )
+        await _ask_card_number(update)
 
         # Wallet kommt im nächsten Schritt
         return
 
 # ---------- Buttons / Callbacks ----------
+# callback_data -> Handler über router.CallbackRouter (Dict-Lookup statt if-Kette).
+# Handler bekommen das Callback-Update; Commands, die sie weiterreichen, ein
+# _MessageUpdate um die Button-Nachricht mit dem drückenden User.
+ROUTER = CallbackRouter()
+
+def _button_update(q):
+    return _MessageUpdate(q.message, user=q.from_user)
+
+async def _invalid_button(update, ctx, route):
+    await update.callback_query.message.reply_text(route.invalid or "Invalid button.", reply_markup=back_button())
+
+ROUTER.on_invalid = _invalid_button
+
+async def require_host(update, ctx, params) -> bool:
+    """Middleware: nur der Host der laufenden Session (Host aus _SESSION_META); setzt params["sid"]."""
+    q = update.callback_query
+    sid = _live_session(update)
+    if not sid:
+        await q.message.reply_text("No active session.", reply_markup=back_button())
+        return False
+    if _session_host(sid) != q.from_user.id:
+        # Lustiger Spruch für Nicht-Hosts
+        await q.message.reply_text(random.choice(FUNNY_HOST_DENIED), reply_markup=back_button())
+        return False
+    params["sid"] = sid
+    return True
 
 async def on_button(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     q = update.callback_query
     await q.answer()
-    data = q.data
-    chat = q.message.chat
-    uid = q.from_user.id
 
     # Gruppen-/Topic-Filter für Buttons
-    if chat.type in ("group", "supergroup"):
-        if BINGO_CHAT_ID is not None and chat.id != BINGO_CHAT_ID:
-            return
-        if BINGO_TOPIC_ID is not None:
-            thread_id = getattr(q.message, "message_thread_id", None)
-            if thread_id != BINGO_TOPIC_ID:
-                return
-
-    # ---------- Wallet-Auswahl für neues Board ----------
-    if data == "wallet_use_default":
-        # Default-Wallet aus DB holen
-        wallet = db.get_user_wallet(uid)
-        if not wallet or uid not in PENDING_BOARD_DATA or "grid" not in PENDING_BOARD_DATA[uid] or "card_number" not in PENDING_BOARD_DATA[uid]:
-            return await q.message.reply_text(
-                "Something went wrong while using the saved wallet. Please start /addboard again.",
-                reply_markup=back_button()
-            )
+    if not _chat_allowed(q.message):
+        return
 
-        data_pending = PENDING_BOARD_DATA.pop(uid)
-        grid = data_pending["grid"]
-        card_number = data_pending["card_number"]
+    await ROUTER.dispatch(update, ctx, q.data)
 
-        # Board speichern
-        bid = db.create_board(uid, card_number, True)
-        db.save_board_numbers(bid, grid)
+# ---------- Wallet-Auswahl für neues Board ----------
 
-        await q.message.reply_text(
-            f"🏷 Card Number saved for board #{bid}.\n"
-            "✅ Board fully added using your saved wallet address.\n\n"
-            "💡 If you move this card to another wallet later, delete this board and add it again with the correct wallet.",
-            reply_markup=addboard_continue_keyboard()
+@ROUTER.route("wallet_use_default")
+async def _wallet_use_default(update, ctx):
+    q = update.callback_query
+    uid = q.from_user.id
+    # Default-Wallet aus DB holen
+    wallet = db.get_user_wallet(uid)
+    if not wallet or uid not in PENDING_BOARD_DATA or "grid" not in PENDING_BOARD_DATA[uid] or "card_number" not in PENDING_BOARD_DATA[uid]:
+        return await q.message.reply_text(
+            "Something went wrong while using the saved wallet. Please start /addboard again.",
+            reply_markup=back_button()
         )
-        return
 
-    if data == "wallet_enter_new":
-        if uid not in PENDING_BOARD_DATA or "grid" not in PENDING_BOARD_DATA[uid] or "card_number" not in PENDING_BOARD_DATA[uid]:
-            return await q.message.reply_text(
-                "Something went wrong while preparing your board. Please start /addboard again.",
-                reply_markup=back_button()
-            )
+    data_pending = PENDING_BOARD_DATA.pop(uid)
+    grid = data_pending["grid"]
+    card_number = data_pending["card_number"]
+
+    # Board speichern
+    bid = db.create_board(uid, card_number, True)
+    db.save_board_numbers(bid, grid)
 
-        ctx.user_data["awaiting_wallet"] = True
+    await q.message.reply_text(
+        f"🏷 Card Number saved for board #{bid}.\n"
+        "✅ Board fully added using your saved wallet address.\n\n"
+        "💡 If you move this card to another wallet later, delete this board and add it again with the correct wallet.",
+        reply_markup=addboard_continue_keyboard()
+    )
+
+@ROUTER.route("wallet_enter_new")
+async def _wallet_enter_new(update, ctx):
+    q = update.callback_query
+    uid = q.from_user.id
+    if uid not in PENDING_BOARD_DATA or "grid" not in PENDING_BOARD_DATA[uid] or "card_number" not in PENDING_BOARD_DATA[uid]:
         return await q.message.reply_text(
-            "💼 Please enter the **wallet address** where you hold this bingo card.\n\n"
-            "If you later move this card to another wallet, delete this board and add it again with the correct wallet.",
-            parse_mode="Markdown",
+            "Something went wrong while preparing your board. Please start /addboard again.",
             reply_markup=back_button()
         )
 
-    # ---------- Game Rules ----------
-    if data == "show_rules":
-        return await q.message.reply_markdown(RULES_TEXT, reply_markup=back_button())
+    ctx.user_data["awaiting_wallet"] = True
+    return await q.message.reply_text(
+        "💼 Please enter the **wallet address** where you hold this bingo card.\n\n"
+        "If you later move this card to another wallet, delete this board and add it again with the correct wallet.",
+        parse_mode="Markdown",
+        reply_markup=back_button()
+    )
+
+# ---------- Wallet-Auswahl für Bulk-Import ----------
 
-    # ---------- Spieler-Buttons ----------
-    if data == "p_addboard":
+@ROUTER.route("bulk_wallet_default")
+async def _bulk_wallet_default(update, ctx):
+    q = update.callback_query
+    uid = q.from_user.id
+    wallet = db.get_user_wallet(uid)
+    if not wallet:
         return await q.message.reply_text(
-            "📥 Boards can only be added in a private chat with me.\n\n"
-            "🧩 **Add Board**\n"
-            "Send a board as FILE (Document) or use /addboard to paste 25 values.\n"
-            "Center tile is always **FREE**.\n\n"
-            "After upload I'll ask you for the **Card Number** and the **wallet address** where you hold your bingo cards.\n"
-            f"You can store up to **{MAX_BOARDS_PER_USER} boards**.\n\n"
-            "If you move your cards to another wallet later, please delete the boards and add them again with the new wallet.",
-            parse_mode="Markdown",
-            reply_markup=addboard_continue_keyboard()
+            "Something went wrong while using the saved wallet. Please upload your boards again.",
+            reply_markup=back_button()
         )
+    return await _save_bulk(update, uid, wallet)
 
-    if data == "p_myboards":
-        # Trigger gleiche Logik wie /myboards
-        class DummyUpdate:
-            effective_user = q.from_user
-            message = q.message
-            effective_message = q.message
-        dummy_update = DummyUpdate()
-        return await myboards(dummy_update, ctx)
-
-    if data == "p_join":
-        # Join-Steuerung für den Spieler mit Auto-Join
-        if chat.type not in ("group", "supergroup"):
-            return await q.message.reply_text(
-                "Use this button inside the group where Bingo is played.",
-                reply_markup=back_button()
-            )
+@ROUTER.route("bulk_wallet_new")
+async def _bulk_wallet_new(update, ctx):
+    q = update.callback_query
+    if q.from_user.id not in PENDING_BULK:
+        return await q.message.reply_text(
+            "Something went wrong while preparing your boards. Please upload them again.",
+            reply_markup=back_button()
+        )
+    ctx.user_data["awaiting_bulk_wallet"] = True
+    return await q.message.reply_text(
+        "💼 Please enter the **wallet address** where you hold these bingo cards.",
+        parse_mode="Markdown",
+        reply_markup=back_button()
+    )
 
-        chat_id = chat.id
-        auto_on = uid in AUTO_JOIN[chat_id]
-        auto_label = "🚫 Disable Auto-Join" if auto_on else "✅ Enable Auto-Join"
+# ---------- Game Rules ----------
+
+@ROUTER.route("show_rules")
+async def _show_rules(update, ctx):
+    return await update.callback_query.message.reply_markdown(RULES_TEXT, reply_markup=back_button())
+
+# ---------- Spieler-Buttons ----------
+
+@ROUTER.route("p_addboard")
+async def _p_addboard(update, ctx):
+    return await update.callback_query.message.reply_text(
+        "📥 Boards can only be added in a private chat with me.\n\n"
+        "🧩 **Add Board**\n"
+        "Send a board as FILE (Document) or use /addboard to paste 25 values.\n"
+        "Several boards at once: send an album or a ZIP file.\n"
+        "Center tile is always **FREE**.\n\n"
+        "After upload I'll ask you for the **Card Number** and the **wallet address** where you hold your bingo cards.\n"
+        f"You can store up to **{MAX_BOARDS_PER_USER} boards**.\n\n"
+        "If you move your cards to another wallet later, please delete the boards and add them again with the new wallet.",
+        parse_mode="Markdown",
+        reply_markup=addboard_continue_keyboard()
+    )
 
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("🎮 Join this session now", callback_data="join_now")],
-            [InlineKeyboardButton(auto_label, callback_data="toggle_autojoin")],
-            [InlineKeyboardButton("🏠 Back to Start", callback_data="go_home")]
-        ])
+@ROUTER.route("p_myboards")
+async def _p_myboards(update, ctx):
+    # Trigger gleiche Logik wie /myboards
+    return await myboards(_button_update(update.callback_query), ctx)
 
-        text = (
-            "🎮 **Join Session**\n\n"
-            "• *Join this session now*: connect all your saved boards to the current game.\n"
-            "• *Enable Auto-Join*: you will automatically join every new session in this chat with all your boards."
-        )
-        return await q.message.reply_markdown(text, reply_markup=keyboard)
-
-    if data == "join_now":
-        # Gleiche Logik wie /join
-        class DummyUpdate:
-            effective_chat = chat
-            effective_user = q.from_user
-            message = q.message
-            effective_message = q.message
-        dummy = DummyUpdate()
-        return await join(dummy, ctx)
-
-    if data == "toggle_autojoin":
-        chat_id = chat.id
-        if uid in AUTO_JOIN[chat_id]:
-            AUTO_JOIN[chat_id].remove(uid)
-            msg = "🚫 Auto-Join disabled in this chat. You will only join when you tap *Join*."
-        else:
-            AUTO_JOIN[chat_id].add(uid)
-            msg = "✅ Auto-Join enabled in this chat.\nYou will automatically join every new session with all your boards."
+def _join_keyboard(chat_id, uid):
+    auto_on = uid in AUTO_JOIN[chat_id]
+    auto_label = "🚫 Disable Auto-Join" if auto_on else "✅ Enable Auto-Join"
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton("🎮 Join this session now", callback_data="join_now")],
+        [InlineKeyboardButton(auto_label, callback_data="toggle_autojoin")],
+        [InlineKeyboardButton("🏠 Back to Start", callback_data="go_home")]
+    ])
 
-        # UI erneut aufbauen, damit Button-Label passt
-        auto_on = uid in AUTO_JOIN[chat_id]
-        auto_label = "🚫 Disable Auto-Join" if auto_on else "✅ Enable Auto-Join"
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("🎮 Join this session now", callback_data="join_now")],
-            [InlineKeyboardButton(auto_label, callback_data="toggle_autojoin")],
-            [InlineKeyboardButton("🏠 Back to Start", callback_data="go_home")]
-        ])
-        await q.message.edit_reply_markup(reply_markup=keyboard)
-        return await q.message.reply_markdown(msg, reply_markup=keyboard)
-
-    if data == "p_score":
-        row = db.get_user_stats_row(uid)
-        if not row:
-            return await q.message.reply_text(
-                "📈 No stats yet. Join a session and play at least one Bingo game.",
-                reply_markup=back_button()
-            )
-        _, total_bingos, total_boards, total_sessions, last_played = row
-        msg = (
-            "📈 **Your Progress**\n"
-            f"• Sessions joined: {total_sessions}\n"
-            f"• Boards used: {total_boards}\n"
-            f"• Bingos: {total_bingos}\n"
-            f"• Last played: {last_played}"
+@ROUTER.route("p_join")
+async def _p_join(update, ctx):
+    # Join-Steuerung für den Spieler mit Auto-Join
+    q = update.callback_query
+    chat = q.message.chat
+    if chat.type not in ("group", "supergroup"):
+        return await q.message.reply_text(
+            "Use this button inside the group where Bingo is played.",
+            reply_markup=back_button()
         )
-        return await q.message.reply_markdown(msg, reply_markup=back_button())
 
-    if data == "p_leaderboard":
-        rows = db.get_leaderboard(limit=10)
-        if not rows:
-            return await q.message.reply_text(
-                "🏆 No leaderboard yet. Play some games first!",
-                reply_markup=back_button()
-            )
-        lines = []
-        for i, (user_id, total_bingos, total_boards, total_sessions, last_played) in enumerate(rows, start=1):
-            # Namen/Usernamen holen
-            name = f"id:{user_id}"
-            try:
-                member = await chat.get_member(user_id)
-                if member and member.user:
-                    if member.user.username:
-                        name = f"@{member.user.username}"
-                    else:
-                        name_parts = [member.user.first_name or "", member.user.last_name or ""]
-                        pretty = " ".join(p for p in name_parts if p).strip()
-                        if pretty:
-                            name = pretty
-            except Exception as e:
-                logger.debug(f"Cannot resolve leaderboard name for {user_id}: {e}")
-
-            lines.append(
-                f"{i}. {name} – 🏆 {total_bingos} Bingos, 🎟️ {total_boards} boards, 🎮 {total_sessions} sessions"
-            )
-        msg = "🏆 **Global Leaderboard**\n" + "\n".join(lines)
-        return await q.message.reply_markdown(msg, reply_markup=back_button())
-
-    if data == "p_mystats":
-        row = db.get_user_stats_row(uid)
-        if not row:
-            return await q.message.reply_text(
-                "📊 No stats yet. Join a session and play at least one Bingo game.",
-                reply_markup=back_button()
-            )
-        _, total_bingos, total_boards, total_sessions, last_played = row
-        msg = (
-            "📊 **Your Stats**\n"
-            f"• Sessions joined: {total_sessions}\n"
-            f"• Boards used: {total_boards}\n"
-            f"• Bingos: {total_bingos}\n"
-            f"• Last played: {last_played}"
+    text = (
+        "🎮 **Join Session**\n\n"
+        "• *Join this session now*: connect all your saved boards to the current game.\n"
+        "• *Enable Auto-Join*: you will automatically join every new session in this chat with all your boards."
+    )
+    return await q.message.reply_markdown(text, reply_markup=_join_keyboard(chat.id, q.from_user.id))
+
+@ROUTER.route("join_now")
+async def _join_now(update, ctx):
+    # Gleiche Logik wie /join
+    return await join(_button_update(update.callback_query), ctx)
+
+@ROUTER.route("toggle_autojoin")
+async def _toggle_autojoin(update, ctx):
+    q = update.callback_query
+    chat_id = q.message.chat.id
+    uid = q.from_user.id
+    if uid in AUTO_JOIN[chat_id]:
+        db.set_auto_join(chat_id, uid, False)
+        AUTO_JOIN[chat_id].discard(uid)
+        msg = "🚫 Auto-Join disabled in this chat. You will only join when you tap *Join*."
+    else:
+        db.set_auto_join(chat_id, uid, True)
+        AUTO_JOIN[chat_id].add(uid)
+        msg = "✅ Auto-Join enabled in this chat.\nYou will automatically join every new session with all your boards."
+
+    # UI erneut aufbauen, damit Button-Label passt
+    keyboard = _join_keyboard(chat_id, uid)
+    await q.message.edit_reply_markup(reply_markup=keyboard)
+    return await q.message.reply_markdown(msg, reply_markup=keyboard)
+
+async def _stats_reply(q, title, empty_text):
+    row = db.get_user_stats_row(q.from_user.id)
+    if not row:
+        return await q.message.reply_text(empty_text, reply_markup=back_button())
+    _, total_bingos, total_boards, total_sessions, last_played = row
+    msg = (
+        f"{title}\n"
+        f"• Sessions joined: {total_sessions}\n"
+        f"• Boards used: {total_boards}\n"
+        f"• Bingos: {total_bingos}\n"
+        f"• Last played: {last_played}"
+    )
+    return await q.message.reply_markdown(msg, reply_markup=back_button())
+
+@ROUTER.route("p_score")
+async def _p_score(update, ctx):
+    return await _stats_reply(
+        update.callback_query, "📈 **Your Progress**",
+        "📈 No stats yet. Join a session and play at least one Bingo game."
+    )
+
+@ROUTER.route("p_mystats")
+async def _p_mystats(update, ctx):
+    return await _stats_reply(
+        update.callback_query, "📊 **Your Stats**",
+        "📊 No stats yet. Join a session and play at least one Bingo game."
+    )
+
+@ROUTER.route("p_leaderboard")
+async def _p_leaderboard(update, ctx):
+    q = update.callback_query
+    rows = db.get_leaderboard(limit=10)
+    if not rows:
+        return await q.message.reply_text(
+            "🏆 No leaderboard yet. Play some games first!",
+            reply_markup=back_button()
+        )
+    # Namen aus Cache/users-Tabelle, get_member nur für nie gesehene User
+    names = await _display_names(q.message.chat, [row[0] for row in rows])
+    lines = []
+    for i, (user_id, total_bingos, total_boards, total_sessions, last_played) in enumerate(rows, start=1):
+        name = names.get(user_id, f"id:{user_id}")
+        lines.append(
+            f"{i}. {name} – 🏆 {total_bingos} Bingos, 🎟️ {total_boards} boards, 🎮 {total_sessions} sessions"
         )
-        return await q.message.reply_markdown(msg, reply_markup=back_button())
+    msg = "🏆 **Global Leaderboard**\n" + "\n".join(lines)
+    return await q.message.reply_markdown(msg, reply_markup=back_button())
 
-    # ---------- Board-Buttons ----------
-    if data.startswith("view_board:"):
-        try:
-            bid = int(data.split(":", 1)[1])
-        except ValueError:
-            return await q.message.reply_text("Invalid board ID.", reply_markup=back_button())
+# ---------- Board-Buttons ----------
 
-        if db.get_board_owner(bid) != uid:
-            return await q.message.reply_text("Board not found or not owned by you.", reply_markup=back_button())
+@ROUTER.route("view_board:{bid:int}", invalid="Invalid board ID.")
+async def _view_board(update, ctx, bid):
+    q = update.callback_query
+    if db.get_board_owner(bid) != q.from_user.id:
+        return await q.message.reply_text("Board not found or not owned by you.", reply_markup=back_button())
 
-        grid = db.load_board(bid)
+    grid = db.load_board(bid)
+    card = None
+    try:
+        card = db.get_board_token(bid)
+    except Exception:
         card = None
-        try:
-            card = db.get_board_token(bid)
-        except Exception:
-            card = None
-        header = f"🧩 Board #{bid}"
-        if card:
-            header += f" (Card {card})"
-        text = f"{header}:\n{_grid_to_text(grid)}"
-        return await q.message.reply_text(text, reply_markup=back_button())
+    header = f"🧩 Board #{bid}"
+    if card:
+        header += f" (Card {card})"
+    text = f"{header}:\n{_grid_to_text(grid)}"
+    return await q.message.reply_text(text, reply_markup=back_button())
 
-    if data.startswith("del_board:"):
-        try:
-            bid = int(data.split(":", 1)[1])
-        except ValueError:
-            return await q.message.reply_text("Invalid board ID.", reply_markup=back_button())
+@ROUTER.route("del_board:{bid:int}", invalid="Invalid board ID.")
+async def _del_board(update, ctx, bid):
+    q = update.callback_query
+    ok = db.delete_board(bid, q.from_user.id)
+    msg = f"🗑️ Board {bid} deleted." if ok else "Board not found or not owned by you."
+    return await q.message.reply_text(msg, reply_markup=back_button())
 
-        ok = db.delete_board(bid, uid)
-        msg = f"🗑️ Board {bid} deleted." if ok else "Board not found or not owned by you."
-        return await q.message.reply_text(msg, reply_markup=back_button())
+@ROUTER.route("del_all_boards")
+async def _del_all_boards(update, ctx):
+    q = update.callback_query
+    count = db.delete_all_boards(q.from_user.id)
+    msg = f"🗑️ Deleted {count} of your boards." if count else "You have no boards to delete."
+    return await q.message.reply_text(msg, reply_markup=back_button())
 
-    if data == "del_all_boards":
-        count = db.delete_all_boards(uid)
-        msg = f"🗑️ Deleted {count} of your boards." if count else "You have no boards to delete."
-        return await q.message.reply_text(msg, reply_markup=back_button())
+@ROUTER.route("cancel")
+async def _cancel(update, ctx):
+    return await update.callback_query.message.reply_text("❌ Action cancelled.", reply_markup=back_button())
 
-    if data == "cancel":
-        return await q.message.reply_text("❌ Action cancelled.", reply_markup=back_button())
+# ---------- Host-Buttons ----------
 
-    # ---------- Host-Buttons ----------
-    if data == "h_host":
-        if chat.type == "private":
-            return await q.message.reply_text(
-                "Use /host in a group chat to start a session.",
-                reply_markup=back_button()
-            )
-        # Neue Session starten (hier darf jeder – es wird der neue Host)
-        class DummyUpdate:
-            effective_chat = chat
-            effective_user = q.from_user
-            message = q.message
-            effective_message = q.message
-        dummy = DummyUpdate()
-        return await host(dummy, ctx)
-
-    if data == "h_train":
-        # Training ist nicht sicherheitskritisch, darf jeder
-        class DummyUpdate:
-            message = q.message
-            effective_message = q.message
-        dummy = DummyUpdate()
-        return await train(dummy, ctx)
-
-    # Ab hier: Buttons, die nur der Host einer laufenden Session drücken darf
-    if data in ("h_call", "h_status", "h_undo", "h_end"):
-        sid = db.get_live_session(chat.id)
-        if not sid:
-            return await q.message.reply_text("No active session.", reply_markup=back_button())
-
-        host_id = db.get_session_host(sid)
-        if host_id != uid:
-            # Lustiger Spruch für Nicht-Hosts
-            return await q.message.reply_text(
-                random.choice(FUNNY_HOST_DENIED),
-                reply_markup=back_button()
-            )
+@ROUTER.route("h_host")
+async def _h_host(update, ctx):
+    q = update.callback_query
+    if q.message.chat.type == "private":
+        return await q.message.reply_text(
+            "Use /host in a group chat to start a session.",
+            reply_markup=back_button()
+        )
+    # Neue Session starten (hier darf jeder – es wird der neue Host)
+    return await host(_button_update(q), ctx)
+
+@ROUTER.route("h_train")
+async def _h_train(update, ctx):
+    # Training ist nicht sicherheitskritisch, darf jeder
+    return await train(_button_update(update.callback_query), ctx)
+
+# Ab hier: Buttons, die nur der Host einer laufenden Session drücken darf
+
+@ROUTER.route("h_call", require_host)
+async def _h_call(update, ctx, sid):
+    return await update.callback_query.message.reply_text(
+        "🔢 Host info:\n"
+        "Use the command `/call <number>` in this chat to enter the next number.\n"
+        "Example: `/call 42`.\n"
+        "Fell behind? Enter several at once: `/call 5 12 33 61`.\n\n"
+        "Always write the command *and* the number together.",
+        parse_mode="Markdown",
+        reply_markup=host_quick_keyboard()
+    )
 
-        if data == "h_call":
-            return await q.message.reply_text(
-                "🔢 Host info:\n"
-                "Use the command `/call <number>` in this chat to enter the next number.\n"
-                "Example: `/call 42`.\n\n"
-                "Always write the command *and* the number together.",
-                parse_mode="Markdown",
-                reply_markup=host_quick_keyboard()
-            )
+@ROUTER.route("h_call_batch", require_host)
+async def _h_call_batch(update, ctx, sid):
+    # Antwort auf diese Nachricht kommt auch bei Privacy-Mode beim Bot an
+    ctx.user_data.setdefault("awaiting_call_numbers", {})[_session_key(update)] = sid
+    return await update.callback_query.message.reply_text(
+        "🔢 Reply with all drawn numbers in order, separated by spaces.\n"
+        "Example: 5 12 33 61",
+        reply_markup=ForceReply(selective=True, input_field_placeholder="5 12 33 61")
+    )
 
-        if data == "h_status":
-            class DummyUpdate:
-                effective_chat = chat
-                message = q.message
-                effective_message = q.message
-            dummy = DummyUpdate()
-            return await status(dummy, ctx)
-
-        if data == "h_undo":
-            class DummyUpdate:
-                effective_chat = chat
-                effective_user = q.from_user
-                message = q.message
-                effective_message = q.message
-            dummy = DummyUpdate()
-            return await undo(dummy, ctx)
-
-        if data == "h_end":
-            class DummyUpdate:
-                effective_chat = chat
-                effective_user = q.from_user
-                message = q.message
-                effective_message = q.message
-            dummy = DummyUpdate()
-            return await end_session(dummy, ctx)
-
-    # ---------- Back to Start ----------
-    if data == "go_home":
-        await q.message.reply_text("🏠 Returning to main menu ...")
-        await q.message.reply_text("🎯 Player Panel", reply_markup=player_keyboard())
-        await q.message.reply_text("🛠 Host Panel", reply_markup=host_keyboard())
-        return
+@ROUTER.route("h_auto_start", require_host)
+@serialized
+async def _h_auto_start(update, ctx, sid):
+    q = update.callback_query
+    if ctx.application.job_queue is None:
+        return await q.message.reply_text("Auto-draw needs the JobQueue (python-telegram-bot[job-queue]).")
+    if sid in AUTO_DRAWS:
+        return await _auto_draw_control(q.message, ctx, sid, "resume")
+    return await _start_auto_draw(q.message, ctx, sid, AUTO_DRAW_INTERVAL)
+
+def _auto_route(action):
+    @serialized
+    async def handler(update, ctx, sid):
+        return await _auto_draw_control(update.callback_query.message, ctx, sid, action)
+    handler.__name__ = f"_h_auto_{action}"
+    return handler
+
+for _action in ("pause", "resume", "stop", "faster", "slower"):
+    ROUTER.route(f"h_auto_{_action}", require_host)(_auto_route(_action))
+
+@ROUTER.route("h_status", require_host)
+async def _h_status(update, ctx, sid):
+    return await status(_button_update(update.callback_query), ctx)
+
+@ROUTER.route("h_undo", require_host)
+async def _h_undo(update, ctx, sid):
+    return await undo(_button_update(update.callback_query), ctx)
+
+@ROUTER.route("h_end", require_host)
+async def _h_end(update, ctx, sid):
+    return await end_session(_button_update(update.callback_query), ctx)
+
+# ---------- Back to Start ----------
+
+@ROUTER.route("go_home")
+async def _go_home(update, ctx):
+    q = update.callback_query
+    await q.message.reply_text("🏠 Returning to main menu ...")
+    await q.message.reply_text("🎯 Player Panel", reply_markup=player_keyboard())
+    await q.message.reply_text("🛠 Host Panel", reply_markup=host_keyboard())
 
 # ---------- Admin/Test: resetall ----------
 
@@ -1424,6 +2333,11 @@ async def resetall(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     # --- In-Memory-State resetten ---
     global PENDING_BOARD_DATA
     PENDING_BOARD_DATA.clear()
+    for sid in list(AUTO_DRAWS):
+        _stop_auto_draw(sid)
+    _LIVE_SESSIONS.clear()
+    _SESSION_META.clear()
+    AUTO_JOIN.clear()  # db.reset_all() leert auch auto_join
 
     # Optionaler Wallet-Cache (falls definiert)
     try:
@@ -1450,16 +2364,159 @@ async def resetall(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     )
 
 
+# ---------- Metriken (nur mit METRICS_PORT) ----------
+
+def _timed_handler(fn):
+    """Handler-Laufzeit inkl. Warten auf den Session-Lock (Buttons pro Route misst der Router)."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(update, ctx):
+        t0 = time.perf_counter()
+        try:
+            return await fn(update, ctx)
+        except Exception:
+            metrics.inc("bingo_handler_errors_total", handler=name)
+            raise
+        finally:
+            metrics.observe("bingo_handler_seconds", time.perf_counter() - t0, handler=name)
+    return wrapper
+
+def _instrument_handlers(app: Application):
+    for group, handlers in app.handlers.items():
+        if group < 0:  # Mitschnitt/Namens-Cache, laufen vor jedem Update
+            continue
+        for handler in handlers:
+            handler.callback = _timed_handler(handler.callback)
+
+def _collect_live_metrics():
+    sessions, boards, players = db.get_live_counts()
+    st = OUTBOX.stats()
+    return (
+        metrics.format_metric("bingo_live_sessions", "gauge", "Sessions with status live", [({}, sessions)])
+        + metrics.format_metric("bingo_live_boards", "gauge", "Boards joined to live sessions", [({}, boards)])
+        + metrics.format_metric("bingo_live_players", "gauge", "Players in live sessions", [({}, players)])
+        + metrics.format_metric("bingo_auto_draws", "gauge", "Sessions with auto-draw running",
+                                [({}, sum(1 for a in AUTO_DRAWS.values() if not a["paused"]))])
+        + metrics.format_metric("bingo_outbox_queued", "gauge", "Outbound requests waiting or in flight",
+                                [({"lane": lane}, n) for lane, n in st["queued_by_lane"].items()])
+        + metrics.format_metric("bingo_outbox_max_queued", "gauge", "Highest outbound queue depth seen",
+                                [({}, st["max_queued"])])
+        + metrics.format_metric("bingo_outbox_requests_total", "counter", "Outbound requests by outcome",
+                                [({"outcome": k}, st[k]) for k in ("sent", "retries", "coalesced")])
+        + metrics.format_metric("bingo_outbox_chat_buckets", "gauge", "Per-chat token buckets",
+                                [({}, st["chat_buckets"])])
+    )
+
+def _collect_ocr_metrics():
+    """Histogramme aus ocr.py (ms-Werte als Sekunden), sobald OCR geladen ist."""
+    ocr = sys.modules.get("ocr")
+    if ocr is None:
+        return []
+    lines = []
+    stages = [(name.split(":", 1)[1], snap) for name, snap in ocr.profile_snapshot().items()
+              if name.startswith("stage_ms:")]
+    if stages:
+        lines += ["# HELP bingo_ocr_stage_seconds OCR pipeline stage duration",
+                  "# TYPE bingo_ocr_stage_seconds histogram"]
+        for stage, snap in stages:
+            lines += metrics.format_histogram("bingo_ocr_stage_seconds", [("stage", stage)], snap, scale=0.001)
+    for name, snap in ocr.profile_snapshot().items():
+        if name.startswith("stage_ms:"):
+            continue
+        if name.endswith("_ms"):
+            metric, scale = f"bingo_ocr_{name[:-3]}_seconds", 0.001
+        else:
+            metric, scale = f"bingo_ocr_{name}", 1.0
+        lines += [f"# HELP {metric} OCR {name}", f"# TYPE {metric} histogram"]
+        lines += metrics.format_histogram(metric, [], snap, scale=scale)
+    return lines
+
+def _setup_metrics(app: Application):
+    metrics.describe("bingo_handler_seconds", "histogram", "Update handler latency")
+    metrics.describe("bingo_handler_errors_total", "counter", "Handler exceptions")
+    metrics.describe("bingo_callback_route_seconds", "histogram", "Inline button latency per route")
+    metrics.describe("bingo_db_query_seconds", "histogram", "db.py function duration")
+    metrics.instrument_module(db, "bingo_db_query_seconds", skip=("conn", "init_db"))
+    _instrument_handlers(app)
+    metrics.register_collector(_collect_live_metrics)
+    metrics.register_collector(_collect_ocr_metrics)
+    metrics.start_server()
+
+
 # ---------- Main ----------
 
-def main():
-    print("✅ Bingo Bot starting …")
-    logging.info("Bootstrapping database & Telegram application …")
-    db.init_db()
+async def _record_update(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
+    """Gruppe -2 (nur mit UPDATE_LOG): rohes Update als JSON-Zeile anhängen."""
+    with open(UPDATE_LOG, "a", encoding="utf-8") as f:
+        f.write(json.dumps(update.to_dict(), ensure_ascii=False) + "\n")
+
+async def _post_init(app: Application):
+    """Läuft direkt vor dem ersten Update: Startup-Report + OCR vorwärmen."""
+    timings = app.bot_data.get("startup_timings", {})
+    now = time.perf_counter()
+    timings["telegram_init"] = now - timings.pop("_t_built", now)
+    logger.info(
+        "Startup: imports %.0f ms | db init %.0f ms | handlers %.0f ms | "
+        "telegram init %.0f ms | ready for updates after %.0f ms",
+        timings.get("imports", 0) * 1000, timings.get("db_init", 0) * 1000,
+        timings.get("handlers", 0) * 1000, timings["telegram_init"] * 1000,
+        (now - _T_START) * 1000,
+    )
+    if OCR_PRELOAD:
+        threading.Thread(target=_ocr, name="ocr-preload", daemon=True).start()
+
+async def _post_shutdown(app: Application):
+    """Nach dem Stoppen (SIGINT/SIGTERM, laufende Handler sind fertig): Outbox-Bilanz loggen."""
+    logger.info(f"Shutdown complete, outbox: {OUTBOX.stats()}")
+
+
+def _check_webhook_url():
+    """
+    Ohne WEBHOOK_URL baut PTB die URL aus WEBHOOK_LISTEN/PORT/PATH (z.B. 127.0.0.1:8080) –
+    das lehnt die echte Bot API bei setWebhook ab. Nur gegen einen lokalen
+    Bot-API-Server (TELEGRAM_BASE_URL auf localhost) ist das brauchbar.
+    """
+    if WEBHOOK_URL:
+        return
+    host = urlsplit(TELEGRAM_BASE_URL).hostname if TELEGRAM_BASE_URL else None
+    if host in ("localhost", "::1") or (host or "").startswith("127."):
+        logger.warning(f"WEBHOOK_URL not set – registering http://{WEBHOOK_LISTEN}:{WEBHOOK_PORT}/{WEBHOOK_PATH} "
+                       f"with the local Bot API at {TELEGRAM_BASE_URL}")
+        return
+    raise SystemExit(
+        "BOT_MODE=webhook needs WEBHOOK_URL (public https URL incl. path, e.g. "
+        f"https://bot.example.com/{WEBHOOK_PATH}). Without it Telegram would be asked to call "
+        f"{WEBHOOK_LISTEN}:{WEBHOOK_PORT}, which it rejects. Set WEBHOOK_URL or use BOT_MODE=polling."
+    )
+
+def build_application(token=TOKEN, base_url=TELEGRAM_BASE_URL, timings=None) -> Application:
+    """
+    Application mit allen Handlern und Jobs, wie main() sie startet. Ohne Netz
+    testbar: base_url auf einen lokalen Bot-API-Server zeigen lassen (loadtest.py).
+    """
+    timings = {} if timings is None else timings
+    t0 = time.perf_counter()
+    builder = (
+        Application.builder().token(token).rate_limiter(OUTBOX)
+        .concurrent_updates(CONCURRENT_UPDATES if CONCURRENT_UPDATES > 1 else False)
+        .post_init(_post_init).post_shutdown(_post_shutdown)
+    )
+    if base_url:
+        base_url = base_url.rstrip("/")
+        builder = builder.base_url(f"{base_url}/bot").base_file_url(f"{base_url}/file/bot")
+    app = builder.build()
+    app.bot_data["startup_timings"] = timings
 
-    app = Application.builder().token(TOKEN).build()
+    AUTO_JOIN.clear()
+    for chat_id, users in db.load_auto_join().items():
+        AUTO_JOIN[chat_id] = users
+
+    if UPDATE_LOG:
+        app.add_handler(TypeHandler(Update, _record_update), group=-2)
 
     # Commands
+    app.add_handler(TypeHandler(Update, _capture_user), group=-1)
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CommandHandler("templ_status", templ_status))
     app.add_handler(CommandHandler("addboard", addboard))
@@ -1469,6 +2526,7 @@ def main():
     app.add_handler(CommandHandler("host", host))
     app.add_handler(CommandHandler("join", join))
     app.add_handler(CommandHandler("call", call_number))
+    app.add_handler(CommandHandler("autodraw", autodraw))
     app.add_handler(CommandHandler("undo", undo))
     app.add_handler(CommandHandler("end", end_session))
     app.add_handler(CommandHandler("train", train))
@@ -1479,6 +2537,7 @@ def main():
     # Image + Document Handlers
     app.add_handler(MessageHandler(filters.PHOTO, handle_photo))
     app.add_handler(MessageHandler(filters.Document.IMAGE, handle_document_image))
+    app.add_handler(MessageHandler(filters.Document.ZIP, handle_document_zip))
 
     # Text-Handler für Card Number + Board-Text + Wallet
     app.add_handler(
@@ -1491,8 +2550,55 @@ def main():
     # Buttons
     app.add_handler(CallbackQueryHandler(on_button))
 
-    print("🤖 Running KasBots Bingo Helper …")
-    app.run_polling(poll_interval=1.0, drop_pending_updates=True)
+    # Hintergrund-Jobs für die Upload-Ablage
+    if app.job_queue is None:
+        logger.warning("JobQueue not available (pip install 'python-telegram-bot[job-queue]') – upload pruning disabled")
+    else:
+        app.job_queue.run_once(_migrate_legacy_uploads_job, when=10)
+        if uploads.UPLOAD_AUDIT:
+            app.job_queue.run_repeating(_prune_uploads_job, interval=uploads.UPLOAD_PRUNE_INTERVAL, first=30)
+
+    if metrics.ENABLED:
+        _setup_metrics(app)
+
+    timings["handlers"] = time.perf_counter() - t0
+    timings["_t_built"] = time.perf_counter()
+
+    return app
+
+
+def main():
+    print("✅ Bingo Bot starting …")
+    if BOT_MODE == "webhook":
+        _check_webhook_url()  # vor DB/Netz: Fehlkonfiguration sofort melden
+    logging.info("Bootstrapping database & Telegram application …")
+    timings = {"imports": _T_IMPORTED - _T_START}
+
+    t0 = time.perf_counter()
+    db.init_db(legacy_thread_id=BINGO_TOPIC_ID or 0, legacy_chat_id=BINGO_CHAT_ID)
+    timings["db_init"] = time.perf_counter() - t0
+
+    app = build_application(timings=timings)
+
+    if BOT_MODE == "webhook":
+        secret = WEBHOOK_SECRET or secrets.token_urlsafe(32)
+        if not WEBHOOK_SECRET:
+            logger.warning("WEBHOOK_SECRET not set – using a random secret for this run")
+        print(f"🤖 Running KasBots Bingo Helper (webhook on {WEBHOOK_LISTEN}:{WEBHOOK_PORT}/{WEBHOOK_PATH}) …")
+        app.run_webhook(
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            url_path=WEBHOOK_PATH,
+            webhook_url=WEBHOOK_URL,
+            secret_token=secret,
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+            drop_pending_updates=True,
+        )
+    else:
+        if BOT_MODE != "polling":
+            logger.warning(f"Unknown BOT_MODE={BOT_MODE!r}, falling back to polling")
+        print("🤖 Running KasBots Bingo Helper …")
+        app.run_polling(poll_interval=POLL_INTERVAL, drop_pending_updates=True)
 
 
 if __name__ == "__main__":
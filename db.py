@@ -6,7 +6,12 @@ from typing import List, Optional
 DB_PATH = os.getenv("DB_PATH", "storage/sqlite.db")
 
 
-def init_db():
+def init_db(legacy_thread_id: int = 0, legacy_chat_id: int = None):
+    """
+    Legt Tabellen an bzw. migriert sie. legacy_thread_id: Topic, in dem bestehende
+    Sessions von legacy_chat_id liefen, bevor Sessions pro Topic getrennt wurden
+    (alte BINGO_TOPIC_ID in BINGO_CHAT_ID). Sessions anderer Chats bleiben bei Topic 0.
+    """
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
     with closing(sqlite3.connect(DB_PATH)) as con:
         cur = con.cursor()
@@ -15,7 +20,11 @@ def init_db():
 
         CREATE TABLE IF NOT EXISTS users(
           user_id INTEGER PRIMARY KEY,
-          wallet TEXT
+          wallet TEXT,
+          username TEXT,
+          first_name TEXT,
+          last_name TEXT,
+          name_updated_at TIMESTAMP
         );
 
         CREATE TABLE IF NOT EXISTS boards(
@@ -34,6 +43,7 @@ def init_db():
         CREATE TABLE IF NOT EXISTS sessions(
           session_id INTEGER PRIMARY KEY AUTOINCREMENT,
           chat_id INTEGER NOT NULL,
+          thread_id INTEGER NOT NULL DEFAULT 0,
           host_user_id INTEGER NOT NULL,
           pattern TEXT DEFAULT 'standard',
           status TEXT CHECK(status IN('live','ended')) DEFAULT 'live',
@@ -70,12 +80,51 @@ def init_db():
           last_played TIMESTAMP
         );
 
+        CREATE TABLE IF NOT EXISTS media_cache(
+          sha256 TEXT PRIMARY KEY,
+          file_id TEXT NOT NULL,
+          path TEXT,
+          updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS auto_join(
+          chat_id INTEGER, user_id INTEGER,
+          created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+          PRIMARY KEY(chat_id, user_id)
+        ) WITHOUT ROWID;
+
         CREATE INDEX IF NOT EXISTS idx_draws_session ON draws(session_id);
         CREATE INDEX IF NOT EXISTS idx_bn_board    ON board_numbers(board_id);
+        CREATE INDEX IF NOT EXISTS idx_boards_user ON boards(user_id);
         """)
+
+        # Migrationen für bestehende Datenbanken
+        _add_missing_columns(cur, "users", [
+            ("username", "TEXT"), ("first_name", "TEXT"),
+            ("last_name", "TEXT"), ("name_updated_at", "TIMESTAMP"),
+        ])
+        # Sessions pro Forum-Topic (0 = kein Topic)
+        added = _add_missing_columns(cur, "sessions", [("thread_id", "INTEGER NOT NULL DEFAULT 0")])
+        if added and legacy_thread_id and legacy_chat_id is not None:
+            # bisher lief der Bingo-Chat in einem Topic (BINGO_TOPIC_ID) -> seine Sessions dorthin
+            cur.execute("UPDATE sessions SET thread_id=? WHERE chat_id=?", (legacy_thread_id, legacy_chat_id))
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sessions_live ON sessions(chat_id, thread_id) WHERE status='live'"
+        )
         con.commit()
 
 
+def _add_missing_columns(cur, table: str, columns):
+    """ALTER TABLE ... ADD COLUMN für alle Spalten, die in `table` noch fehlen; gibt die neuen zurück."""
+    have = {row[1] for row in cur.execute(f"PRAGMA table_info({table})")}
+    added = []
+    for name, decl in columns:
+        if name not in have:
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+            added.append(name)
+    return added
+
+
 def conn():
     return sqlite3.connect(DB_PATH)
 
@@ -111,6 +160,43 @@ def get_user_wallet(user_id: int) -> Optional[str]:
         return row[0] if row else None
 
 
+def upsert_user_names(rows):
+    """
+    Speichert Username/Vor-/Nachname aus eingehenden Updates.
+    rows = [(user_id, username, first_name, last_name), ...]
+    """
+    with conn() as con:
+        con.executemany(
+            """
+            INSERT INTO users(user_id, username, first_name, last_name, name_updated_at)
+            VALUES(?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(user_id) DO UPDATE SET
+              username=excluded.username,
+              first_name=excluded.first_name,
+              last_name=excluded.last_name,
+              name_updated_at=excluded.name_updated_at
+            """,
+            rows
+        )
+
+
+def get_user_names(user_ids) -> dict:
+    """{user_id: (username, first_name, last_name)} für alle IDs mit bekanntem Namen."""
+    ids = list(user_ids)
+    out = {}
+    with conn() as con:
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            cur = con.execute(
+                f"SELECT user_id, username, first_name, last_name FROM users "
+                f"WHERE user_id IN ({','.join('?' * len(chunk))}) "
+                f"AND (username IS NOT NULL OR first_name IS NOT NULL)",
+                chunk
+            )
+            out.update({row[0]: tuple(row[1:]) for row in cur.fetchall()})
+    return out
+
+
 # --- Boards -------------------------------------------------------------
 
 def create_board(
@@ -146,6 +232,29 @@ def save_board_numbers(board_id: int, grid):
                 )
 
 
+def create_boards(user_id: int, boards) -> List[int]:
+    """
+    Legt mehrere Boards in einer Transaktion an (Bulk-Import).
+    boards = [(token_id, grid), ...]; Rückgabe: neue board_ids in derselben Reihenfolge.
+    """
+    ids = []
+    with conn() as con:
+        cur = con.cursor()
+        for token_id, grid in boards:
+            cur.execute(
+                "INSERT INTO boards(user_id, token_id, has_free_center) VALUES(?,?,1)",
+                (user_id, token_id)
+            )
+            bid = cur.lastrowid
+            cur.executemany(
+                "INSERT OR REPLACE INTO board_numbers(board_id,r,c,val) VALUES(?,?,?,?)",
+                [(bid, r, c, None if grid[r][c] is None else int(grid[r][c]))
+                 for r in range(5) for c in range(5)]
+            )
+            ids.append(bid)
+    return ids
+
+
 def get_user_board_ids(user_id: int) -> List[int]:
     with conn() as con:
         cur = con.cursor()
@@ -234,34 +343,36 @@ def delete_all_boards(user_id: int) -> int:
 
 # --- Sessions -----------------------------------------------------------
 
-def create_session(chat_id: int, host_user_id: int, pattern: str = 'standard') -> int:
+def create_session(chat_id: int, host_user_id: int, pattern: str = 'standard', thread_id: int = 0) -> int:
     with conn() as con:
         cur = con.cursor()
         cur.execute(
-            "INSERT INTO sessions(chat_id,host_user_id,pattern,status) VALUES(?,?,?, 'live')",
-            (chat_id, host_user_id, pattern)
+            "INSERT INTO sessions(chat_id,thread_id,host_user_id,pattern,status) VALUES(?,?,?,?, 'live')",
+            (chat_id, thread_id or 0, host_user_id, pattern)
         )
         return cur.lastrowid
 
 
-def get_live_session(chat_id: int) -> Optional[int]:
+def get_live_session(chat_id: int, thread_id: int = 0) -> Optional[int]:
+    """Neueste laufende Session in diesem Chat/Topic (thread_id 0 = kein Topic)."""
     with conn() as con:
         cur = con.cursor()
         cur.execute(
-            "SELECT session_id FROM sessions WHERE chat_id=? AND status='live' "
+            "SELECT session_id FROM sessions WHERE chat_id=? AND thread_id=? AND status='live' "
             "ORDER BY session_id DESC LIMIT 1",
-            (chat_id,)
+            (chat_id, thread_id or 0)
         )
         row = cur.fetchone()
         return row[0] if row else None
 
 
-def get_session_host(session_id: int) -> Optional[int]:
+def get_session_meta(session_id: int):
+    """(chat_id, thread_id, host_user_id, pattern) oder None."""
     with conn() as con:
-        cur = con.cursor()
-        cur.execute("SELECT host_user_id FROM sessions WHERE session_id=?", (session_id,))
-        row = cur.fetchone()
-        return row[0] if row else None
+        return con.execute(
+            "SELECT chat_id, thread_id, host_user_id, pattern FROM sessions WHERE session_id=?",
+            (session_id,)
+        ).fetchone()
 
 
 def add_player(session_id: int, user_id: int):
@@ -280,11 +391,40 @@ def add_session_board(session_id: int, board_id: int):
         )
 
 
-def get_session_board_ids(session_id: int) -> List[int]:
+def load_session_boards(session_id: int) -> dict:
+    """{board_id: (owner, grid)} aller Boards der Session – ein Query statt load_board pro Board."""
     with conn() as con:
-        cur = con.cursor()
-        cur.execute("SELECT board_id FROM session_boards WHERE session_id=?", (session_id,))
-        return [r[0] for r in cur.fetchall()]
+        cur = con.execute(
+            """
+            SELECT sb.board_id, b.user_id, bn.r, bn.c, bn.val
+              FROM session_boards sb
+              JOIN boards b ON b.board_id = sb.board_id
+              LEFT JOIN board_numbers bn ON bn.board_id = sb.board_id
+             WHERE sb.session_id = ?
+            """,
+            (session_id,)
+        )
+        boards = {}
+        for bid, owner, r, c, v in cur.fetchall():
+            if bid not in boards:
+                boards[bid] = (owner, [[None] * 5 for _ in range(5)])
+            if r is not None:
+                boards[bid][1][r][c] = v
+        return boards
+
+
+def get_live_counts():
+    """(laufende Sessions, Boards und Spieler darin) – für Metriken."""
+    with conn() as con:
+        return con.execute(
+            """
+            SELECT (SELECT COUNT(*) FROM sessions WHERE status='live'),
+                   (SELECT COUNT(*) FROM session_boards sb
+                      JOIN sessions s ON s.session_id = sb.session_id WHERE s.status='live'),
+                   (SELECT COUNT(*) FROM session_players sp
+                      JOIN sessions s ON s.session_id = sp.session_id WHERE s.status='live')
+            """
+        ).fetchone()
 
 
 def count_players(session_id: int) -> int:
@@ -308,40 +448,39 @@ def end_session(session_id: int):
         con.execute("UPDATE sessions SET status='ended' WHERE session_id=?", (session_id,))
 
 
-def get_pattern(session_id: int) -> str:
-    with conn() as con:
-        return con.execute(
-            "SELECT pattern FROM sessions WHERE session_id=?",
-            (session_id,)
-        ).fetchone()[0]
-
-
 # --- Draws & Claims -----------------------------------------------------
 
-def draw_exists(session_id: int, number: int) -> bool:
-    with conn() as con:
-        row = con.execute(
-            "SELECT 1 FROM draws WHERE session_id=? AND number=?",
-            (session_id, number)
-        ).fetchone()
-        return bool(row)
-
-
-def next_draw_index(session_id: int) -> int:
+def insert_draws(session_id: int, numbers) -> List[tuple]:
+    """
+    Mehrere gezogene Zahlen in einer Transaktion anhängen (fortlaufende idx).
+    Schon gezogene Zahlen werden übersprungen. Rückgabe: [(idx, number)] der neuen Draws.
+    """
     with conn() as con:
-        row = con.execute(
-            "SELECT COALESCE(MAX(idx),0)+1 FROM draws WHERE session_id=?",
-            (session_id,)
-        ).fetchone()
-        return row[0]
+        cur = con.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        drawn = {r[0] for r in cur.execute("SELECT number FROM draws WHERE session_id=?", (session_id,))}
+        idx = cur.execute(
+            "SELECT COALESCE(MAX(idx),0) FROM draws WHERE session_id=?", (session_id,)
+        ).fetchone()[0]
+        rows = []
+        for n in numbers:
+            if n in drawn:
+                continue
+            drawn.add(n)
+            idx += 1
+            rows.append((idx, n))
+        cur.executemany(
+            "INSERT INTO draws(session_id,idx,number) VALUES(?,?,?)",
+            [(session_id, i, n) for i, n in rows]
+        )
+        return rows
 
 
-def insert_draw(session_id: int, number: int, idx: int):
+def get_draw_order(session_id: int) -> dict:
+    """{number: idx} aller Draws der Session."""
     with conn() as con:
-        con.execute(
-            "INSERT INTO draws(session_id,idx,number) VALUES(?,?,?)",
-            (session_id, idx, number)
-        )
+        cur = con.execute("SELECT number, idx FROM draws WHERE session_id=?", (session_id,))
+        return dict(cur.fetchall())
 
 
 def get_drawn_numbers(session_id: int) -> List[int]:
@@ -367,20 +506,36 @@ def delete_draw(session_id: int, idx: int):
         con.execute("DELETE FROM draws WHERE session_id=? AND idx=?", (session_id, idx))
 
 
-def claim_exists(session_id: int, board_id: int) -> bool:
+def get_claimed_board_ids(session_id: int) -> set:
     with conn() as con:
-        row = con.execute(
-            "SELECT 1 FROM claims WHERE session_id=? AND board_id=?",
-            (session_id, board_id)
-        ).fetchone()
-        return bool(row)
+        cur = con.execute("SELECT board_id FROM claims WHERE session_id=?", (session_id,))
+        return {row[0] for row in cur.fetchall()}
 
 
-def insert_claim(session_id: int, board_id: int, user_id: int, pattern: str):
+def insert_claims(session_id: int, claims, pattern: str):
+    """
+    claims = [(board_id, user_id)] – Claims eintragen und Bingos zählen, in einer
+    Transaktion.
+    """
     with conn() as con:
-        con.execute(
-            "INSERT OR IGNORE INTO claims(session_id,board_id,user_id,pattern) VALUES(?,?,?,?)",
-            (session_id, board_id, user_id, pattern)
+        cur = con.cursor()
+        new = []
+        for bid, owner in claims:
+            cur.execute(
+                "INSERT OR IGNORE INTO claims(session_id,board_id,user_id,pattern) VALUES(?,?,?,?)",
+                (session_id, bid, owner, pattern)
+            )
+            if cur.rowcount:
+                new.append(owner)
+        cur.executemany("INSERT OR IGNORE INTO user_stats(user_id) VALUES(?)", [(o,) for o in set(new)])
+        cur.executemany(
+            """
+            UPDATE user_stats
+               SET total_bingos = total_bingos + 1,
+                   last_played = CURRENT_TIMESTAMP
+             WHERE user_id = ?
+            """,
+            [(o,) for o in new]
         )
 
 
@@ -409,20 +564,6 @@ def bump_participation(session_id: int, user_id: int, boards_joined: int):
         )
 
 
-def bump_bingo(user_id: int):
-    ensure_user_stats(user_id)
-    with conn() as con:
-        con.execute(
-            """
-            UPDATE user_stats
-               SET total_bingos = total_bingos + 1,
-                   last_played = CURRENT_TIMESTAMP
-             WHERE user_id = ?
-            """,
-            (user_id,)
-        )
-
-
 def get_leaderboard(order_by: str = "total_bingos", limit: int = 10):
     if order_by not in ("total_bingos", "total_boards_joined", "total_sessions"):
         order_by = "total_bingos"
@@ -456,6 +597,97 @@ def get_user_stats_row(user_id: int):
         return cur.fetchone()
 
 
+# --- Media-Cache (Telegram file_ids) ------------------------------------
+
+def get_media_file_id(sha256: str) -> Optional[str]:
+    """file_id eines schon hochgeladenen Bildes mit diesem Inhalt (sha256)."""
+    with conn() as con:
+        cur = con.execute("SELECT file_id FROM media_cache WHERE sha256=?", (sha256,))
+        row = cur.fetchone()
+        return row[0] if row else None
+
+
+def set_media_file_id(sha256: str, file_id: str, path: str = None):
+    with conn() as con:
+        con.execute(
+            """
+            INSERT INTO media_cache(sha256, file_id, path, updated_at)
+            VALUES(?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(sha256) DO UPDATE SET
+              file_id=excluded.file_id,
+              path=excluded.path,
+              updated_at=excluded.updated_at
+            """,
+            (sha256, file_id, path)
+        )
+
+
+def delete_media_file_id(sha256: str):
+    with conn() as con:
+        con.execute("DELETE FROM media_cache WHERE sha256=?", (sha256,))
+
+
+# --- Auto-Join ----------------------------------------------------------
+
+def load_auto_join() -> dict:
+    """{chat_id: set(user_id)} – Spiegel für bot.AUTO_JOIN beim Start."""
+    with conn() as con:
+        result = {}
+        for chat_id, user_id in con.execute("SELECT chat_id, user_id FROM auto_join"):
+            result.setdefault(chat_id, set()).add(user_id)
+        return result
+
+
+def set_auto_join(chat_id: int, user_id: int, enabled: bool):
+    with conn() as con:
+        if enabled:
+            con.execute("INSERT OR IGNORE INTO auto_join(chat_id, user_id) VALUES(?,?)", (chat_id, user_id))
+        else:
+            con.execute("DELETE FROM auto_join WHERE chat_id=? AND user_id=?", (chat_id, user_id))
+
+
+def auto_join_session(session_id: int, chat_id: int):
+    """
+    Trägt alle Auto-Join-Nutzer des Chats mit allen Boards in die Session ein und
+    zählt ihre Teilnahme (wie add_player/add_session_board/bump_participation pro
+    Nutzer, aber mengenbasiert in einer Transaktion). Rückgabe: (Spieler, Boards).
+    """
+    with conn() as con:
+        cur = con.cursor()
+        cur.execute(
+            "INSERT OR IGNORE INTO session_players(session_id, user_id) "
+            "SELECT ?, user_id FROM auto_join WHERE chat_id=?",
+            (session_id, chat_id)
+        )
+        players = cur.rowcount
+        cur.execute(
+            """
+            INSERT OR IGNORE INTO session_boards(session_id, board_id)
+            SELECT ?, b.board_id
+              FROM auto_join a JOIN boards b ON b.user_id = a.user_id
+             WHERE a.chat_id = ?
+            """,
+            (session_id, chat_id)
+        )
+        boards = cur.rowcount
+        cur.execute(
+            "INSERT OR IGNORE INTO user_stats(user_id) SELECT user_id FROM auto_join WHERE chat_id=?",
+            (chat_id,)
+        )
+        cur.execute(
+            """
+            UPDATE user_stats
+               SET total_sessions = total_sessions + 1,
+                   total_boards_joined = total_boards_joined
+                       + (SELECT COUNT(*) FROM boards b WHERE b.user_id = user_stats.user_id),
+                   last_played = CURRENT_TIMESTAMP
+             WHERE user_id IN (SELECT user_id FROM auto_join WHERE chat_id = ?)
+            """,
+            (chat_id,)
+        )
+        return players, boards
+
+
 # --- Reset für Tests ----------------------------------------------------
 
 def reset_all():
@@ -476,6 +708,7 @@ def reset_all():
         DELETE FROM boards;
         DELETE FROM user_stats;
         DELETE FROM users;
+        DELETE FROM auto_join;
         """)
         # AutoIncrement-Zähler zurücksetzen (nur SQLite, falls sqlite_sequence existiert)
         try:
@@ -0,0 +1,329 @@
+"""
+Lokaler Ersatz für die Telegram Bot API (nur stdlib) – für Last- und Offline-Tests.
+
+    api = FakeBotAPI(token).start()          # http://127.0.0.1:<port>
+    app = bot.build_application(token, base_url=api.url)
+    api.push_update({"message": {...}})      # landet beim nächsten getUpdates
+
+Kann getMe, getUpdates (Long-Polling), send*/edit*/answerCallbackQuery, getFile
+plus Datei-Download (add_file) und beantwortet alles andere mit ok/true.
+Jeder Bot-Call wird mitgeschrieben; der erste Call, der sich auf ein
+eingespieltes Update bezieht, schließt es ab (Antwortzeit = Ende-zu-Ende-Latenz):
+
+  * Callback-Query  -> answerCallbackQuery mit derselben id
+  * Nachricht       -> send* als Antwort auf genau diese Nachricht, sonst der
+                       erste send* in denselben Chat (private Chats ohne Zitat)
+"""
+import json
+import logging
+import threading
+import time
+from collections import Counter, deque
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+logger = logging.getLogger("bingo-bot.fake-api")
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Bingo Bot", "username": "bingo_test_bot",
+            "can_join_groups": True, "can_read_all_group_messages": False, "supports_inline_queries": False}
+
+_SEND_METHODS = ("sendMessage", "sendPhoto", "sendDocument", "sendAnimation", "sendSticker", "copyMessage")
+
+
+def chat_for(chat_id: int) -> dict:
+    """Positive IDs sind Privat-Chats, negative Supergruppen (wie bei Telegram)."""
+    if chat_id > 0:
+        return {"id": chat_id, "type": "private", "first_name": f"User {chat_id}"}
+    return {"id": chat_id, "type": "supergroup", "title": f"Group {chat_id}"}
+
+
+def _parse_body(content_type: str, body: bytes) -> dict:
+    """JSON, urlencoded oder multipart (sendPhoto mit Datei); verschachtelte Felder sind JSON-Strings."""
+    if not body:
+        return {}
+    if content_type.startswith("application/json"):
+        return json.loads(body)
+    if content_type.startswith("multipart/form-data"):
+        msg = BytesParser(policy=HTTP).parsebytes(
+            b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body
+        )
+        params = {}
+        for part in msg.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if part.get_filename():
+                params[name] = {"filename": part.get_filename(), "size": len(part.get_payload(decode=True) or b"")}
+            else:
+                params[name] = part.get_content()
+        return _decode_fields(params)
+    return _decode_fields(dict(parse_qsl(body.decode("utf-8"), keep_blank_values=True)))
+
+
+def _decode_fields(params: dict) -> dict:
+    for key, value in params.items():
+        if isinstance(value, str) and value[:1] in "{[":
+            try:
+                params[key] = json.loads(value)
+            except ValueError:
+                pass
+    return params
+
+
+class FakeBotAPI:
+    def __init__(self, token: str, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        self.token = token
+        self.latency = latency  # künstliche Antwortzeit pro Call (Sekunden)
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+        self._cond = threading.Condition()
+        self._updates = deque()  # noch nicht abgeholt
+        self._next_update_id = 1
+        self._next_message_id = 1_000_000
+        self._files = {}  # file_id -> (file_path, bytes)
+
+        self.calls = Counter()   # method -> Anzahl
+        self.errors = Counter()  # method -> 4xx-Antworten
+        self.log = []            # (t, method, params) – nur mit record_calls
+        self.record_calls = False
+        self._pending = {}       # ("cb", id) / ("msg", chat_id, message_id) -> (update_id, kind, t_push)
+        self._pending_chat = {}  # chat_id -> deque[("msg", chat_id, message_id)]
+        self.results = []        # (update_id, kind, latency_s)
+
+    # ---------- Steuerung ----------
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-bot-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._cond.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def add_file(self, file_id: str, data: bytes, file_path: str = None):
+        self._files[file_id] = (file_path or f"photos/{file_id}.jpg", data)
+
+    def next_message_id(self) -> int:
+        with self._cond:
+            self._next_message_id += 1
+            return self._next_message_id
+
+    def push_update(self, update: dict, kind: str = None) -> int:
+        """Update einreihen; kind gruppiert die Latenzen im Report (z.B. "join", "call")."""
+        with self._cond:
+            update_id = self._next_update_id
+            self._next_update_id += 1
+            update = dict(update, update_id=update_id)
+            now = time.perf_counter()
+            if "callback_query" in update:
+                key = ("cb", str(update["callback_query"]["id"]))
+                self._pending[key] = (update_id, kind or "callback", now)
+            elif "message" in update:
+                msg = update["message"]
+                key = ("msg", msg["chat"]["id"], msg["message_id"])
+                self._pending[key] = (update_id, kind or "message", now)
+                self._pending_chat.setdefault(msg["chat"]["id"], deque()).append(key)
+            self._updates.append(update)
+            self._cond.notify_all()
+        return update_id
+
+    def pending(self, kind: str = None) -> int:
+        with self._cond:
+            if kind is None:
+                return len(self._pending)
+            return sum(1 for _, k, _ in self._pending.values() if k == kind)
+
+    def queued(self) -> int:
+        with self._cond:
+            return len(self._updates)
+
+    def drop_pending(self):
+        """Unbeantwortete Updates als (update_id, kind) zurückgeben und vergessen."""
+        with self._cond:
+            left = [(uid, kind) for uid, kind, _ in self._pending.values()]
+            self._pending.clear()
+            self._pending_chat.clear()
+        return left
+
+    # ---------- Abgleich Update -> erste Antwort ----------
+
+    def _resolve(self, key):
+        entry = self._pending.pop(key, None)
+        if entry is None:
+            return
+        update_id, kind, t_push = entry
+        self.results.append((update_id, kind, time.perf_counter() - t_push))
+        if key[0] == "msg":
+            queue = self._pending_chat.get(key[1])
+            if queue is not None:
+                try:
+                    queue.remove(key)
+                except ValueError:
+                    pass
+
+    def _match(self, method, params):
+        with self._cond:
+            if method == "answerCallbackQuery":
+                self._resolve(("cb", str(params.get("callback_query_id"))))
+                return
+            if not method.startswith(_SEND_METHODS):
+                return
+            try:
+                chat_id = int(params.get("chat_id"))
+            except (TypeError, ValueError):
+                return
+            reply = params.get("reply_parameters") or {}
+            reply_to = reply.get("message_id") if isinstance(reply, dict) else None
+            reply_to = reply_to or params.get("reply_to_message_id")
+            if reply_to is not None and ("msg", chat_id, int(reply_to)) in self._pending:
+                self._resolve(("msg", chat_id, int(reply_to)))
+                return
+            queue = self._pending_chat.get(chat_id)
+            if queue:
+                self._resolve(queue[0])
+
+    # ---------- Bot-API-Methoden ----------
+
+    def _message(self, params, **extra):
+        chat_id = params.get("chat_id")
+        try:
+            chat = chat_for(int(chat_id))
+        except (TypeError, ValueError):
+            chat = {"id": -1, "type": "channel", "title": str(chat_id)}
+        msg = {"message_id": self.next_message_id(), "date": int(time.time()), "chat": chat, "from": BOT_USER}
+        msg.update(extra)
+        return msg
+
+    def _get_updates(self, params):
+        offset = int(params.get("offset") or 0)
+        timeout = float(params.get("timeout") or 0)
+        limit = int(params.get("limit") or 100)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._updates and self._updates[0]["update_id"] < offset:
+                self._updates.popleft()
+            while not self._updates:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return []
+                self._cond.wait(left)
+            return [self._updates[i] for i in range(min(limit, len(self._updates)))]
+
+    def call(self, method: str, params: dict):
+        """(ok, result oder Fehlertext) – die eigentliche Fake-Logik, ohne HTTP."""
+        self.calls[method] += 1
+        if self.record_calls:
+            self.log.append((time.perf_counter(), method, params))
+        if self.latency and method != "getUpdates":
+            time.sleep(self.latency)
+
+        if method == "getMe":
+            return True, BOT_USER
+        if method == "getUpdates":
+            return True, self._get_updates(params)
+        if method in ("deleteWebhook", "setWebhook", "answerCallbackQuery", "setMyCommands",
+                      "deleteMessage", "sendChatAction", "close", "logOut"):
+            self._match(method, params)
+            return True, True
+        if method in _SEND_METHODS and params.get("chat_id") in (None, ""):
+            return False, "Bad Request: chat_id is empty"
+        if method == "sendMessage":
+            if not params.get("text"):
+                return False, "Bad Request: message text is empty"
+            self._match(method, params)
+            return True, self._message(params, text=params["text"])
+        if method == "sendPhoto":
+            self._match(method, params)
+            file_id = f"photo{self.next_message_id()}"
+            photo = [{"file_id": file_id, "file_unique_id": file_id, "width": 640, "height": 640}]
+            return True, self._message(params, photo=photo, caption=params.get("caption"))
+        if method.startswith("send") or method == "copyMessage":
+            self._match(method, params)
+            return True, self._message(params)
+        if method.startswith("edit"):
+            if params.get("inline_message_id"):
+                return True, True
+            return True, self._message(params, text=params.get("text") or "")
+        if method == "getFile":
+            file_id = params.get("file_id")
+            if file_id not in self._files:
+                return False, "Bad Request: invalid file_id"
+            path, data = self._files[file_id]
+            return True, {"file_id": file_id, "file_unique_id": file_id, "file_size": len(data), "file_path": path}
+        if method == "getChatMember":
+            user = {"id": int(params.get("user_id") or 0), "is_bot": False, "first_name": f"User {params.get('user_id')}"}
+            return True, {"status": "member", "user": user}
+        if method == "getChat":
+            return True, chat_for(int(params.get("chat_id") or 0))
+        return True, True
+
+    def _handler_class(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client hat aufgegeben (z.B. getUpdates-Timeout beim Stoppen)
+
+            def _method(self):
+                parts = unquote(urlsplit(self.path).path).strip("/").split("/")
+                if len(parts) == 2 and parts[0] == f"bot{api.token}":
+                    return parts[1]
+                return None
+
+            def do_POST(self):
+                method = self._method()
+                if method is None:
+                    return self._reply(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                try:
+                    params = _parse_body(self.headers.get("Content-Type", ""), body)
+                    params.update(parse_qsl(urlsplit(self.path).query))
+                except Exception as e:
+                    api.errors[method] += 1
+                    return self._reply(400, {"ok": False, "error_code": 400, "description": f"Bad Request: {e}"})
+                ok, result = api.call(method, params)
+                if not ok:
+                    api.errors[method] += 1
+                    return self._reply(400, {"ok": False, "error_code": 400, "description": result})
+                self._reply(200, {"ok": True, "result": result})
+
+            def do_GET(self):
+                # Datei-Downloads: GET /file/bot<token>/<file_path>
+                prefix = f"/file/bot{api.token}/"
+                path = unquote(urlsplit(self.path).path)
+                if not path.startswith(prefix):
+                    return self.do_POST()
+                data = next((d for p, d in api._files.values() if p == path[len(prefix):]), None)
+                if data is None:
+                    return self._reply(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
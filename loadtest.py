@@ -0,0 +1,285 @@
+"""
+Lasttest des Bots gegen einen lokalen Fake der Bot API – komplett offline.
+
+    python loadtest.py [--players 500] [--groups 1] [--calls 40] [--call-interval 0.1]
+                       [--storm 1000] [--uploads 10] [--join-rate 0] [--json out.json]
+
+Startet fake_telegram.FakeBotAPI, baut die Application aus bot.build_application()
+(dieselben Handler wie main()) und pollt sie per getUpdates. Ablauf pro Gruppe:
+
+  1. Host schickt /host
+  2. alle Spieler schicken /join (Boards liegen vorher schon in der DB)
+  3. Host ruft --calls Nummern auf, gleichzeitig drücken Spieler zufällig
+     Player-Panel-Buttons (--storm Callback-Queries über alle Gruppen)
+  4. --uploads Spieler schicken privat ein synthetisches Board-Foto (OCR, braucht cv2)
+  5. Host schickt /end
+
+Ausgabe: pro Update-Art Anzahl, unbeantwortete Updates und p50/p95/p99/max der
+Ende-zu-Ende-Latenz (Update eingereiht -> erste Antwort des Bots), Durchsatz,
+Handler-Exceptions und Bot-API-Calls je Methode.
+
+DB_PATH zeigt auf eine temporäre Datei. Die Telegram-Limits des Outbox sind aus
+(gemessen wird der Bot, nicht 20 Nachrichten/min pro Gruppe); --telegram-limits
+lässt sie an.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+LOADTEST_TOKEN = "123456:LOADTEST"
+
+
+def _pct(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q / 100 * len(values)))] * 1000, 2)
+
+
+# ---------- Updates bauen ----------
+
+def _user(uid):
+    return {"id": uid, "is_bot": False, "first_name": f"Player{uid}", "username": f"player{uid}"}
+
+
+def _message(api, chat, uid, text=None, **extra):
+    msg = {"message_id": api.next_message_id(), "date": int(time.time()), "chat": chat, "from": _user(uid)}
+    if text is not None:
+        msg["text"] = text
+        if text.startswith("/"):
+            msg["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+    msg.update(extra)
+    return {"message": msg}
+
+
+def _button(api, chat, uid, data, seq):
+    from fake_telegram import BOT_USER
+    panel = {"message_id": api.next_message_id(), "date": int(time.time()), "chat": chat,
+             "from": BOT_USER, "text": "🎯 Player Panel"}
+    return {"callback_query": {"id": f"cb{seq}", "from": _user(uid), "chat_instance": str(chat["id"]),
+                               "data": data, "message": panel}}
+
+
+def _render_uploads(n, seed):
+    """[(grid, jpeg-bytes)] synthetischer Karten; leer ohne cv2."""
+    try:
+        import cv2
+        import synth_cards
+    except ImportError as e:
+        print(f"Skipping uploads: {e}")
+        return []
+    rng = random.Random(seed)
+    cards = []
+    for _ in range(n):
+        grid = synth_cards.random_card(rng)
+        img = synth_cards.render_card(grid, rng, card_number=rng.randint(1, 9999))
+        ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        if ok:
+            cards.append((grid, buf.tobytes()))
+    return cards
+
+
+# ---------- Szenario ----------
+
+async def _wait_idle(api, timeout, *kinds):
+    """Wartet, bis alle Updates dieser Arten beantwortet sind (oder timeout)."""
+    deadline = time.monotonic() + timeout
+    while any(api.pending(kind) for kind in kinds) and time.monotonic() < deadline:
+        await asyncio.sleep(0.02)
+
+
+async def _paced(items, rate, send):
+    """send(item) für alle items, mit höchstens `rate` pro Sekunde (0 = alles auf einmal)."""
+    start = time.monotonic()
+    for i, item in enumerate(items):
+        if rate:
+            delay = start + i / rate - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        send(item)
+        if i % 50 == 49:
+            await asyncio.sleep(0)
+
+
+async def run_scenario(api, args, rng, uploads):
+    groups = [{"id": -1_000_000_000_000 - i, "type": "supergroup", "title": f"Load {i}"} for i in range(args.groups)]
+    hosts = [1_000 + i for i in range(args.groups)]
+    players = [10_000 + i for i in range(args.players)]
+    seat = {uid: groups[i % len(groups)] for i, uid in enumerate(players)}
+    phases = {}
+
+    t0 = time.perf_counter()
+    for host_id, chat in zip(hosts, groups):
+        api.push_update(_message(api, chat, host_id, "/host"), "host")
+    await _wait_idle(api, args.timeout, "host")
+    phases["host"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    await _paced(players, args.join_rate, lambda uid: api.push_update(_message(api, seat[uid], uid, "/join"), "join"))
+    await _wait_idle(api, args.timeout, "join")
+    phases["join"] = time.perf_counter() - t0
+
+    async def host_calls(host_id, chat):
+        for n in rng.sample(range(1, 76), min(args.calls, 75)):
+            api.push_update(_message(api, chat, host_id, f"/call {n}"), "call")
+            await asyncio.sleep(args.call_interval)
+
+    async def storm():
+        presses = [(uid, rng.choice(args.buttons)) for uid in rng.choices(players, k=args.storm)]
+        seq = iter(range(1, len(presses) + 1))
+        await _paced(presses, args.storm_rate,
+                     lambda p: api.push_update(_button(api, seat[p[0]], p[0], p[1], next(seq)), "button"))
+
+    t0 = time.perf_counter()
+    await asyncio.gather(storm(), *(host_calls(h, c) for h, c in zip(hosts, groups)))
+    await _wait_idle(api, args.timeout, "call", "button")
+    phases["call+storm"] = time.perf_counter() - t0
+
+    if uploads:
+        t0 = time.perf_counter()
+        for i, (uid, (_, data)) in enumerate(zip(rng.sample(players, len(uploads)), uploads)):
+            file_id = f"upload{i}"
+            api.add_file(file_id, data)
+            photo = [{"file_id": file_id, "file_unique_id": file_id, "width": 989, "height": 1280,
+                      "file_size": len(data)}]
+            api.push_update(_message(api, {"id": uid, "type": "private", "first_name": f"Player{uid}"},
+                                     uid, photo=photo), "upload")
+        await _wait_idle(api, args.timeout, "upload")
+        phases["upload"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for host_id, chat in zip(hosts, groups):
+        api.push_update(_message(api, chat, host_id, "/end"), "end")
+    await _wait_idle(api, args.timeout, "end")
+    phases["end"] = time.perf_counter() - t0
+    return phases
+
+
+def _seed_boards(db, players, per_player, rng):
+    from utils import COLUMN_RANGES
+    for uid in players:
+        boards = []
+        for _ in range(per_player):
+            cols = [rng.sample(range(lo, hi + 1), 5) for lo, hi in COLUMN_RANGES]
+            grid = [[cols[c][r] for c in range(5)] for r in range(5)]
+            grid[2][2] = None
+            boards.append((str(rng.randint(1, 99999)), grid))
+        db.create_boards(uid, boards)
+
+
+async def _run(bot, api, args):
+    rng = random.Random(args.seed)
+    _seed_boards(bot.db, [10_000 + i for i in range(args.players)], args.boards, rng)
+    uploads = _render_uploads(args.uploads, args.seed)
+
+    app = bot.build_application(LOADTEST_TOKEN, base_url=api.url)
+    handler_errors = Counter()
+
+    async def on_error(update, ctx):
+        handler_errors[f"{type(ctx.error).__name__}: {ctx.error}"[:160]] += 1
+
+    app.add_error_handler(on_error)
+
+    async with app:
+        await app.start()
+        await app.updater.start_polling(poll_interval=0, timeout=1)
+        t0 = time.perf_counter()
+        try:
+            phases = await run_scenario(api, args, rng, uploads)
+        finally:
+            wall = time.perf_counter() - t0
+            await app.updater.stop()
+            await app.stop()
+
+    unanswered = Counter(kind for _, kind in api.drop_pending())
+    by_kind = defaultdict(list)
+    for _, kind, latency in api.results:
+        by_kind[kind].append(latency)
+    kinds = {}
+    for kind in sorted(set(by_kind) | set(unanswered)):
+        lat = by_kind.get(kind, [])
+        kinds[kind] = {
+            "answered": len(lat), "unanswered": unanswered.get(kind, 0),
+            "p50_ms": _pct(lat, 50), "p95_ms": _pct(lat, 95), "p99_ms": _pct(lat, 99),
+            "max_ms": round(max(lat) * 1000, 2) if lat else None,
+        }
+    total = sum(k["answered"] + k["unanswered"] for k in kinds.values())
+    errors = sum(handler_errors.values())
+    return {
+        "updates": total,
+        "seconds": round(wall, 3),
+        "updates_per_s": round(total / wall, 1) if wall else None,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "handler_errors": dict(handler_errors),
+        "phases_s": {k: round(v, 3) for k, v in phases.items()},
+        "kinds": kinds,
+        "api_calls": dict(api.calls),
+        "api_errors": dict(api.errors),
+        "outbox": bot.OUTBOX.stats(),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Offline load test against a fake Telegram Bot API.")
+    ap.add_argument("--players", type=int, default=500)
+    ap.add_argument("--boards", type=int, default=2, help="boards per player")
+    ap.add_argument("--groups", type=int, default=1, help="parallel games (one host each)")
+    ap.add_argument("--calls", type=int, default=40, help="numbers each host calls")
+    ap.add_argument("--call-interval", type=float, default=0.1, help="seconds between /call")
+    ap.add_argument("--join-rate", type=float, default=0, help="/join per second (0 = all at once)")
+    ap.add_argument("--storm", type=int, default=1000, help="button presses during the calls")
+    ap.add_argument("--storm-rate", type=float, default=200, help="button presses per second (0 = all at once)")
+    ap.add_argument("--buttons", nargs="+", default=["p_score", "p_mystats", "p_leaderboard", "show_rules"])
+    ap.add_argument("--uploads", type=int, default=0, help="private board photos (OCR, needs cv2)")
+    ap.add_argument("--api-latency", type=float, default=0.0, help="seconds the fake API waits per call")
+    ap.add_argument("--timeout", type=float, default=60, help="max seconds to wait for replies per phase")
+    ap.add_argument("--telegram-limits", action="store_true", help="keep the outbox rate limits")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", help="write the report as JSON to this file")
+    args = ap.parse_args(argv)
+
+    # vor dem Import von bot/db/outbox, die ihre Einstellungen beim Import lesen
+    os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bingo-load-"), "load.db"))
+    os.environ.setdefault("TELEGRAM_BOT_TOKEN", LOADTEST_TOKEN)
+    os.environ["UPDATE_LOG"] = ""
+    if not args.telegram_limits:
+        for key, value in (("OUTBOX_GLOBAL_RATE", "100000"), ("OUTBOX_PRIVATE_RATE", "100000"),
+                           ("OUTBOX_GROUP_PER_MIN", "6000000"), ("OUTBOX_GROUP_BURST", "100000")):
+            os.environ[key] = value
+
+    import bot
+    from fake_telegram import FakeBotAPI
+
+    bot.db.init_db()
+    api = FakeBotAPI(LOADTEST_TOKEN, latency=args.api_latency).start()
+    try:
+        report = asyncio.run(_run(bot, api, args))
+    finally:
+        api.stop()
+
+    print(f"DB: {os.environ['DB_PATH']}")
+    for key in ("updates", "seconds", "updates_per_s", "error_rate", "phases_s"):
+        print(f"{key:>14}: {report[key]}")
+    print(f"{'kind':>14}  answered  unanswered    p50_ms    p95_ms    p99_ms    max_ms")
+    for kind, k in report["kinds"].items():
+        print(f"{kind:>14}  {k['answered']:>8}  {k['unanswered']:>10}  " + "  ".join(
+            f"{'-' if k[f] is None else k[f]:>8}" for f in ("p50_ms", "p95_ms", "p99_ms", "max_ms")))
+    print(f"{'api_calls':>14}: {report['api_calls']}")
+    if report["api_errors"]:
+        print(f"{'api_errors':>14}: {report['api_errors']}")
+    for err, n in report["handler_errors"].items():
+        print(f"{'handler_error':>14}: {n}x {err}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0 if not report["handler_errors"] and not report["api_errors"] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Prometheus-Metriken im Textformat, ausgeliefert von einem kleinen stdlib-HTTP-Server.
+
+    METRICS_PORT=9108 python bot.py   ->   curl http://127.0.0.1:9108/metrics
+
+Ohne METRICS_PORT ist alles aus (ENABLED=False) und bot.py instrumentiert nichts.
+Eingeschaltet kostet eine Messung zwei perf_counter()-Aufrufe, ein bisect und einen
+kurzen Lock – das darf am Spieleabend mitlaufen. Werte, die erst beim Abruf
+berechnet werden (Session-Zahlen, Queue-Tiefe, OCR-Histogramme), liefern
+Collector-Funktionen, die register_collector() bekommt.
+"""
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+logger = logging.getLogger("bingo-bot.metrics")
+
+# .env wird vom Aufrufer geladen (bot.py), und zwar vor dem Import
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # 0 = aus
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+ENABLED = METRICS_PORT > 0
+
+# Sekunden-Buckets für Handler und DB-Queries
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+MAX_SERIES = 200  # Label-Kombinationen pro Metrik, danach landet alles unter "other"
+
+
+class Histogram:
+    """Feste Bucket-Obergrenzen (wie Prometheus, letzter Bucket = +Inf) plus Summe/Anzahl."""
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q):
+        """Lineare Interpolation im Bucket des q-Quantils (wie histogram_quantile)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                if i == len(self.bounds):
+                    return self.bounds[-1]
+                lo = self.bounds[i-1] if i else 0.0
+                return lo + (self.bounds[i] - lo) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+    def snapshot(self):
+        with self._lock:
+            return {"bounds": list(self.bounds), "counts": list(self.counts),
+                    "sum": self.sum, "count": self.count}
+
+
+# ---------- Registry ----------
+
+_LOCK = threading.Lock()
+_HELP = {}        # name -> (type, help)
+_HISTOGRAMS = {}  # name -> {labels(tuple): Histogram}
+_COUNTERS = {}    # name -> {labels(tuple): float}
+_COLLECTORS = []  # fn() -> Zeilen im Exposition-Format (format_metric / format_histogram)
+
+
+def _series(store, name, labels, factory):
+    series = store.setdefault(name, {})
+    key = tuple(sorted(labels.items()))
+    item = series.get(key)
+    if item is None:
+        with _LOCK:
+            if key not in series and len(series) >= MAX_SERIES:
+                key = tuple((k, "other") for k, _ in key)
+            item = series.get(key)
+            if item is None:
+                item = series[key] = factory()
+    return item
+
+
+def describe(name, kind, help_text):
+    _HELP[name] = (kind, help_text)
+
+
+def histogram(name, bounds=LATENCY_BUCKETS, **labels) -> Histogram:
+    return _series(_HISTOGRAMS, name, labels, lambda: Histogram(bounds))
+
+
+def observe(name, value, **labels):
+    histogram(name, **labels).observe(value)
+
+
+def inc(name, value=1, **labels):
+    series = _COUNTERS.setdefault(name, {})
+    key = tuple(sorted(labels.items()))
+    with _LOCK:
+        if key not in series and len(series) >= MAX_SERIES:
+            key = tuple((k, "other") for k, _ in key)
+        series[key] = series.get(key, 0) + value
+
+
+def register_collector(fn):
+    _COLLECTORS.append(fn)
+    return fn
+
+
+def instrument_module(module, name, skip=()):
+    """
+    Ersetzt alle öffentlichen Funktionen von `module` durch gemessene Varianten
+    (Histogramm `name` mit Label function=...). Aufrufer, die module.func()
+    schreiben, laufen ab dann über die Messung.
+    """
+    for attr, fn in list(vars(module).items()):
+        if attr.startswith("_") or attr in skip or not inspect.isfunction(fn):
+            continue
+        if fn.__module__ != module.__name__ or getattr(fn, "_metrics_wrapped", False):
+            continue
+        hist = histogram(name, function=attr)
+
+        def make(fn, hist):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                t0 = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    hist.observe(time.perf_counter() - t0)
+            wrapper._metrics_wrapped = True
+            return wrapper
+
+        setattr(module, attr, make(fn, hist))
+
+
+# ---------- Exposition ----------
+
+def _fmt_labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+
+def format_histogram(name, labels, snap, scale=1.0):
+    """Zeilen für ein Histogramm-Snapshot (bounds/counts/sum/count), Werte * scale."""
+    lines, cumulative = [], 0
+    for bound, n in zip(snap["bounds"], snap["counts"]):
+        cumulative += n
+        lines.append(f"{name}_bucket{_fmt_labels(labels, ('le', repr(float(bound * scale))))} {cumulative}")
+    lines.append(f"{name}_bucket{_fmt_labels(labels, ('le', '+Inf'))} {snap['count']}")
+    lines.append(f"{name}_sum{_fmt_labels(labels)} {snap['sum'] * scale}")
+    lines.append(f"{name}_count{_fmt_labels(labels)} {snap['count']}")
+    return lines
+
+
+def format_metric(name, kind, help_text, samples):
+    """Gauge/Counter aus Werten, die erst beim Abruf bekannt sind: samples = [(labels-dict, Wert)]."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_fmt_labels(sorted(labels.items()))} {value}")
+    return lines
+
+
+def _header(name, default_kind):
+    kind, help_text = _HELP.get(name, (default_kind, ""))
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+def render() -> str:
+    lines = []
+    for name, series in sorted(_HISTOGRAMS.items()):
+        lines += _header(name, "histogram")
+        for labels, hist in sorted(series.items()):
+            lines += format_histogram(name, labels, hist.snapshot())
+    for name, series in sorted(_COUNTERS.items()):
+        lines += _header(name, "counter")
+        for labels, value in sorted(series.items()):
+            lines.append(f"{name}{_fmt_labels(labels)} {value}")
+    for fn in _COLLECTORS:
+        try:
+            lines += fn() or []
+        except Exception as e:
+            logger.warning(f"Metrics collector {fn.__name__} failed: {e}")
+    return "\n".join(lines) + "\n"
+
+
+def start_server(port=None, host=None):
+    """/metrics in einem Daemon-Thread ausliefern; gibt den Server zurück."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host or METRICS_HOST, port or METRICS_PORT), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info(f"Metrics on http://{server.server_address[0]}:{server.server_address[1]}/metrics")
+    return server
@@ -1,10 +1,180 @@
+"""
+Board-OCR: Board finden, Zellen segmentieren, Ziffern per Nächster-Nachbar-Suche
+klassifizieren, Zahlen über die B-I-N-G-O-Spaltenbereiche auflösen.
+
+Dateien in TEMPL_DIR:
+  samples.npz  – der Klassifikator (gelabelte 28x28-Samples, je Ziffer gekappt)
+  d0-d9.png    – Mittelwert je Ziffer über alle Trainingsläufe; nur Bootstrap
+                 (Store ohne samples.npz bzw. Basis des ersten Trainings) und
+                 Debug-Ansicht, der Store liest sie danach nicht mehr
+  accum.npz    – laufende Summen/Anzahl, aus denen d0-d9 berechnet werden
+"""
 import os, cv2, numpy as np
-from dotenv import load_dotenv
+import functools, heapq, itertools, json, threading, time
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-load_dotenv()
+from metrics import Histogram
+from utils import COLUMN_RANGES
 
+# .env wird vom Aufrufer geladen (bot.py / Skripte), nicht beim Import
 TEMPL_DIR = os.getenv("TEMPL_DIR", "storage/templates")
-os.makedirs(TEMPL_DIR, exist_ok=True)
+
+# Board-Suche auf verkleinerter Kopie (längste Seite in px),
+# entzerrtes Board hat immer BOARD_SIZE x BOARD_SIZE
+LOCATE_MAX_SIDE = int(os.getenv("OCR_LOCATE_MAX_SIDE", "800"))
+BOARD_SIZE = int(os.getenv("OCR_BOARD_SIZE", "600"))
+
+# ---------- Profiling (optional) ----------
+# OCR_PROFILE=1: Stufen-Zeiten, Bildgröße, ROI-Anzahl und Match-Scores landen in
+# In-Process-Histogrammen (profile_snapshot) und im Trace des letzten Boards (last_trace).
+# OCR_DEBUG_DIR=pfad: zusätzlich Zwischenbilder der OCR_DEBUG_KEEP schlechtesten Uploads
+# (Fehler > unklare Zellen > Laufzeit) dort ablegen. Aus: nur ein Flag-Check pro Stufe.
+OCR_DEBUG_DIR = os.getenv("OCR_DEBUG_DIR", "")
+OCR_DEBUG_KEEP = int(os.getenv("OCR_DEBUG_KEEP", "10"))
+_PROFILING = os.getenv("OCR_PROFILE", "0") == "1" or bool(OCR_DEBUG_DIR)
+
+_MS_BUCKETS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+_BUCKETS = {
+    "total_ms": _MS_BUCKETS,
+    "image_mpx": (0.1, 0.3, 0.5, 1, 2, 4, 8, 12, 16, 24, 48),
+    "rois": (10, 20, 30, 40, 50, 60, 80, 100),
+    "cell_score": (0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.99),
+    "unresolved": (0, 1, 2, 3, 5, 10),
+}
+
+HISTOGRAMS = {}  # name -> Histogram ("stage_ms:<funktion>", "total_ms", "image_mpx", ...)
+_HIST_LOCK = threading.Lock()
+_TLS = threading.local()  # .trace = Trace des Boards, das dieser Thread gerade liest; .last = letzter fertiger
+
+def _hist(name):
+    h = HISTOGRAMS.get(name)
+    if h is None:
+        with _HIST_LOCK:
+            h = HISTOGRAMS.setdefault(name, Histogram(_BUCKETS.get(name, _MS_BUCKETS)))
+    return h
+
+def set_profiling(on=True, debug_dir=None):
+    """Profiling zur Laufzeit an-/ausschalten (z.B. bench_ocr.py); debug_dir wie OCR_DEBUG_DIR."""
+    global _PROFILING, OCR_DEBUG_DIR
+    if debug_dir is not None:
+        OCR_DEBUG_DIR = debug_dir
+    _PROFILING = bool(on or OCR_DEBUG_DIR)
+
+def profiling_enabled():
+    return _PROFILING
+
+def profile_snapshot():
+    """Alle Histogramme als dict (name -> bounds/counts/sum/count)."""
+    return {name: h.snapshot() for name, h in sorted(HISTOGRAMS.items())}
+
+def reset_profile():
+    with _HIST_LOCK:
+        HISTOGRAMS.clear()
+
+def last_trace():
+    """Trace des zuletzt in diesem Thread gelesenen Boards (nur mit Profiling)."""
+    return getattr(_TLS, "last", None)
+
+def _profiled(fn):
+    """Misst eine Pipeline-Stufe: Histogramm 'stage_ms:<name>' + Summe im laufenden Trace."""
+    name = fn.__name__
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _PROFILING:
+            return fn(*args, **kwargs)
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            secs = time.perf_counter() - t0
+            _hist("stage_ms:" + name).observe(secs * 1000)
+            trace = getattr(_TLS, "trace", None)
+            if trace is not None:
+                trace["stages"][name] = trace["stages"].get(name, 0.0) + secs
+    return wrapper
+
+def _start_trace(src):
+    if not _PROFILING:
+        return None
+    _TLS.trace = {"source": src if isinstance(src, str) else f"<{len(src)} bytes>",
+                  "stages": {}, "t0": time.perf_counter()}
+    return _TLS.trace
+
+def _finish_trace(trace, res=None, error=None, elapsed=None):
+    """Trace abschließen: Histogramme füttern, als last_trace merken, ggf. Debug-Dump."""
+    if trace is None:
+        return
+    _TLS.trace = None
+    t0 = trace.pop("t0")
+    trace["total_s"] = elapsed if elapsed is not None else time.perf_counter() - t0
+    _hist("total_ms").observe(trace["total_s"] * 1000)
+    if "image" in trace:
+        h, w = trace["image"]
+        _hist("image_mpx").observe(h * w / 1e6)
+        _hist("rois").observe(trace["rois"])
+    if error is not None:
+        trace["error"] = str(error)
+    if res is not None:
+        scores = [cands[0][1] for row in res["candidates"] for cands in row if cands]
+        for sc in scores:
+            _hist("cell_score").observe(sc)
+        trace["min_score"] = min(scores) if scores else None
+        trace["unresolved"] = len(res["unresolved"])
+        _hist("unresolved").observe(trace["unresolved"])
+    debug = trace.pop("_debug", None)
+    _TLS.last = trace
+    if OCR_DEBUG_DIR:
+        try:
+            _dump_if_worst(trace, res, debug)
+        except Exception as e:  # Debug-Dump darf die OCR nie kaputt machen
+            trace["dump_error"] = str(e)
+
+_WORST = []  # Min-Heap (key, seq, prefix) der aktuell abgelegten Uploads
+_WORST_LOCK = threading.Lock()
+_DUMP_SEQ = itertools.count()
+
+def _dump_if_worst(trace, res, debug):
+    key = (bool(trace.get("error")), trace.get("unresolved", 0), trace["total_s"])
+    with _WORST_LOCK:
+        if len(_WORST) >= OCR_DEBUG_KEEP and key <= _WORST[0][0]:
+            return
+        seq = next(_DUMP_SEQ)
+        prefix = os.path.join(OCR_DEBUG_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}_{seq:04d}")
+        heapq.heappush(_WORST, (key, seq, prefix))
+        evicted = heapq.heappop(_WORST)[2] if len(_WORST) > OCR_DEBUG_KEEP else None
+
+    os.makedirs(OCR_DEBUG_DIR, exist_ok=True)
+    if evicted:
+        for suffix in ("_input.jpg", "_board.png", "_rois.png", ".json"):
+            if os.path.exists(evicted + suffix):
+                os.remove(evicted + suffix)
+    if evicted == prefix:
+        return
+
+    debug = debug or {}
+    if debug.get("img") is not None:
+        img = debug["img"]
+        scale = min(1.0, 1600 / max(img.shape[:2]))
+        if scale < 1.0:
+            img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        cv2.imwrite(prefix + "_input.jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    if debug.get("board") is not None:
+        board = debug["board"].copy()
+        bad = set(map(tuple, res["unresolved"])) if res else set()
+        for r, row in enumerate(debug.get("boxes") or []):
+            for c, (y1, y2, x1, x2) in enumerate(row):
+                color = (0, 0, 255) if (r, c) in bad else (0, 200, 0)
+                cv2.rectangle(board, (x1, y1), (x2 - 1, y2 - 1), color, 2)
+        cv2.imwrite(prefix + "_board.png", board)
+    if debug.get("rois"):
+        tiles = list(debug["rois"]) + [np.zeros((28, 28), np.uint8)] * (-len(debug["rois"]) % 10)
+        mosaic = np.vstack([np.hstack(tiles[i:i+10]) for i in range(0, len(tiles), 10)])
+        cv2.imwrite(prefix + "_rois.png", mosaic)
+    info = dict(trace, grid=res["grid"] if res else None,
+                candidates=res["candidates"] if res else None)
+    with open(prefix + ".json", "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=1, default=str)
 
 # ---------- Bild-Helfer ----------
 
@@ -16,9 +186,18 @@ def _preprocess(img):
     _, bw = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV+cv2.THRESH_OTSU)
     return bw
 
+@_profiled
 def _find_board_roi(img):
+    """
+    Sucht das Board-Viereck auf einer verkleinerten Kopie und entzerrt es
+    einmalig in voller Auflösung auf BOARD_SIZE x BOARD_SIZE.
+    """
+    h, w = img.shape[:2]
+    scale = min(1.0, LOCATE_MAX_SIDE / float(max(h, w)))
+    small = img if scale >= 1.0 else cv2.resize(
+        img, (int(w*scale), int(h*scale)), interpolation=cv2.INTER_AREA)
     # adap. Threshold für Konturensuche
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
     thr  = cv2.adaptiveThreshold(gray,255,cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
                                  cv2.THRESH_BINARY_INV,31,10)
     cnts, _ = cv2.findContours(thr, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -30,54 +209,160 @@ def _find_board_roi(img):
         if len(approx)==4 and area>area_best:
             best, area_best = approx, area
     if best is None:
-        return img
-    pts = best.reshape(4,2).astype(np.float32)
+        # kein Viereck gefunden -> ganzes Bild auf Normgröße
+        return cv2.resize(img, (BOARD_SIZE, BOARD_SIZE), interpolation=cv2.INTER_AREA)
+    # Ecken zurück auf Originalauflösung skalieren
+    pts = best.reshape(4,2).astype(np.float32) / scale
     s = pts.sum(axis=1); d = np.diff(pts, axis=1).reshape(-1)
     rect = np.zeros((4,2), dtype=np.float32)
     rect[0] = pts[np.argmin(s)]
     rect[2] = pts[np.argmax(s)]
     rect[1] = pts[np.argmin(d)]
     rect[3] = pts[np.argmax(d)]
-    side = int(max(
-        np.linalg.norm(rect[0]-rect[1]),
-        np.linalg.norm(rect[1]-rect[2]),
-        np.linalg.norm(rect[2]-rect[3]),
-        np.linalg.norm(rect[3]-rect[0]),
-    ))
+    side = BOARD_SIZE
     dst = np.array([[0,0],[side-1,0],[side-1,side-1],[0,side-1]], dtype=np.float32)
     M = cv2.getPerspectiveTransform(rect, dst)
-    return cv2.warpPerspective(img, M, (side, side))
+    return cv2.warpPerspective(img, M, (side, side), flags=cv2.INTER_AREA)
+
+def _equal_bounds(size, grid):
+    """Gleichmäßige Aufteilung mit 2% Rand (alter Standard ohne Linienerkennung)."""
+    pad = int(0.02*size)
+    step = (size - 2*pad)//grid
+    return [pad + i*step for i in range(grid+1)]
+
+def _line_positions(mask, axis):
+    """Mittelpunkte der Linien im Masken-Profil entlang axis (0: Zeilen, 1: Spalten)."""
+    profile = mask.sum(axis=1-axis) / 255.0
+    on = profile > 0.4 * mask.shape[1-axis]
+    pos, start = [], None
+    for i, v in enumerate(np.append(on, False)):
+        if v and start is None:
+            start = i
+        elif not v and start is not None:
+            pos.append((start + i - 1) / 2.0)
+            start = None
+    return pos
+
+def _pick_grid_lines(pos, size, grid):
+    """
+    Wählt grid+1 annähernd äquidistante Linien mit größtmöglicher Spannweite.
+    None, wenn kein passender Satz existiert.
+    """
+    tol = 0.04 * size
+    best = None
+    for i in range(len(pos)):
+        for j in range(len(pos)-1, i, -1):
+            span = pos[j] - pos[i]
+            if span < 0.5*size or (best and span <= best[-1] - best[0]):
+                continue
+            step = span / grid
+            chosen = []
+            for k in range(grid+1):
+                target = pos[i] + k*step
+                near = min(pos, key=lambda p: abs(p - target))
+                if abs(near - target) > tol:
+                    break
+                chosen.append(near)
+            else:
+                best = chosen
+    return None if best is None else [int(round(p)) for p in best]
 
-def _extract_cells(board_img, grid=5):
+@_profiled
+def _cell_boxes(board_img, grid=5):
+    """
+    Zellgrenzen (y1,y2,x1,x2) im Board-Bild, zeilenweise. Die Grenzen kommen
+    aus den erkannten Gitterlinien (morphologische Linienextraktion +
+    Projektionsprofil), sonst gleichmäßige Aufteilung.
+    """
     h,w = board_img.shape[:2]
-    pad = int(0.02*min(h,w))
-    crop = board_img[pad:h-pad, pad:w-pad]
-    h,w = crop.shape[:2]
-    ch, cw = h//grid, w//grid
-    cells = []
-    for r in range(grid):
-        row = []
-        for c in range(grid):
-            y1,y2 = r*ch, (r+1)*ch
-            x1,x2 = c*cw, (c+1)*cw
-            row.append(crop[y1:y2, x1:x2])
-        cells.append(row)
-    return cells
+    gray = board_img if board_img.ndim == 2 else cv2.cvtColor(board_img, cv2.COLOR_BGR2GRAY)
+    # Linien auf halber Auflösung suchen, Positionen danach zurückskalieren
+    small = cv2.resize(gray, (w//2, h//2), interpolation=cv2.INTER_AREA)
+    sh, sw = small.shape
+    bw = cv2.adaptiveThreshold(small, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
+                               cv2.THRESH_BINARY_INV, 15, 10)
+    # nur lange, dünne Strukturen bleiben übrig – Ziffern sind viel kürzer
+    horiz = cv2.morphologyEx(bw, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (sw//6, 1)))
+    vert  = cv2.morphologyEx(bw, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, sh//6)))
+
+    ys = _pick_grid_lines(_line_positions(horiz, 0), sh, grid)
+    xs = _pick_grid_lines(_line_positions(vert, 1), sw, grid)
+    ys = [min(h, 2*y) for y in ys] if ys else _equal_bounds(h, grid)
+    xs = [min(w, 2*x) for x in xs] if xs else _equal_bounds(w, grid)
+    return [[(ys[r], ys[r+1], xs[c], xs[c+1]) for c in range(grid)] for r in range(grid)]
 
 # ---------- Template-Store ----------
 
+# Alle gelabelten 28x28-Samples (X: N x 28 x 28 uint8, y: N Labels)
+SAMPLES_PATH = os.getenv("OCR_SAMPLES_PATH", os.path.join(TEMPL_DIR, "samples.npz"))
+# Obergrenze pro Ziffer – hält die Klassifikations-Latenz konstant
+MAX_SAMPLES_PER_DIGIT = int(os.getenv("OCR_MAX_SAMPLES_PER_DIGIT", "200"))
+# Laufende Summen/Anzahl pro Ziffer über alle Trainingsläufe (Basis für d0-d9,
+# die nur noch Bootstrap/Debug sind – klassifiziert wird mit samples.npz)
+ACCUM_PATH = os.getenv("OCR_ACCUM_PATH", os.path.join(TEMPL_DIR, "accum.npz"))
+
 def _templ_path(digit:int):
     return os.path.join(TEMPL_DIR, f"d{digit}.png")
 
 def templates_available():
-    return all(os.path.exists(_templ_path(d)) for d in range(10))
+    if all(os.path.exists(_templ_path(d)) for d in range(10)):
+        return True
+    return _load_store().ready
+
+def _accumulate(samples):  # samples: dict[digit] -> list[28x28]
+    """Summe und Anzahl der Samples pro Ziffer."""
+    sums = np.zeros((10,28,28), dtype=np.float64)
+    counts = np.zeros(10, dtype=np.int64)
+    for d in range(10):
+        rois = [roi for roi in samples.get(d, []) if roi.shape == (28,28)]
+        if rois:
+            sums[d] = np.sum(np.stack(rois), axis=0, dtype=np.float64)
+            counts[d] = len(rois)
+    return sums, counts
+
+def _load_accum():
+    if os.path.exists(ACCUM_PATH):
+        with np.load(ACCUM_PATH) as data:
+            return data["sums"].copy(), data["counts"].copy()
+    # erster Lauf: bestehende Templates zählen als je ein Sample
+    sums = np.zeros((10,28,28), dtype=np.float64)
+    counts = np.zeros(10, dtype=np.int64)
+    for d, t in _load_templates().items():
+        if t.shape == (28,28):
+            sums[d], counts[d] = t, 1
+    return sums, counts
+
+def _save_templates(samples, acc=None, accept=None):  # samples: dict[digit] -> list[np.array]
+    """
+    Addiert neue Samples auf die laufenden Summen (accum.npz), schreibt
+    d0-d9 als Mittelwert über ALLE bisherigen Trainingsläufe neu und hängt
+    die Samples an samples.npz an.
+    acc: bereits berechnetes _accumulate(samples) (Batch-Training).
+    accept: optional fn(_DigitStore) -> bool; False = nichts schreiben.
+    Rückgabe: True, wenn gespeichert wurde.
+    """
+    # vor dem Überschreiben von d0-d9 laden – die sind beim ersten Lauf die Basis
+    X, y = _merge_samples(*_load_samples(), samples)
+    if accept is not None and not accept(_DigitStore(X, y)):
+        return False
+
+    sums, counts = acc if acc is not None else _accumulate(samples)
+    total_sums, total_counts = _load_accum()
+    total_sums += sums
+    total_counts += counts
+
+    os.makedirs(TEMPL_DIR, exist_ok=True)
+    tmp = ACCUM_PATH + ".tmp.npz"
+    np.savez(tmp, sums=total_sums, counts=total_counts)
+    os.replace(tmp, ACCUM_PATH)
 
-def _save_templates(means):  # means: dict[digit] -> list[np.array]
     for d in range(10):
-        if len(means.get(d, []))==0: 
+        if total_counts[d] == 0:
             continue
-        m = np.mean(np.stack(means[d], axis=0), axis=0).astype(np.uint8)
+        m = (total_sums[d] / total_counts[d]).astype(np.uint8)
         cv2.imwrite(_templ_path(d), m)
+    _write_samples(X, y)
+    return True
 
 def _load_templates():
     templ = {}
@@ -88,44 +373,125 @@ def _load_templates():
             templ[d] = im
     return templ
 
-# ---------- Ziffern-Segmentierung & Matching ----------
+def _zscore_rows(X):
+    """Zeilen auf Mittelwert 0 / Std 1 normieren, geteilt durch die Länge: dot = NCC."""
+    Z = X.reshape(len(X), int(np.prod(X.shape[1:]))).astype(np.float32)
+    Z -= Z.mean(axis=1, keepdims=True)
+    Z /= Z.std(axis=1, keepdims=True) + 1e-6
+    return Z / np.sqrt(Z.shape[1])
 
-def _segment_digits(cell_bgr):
-    """Gibt eine Liste binärer, normalisierter ROIs (28x28) für 1-2 Ziffern zurück."""
-    bw = _preprocess(cell_bgr)
-    h,w = bw.shape
-    # mittleres Rechteck auswerten (Rand raus)
-    y1,y2 = h//10, h - h//10
-    x1,x2 = w//10, w - w//10
-    roi = bw[y1:y2, x1:x2]
+class _DigitStore:
+    """
+    Nächster-Nachbar-Klassifikator über alle Samples: Score einer Ziffer =
+    bester NCC-Wert unter ihren Samples, für alle ROIs in einer Matrixmultiplikation.
+    """
+    def __init__(self, X, y):
+        order = np.argsort(y, kind="stable")
+        self.X, self.y = X[order], y[order]
+        self.Z = _zscore_rows(self.X)
+        self.digits, self.starts = np.unique(self.y, return_index=True)
+        self.ready = len(self.digits) == 10
 
-    # kleine Punkte entfernen
-    roi = cv2.morphologyEx(roi, cv2.MORPH_OPEN, np.ones((3,3),np.uint8))
+    def rank(self, rois):
+        """Pro ROI eine Liste [(digit, score), ...], beste zuerst."""
+        if not rois or not len(self.y):
+            return [[] for _ in rois]
+        S = _zscore_rows(np.stack(rois)) @ self.Z.T
+        per_digit = np.maximum.reduceat(S, self.starts, axis=1)
+        order = np.argsort(-per_digit, axis=1)
+        return [[(int(self.digits[j]), float(per_digit[i, j])) for j in order[i]]
+                for i in range(len(rois))]
 
-    # Komponenten
-    cnts,_ = cv2.findContours(roi, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    boxes = []
-    for c in cnts:
-        x,y,wc,hc = cv2.boundingRect(c)
-        if wc*hc < 0.01*roi.size: 
-            continue
-        boxes.append((x,y,wc,hc))
+_STORE_CACHE = {"key": None, "store": None}
+
+def _load_samples():
+    """
+    (X, y) aus samples.npz. Ohne Sample-Datei (erster Lauf mit dem kNN-Store)
+    dienen die gemittelten Templates d0-d9 als je ein Sample.
+    """
+    if os.path.exists(SAMPLES_PATH):
+        with np.load(SAMPLES_PATH) as data:
+            return data["X"], data["y"]
+    templ = {d: t for d, t in _load_templates().items() if t is not None and t.shape == (28,28)}
+    X = np.array([templ[d] for d in sorted(templ)], dtype=np.uint8).reshape(-1, 28, 28)
+    y = np.array(sorted(templ), dtype=np.uint8)
+    return X, y
+
+@_profiled
+def _load_store():
+    """Lädt den Sample-Store (siehe _load_samples), gecacht bis zur nächsten Änderung."""
+    if os.path.exists(SAMPLES_PATH):
+        key = (SAMPLES_PATH, os.stat(SAMPLES_PATH).st_mtime_ns)
+    else:
+        key = tuple(os.stat(_templ_path(d)).st_mtime_ns if os.path.exists(_templ_path(d)) else 0
+                    for d in range(10))
+    if _STORE_CACHE["key"] != key:
+        _STORE_CACHE.update(key=key, store=_DigitStore(*_load_samples()))
+    return _STORE_CACHE["store"]
+
+def _evict_redundant(X, keep):
+    """
+    Behält `keep` Samples einer Ziffer: entfernt wiederholt das Sample, das
+    seinem nächsten Nachbarn am ähnlichsten ist (Duplikate zuerst).
+    """
+    n = len(X)
+    if n <= keep:
+        return np.arange(n)
+    Z = _zscore_rows(X)
+    S = Z @ Z.T
+    np.fill_diagonal(S, -np.inf)
+    alive = np.ones(n, dtype=bool)
+    nn = S.max(axis=1)
+    for _ in range(n - keep):
+        i = int(np.argmax(np.where(alive, nn, -np.inf)))
+        alive[i] = False
+        # nur Samples neu bewerten, deren nächster Nachbar gerade wegfiel
+        stale = alive & (S[:, i] >= nn)
+        S[:, i] = -np.inf
+        if stale.any():
+            nn[stale] = S[stale].max(axis=1)
+    return np.flatnonzero(alive)
+
+def _merge_samples(X, y, samples):  # samples: dict[digit] -> list[28x28]
+    """Hängt neue Samples an (X, y) an und kappt jede Ziffer auf MAX_SAMPLES_PER_DIGIT."""
+    new = [(d, roi) for d in range(10) for roi in samples.get(d, []) if roi.shape == (28,28)]
+    if new:
+        X = np.concatenate([X, np.stack([roi for _, roi in new]).astype(np.uint8)])
+        y = np.concatenate([y, np.array([d for d, _ in new], dtype=np.uint8)])
+
+    keep = []
+    for d in np.unique(y):
+        idx = np.flatnonzero(y == d)
+        keep.append(idx[_evict_redundant(X[idx], MAX_SAMPLES_PER_DIGIT)])
+    keep = np.sort(np.concatenate(keep)) if keep else np.zeros(0, dtype=int)
+    return X[keep], y[keep]
+
+def _write_samples(X, y):
+    os.makedirs(os.path.dirname(SAMPLES_PATH) or ".", exist_ok=True)
+    tmp = SAMPLES_PATH + ".tmp.npz"
+    np.savez(tmp, X=X, y=y)
+    os.replace(tmp, SAMPLES_PATH)
+
+# ---------- Ziffern-Segmentierung & Matching ----------
+
+def _normalize_roi(digit):
+    """Skaliert eine binäre Ziffer mit Padding auf 28x28."""
+    hc, wc = digit.shape
+    scale = 22 / max(wc, hc)
+    resized = cv2.resize(digit, (max(1, int(wc*scale)), max(1, int(hc*scale))),
+                         interpolation=cv2.INTER_AREA)
+    canvas = np.zeros((28,28), dtype=np.uint8)
+    ys = (28 - resized.shape[0])//2
+    xs = (28 - resized.shape[1])//2
+    canvas[ys:ys+resized.shape[0], xs:xs+resized.shape[1]] = resized
+    return canvas
+
+def _pick_rois(roi, boxes):
+    """Boxen links->rechts normieren, max. 2 Ziffern (die größten) behalten."""
     if not boxes:
         return []
-
     boxes.sort(key=lambda b:b[0])  # links->rechts
-
-    rois = []
-    for (x,y,wc,hc) in boxes:
-        digit = roi[y:y+hc, x:x+wc]
-        # auf 28x28 normieren mit Padding
-        scale = 22 / max(wc, hc)
-        resized = cv2.resize(digit, (int(wc*scale), int(hc*scale)), interpolation=cv2.INTER_AREA)
-        canvas = np.zeros((28,28), dtype=np.uint8)
-        ys = (28 - resized.shape[0])//2
-        xs = (28 - resized.shape[1])//2
-        canvas[ys:ys+resized.shape[0], xs:xs+resized.shape[1]] = resized
-        rois.append(canvas)
+    rois = [_normalize_roi(roi[y:y+hc, x:x+wc]) for (x,y,wc,hc) in boxes]
     # max 2 Ziffern
     if len(rois) > 2:
         areas = [cv2.countNonZero(r) for r in rois]
@@ -133,36 +499,174 @@ def _segment_digits(cell_bgr):
         rois = [rois[i] for i in sorted(idx)]
     return rois
 
-def _ncc(a,b):
-    a = a.astype(np.float32); b = b.astype(np.float32)
-    a = (a - a.mean()) / (a.std()+1e-6)
-    b = (b - b.mean()) / (b.std()+1e-6)
-    return float((a*b).mean())
-
-def _match_digit(roi, templs):
-    best, best_d = -1.0, None
-    for d, t in templs.items():
-        if t.shape != roi.shape:
-            t = cv2.resize(t, (roi.shape[1], roi.shape[0]), interpolation=cv2.INTER_AREA)
-        s = _ncc(roi, t)
-        if s > best:
-            best, best_d = s, d
-    return best_d, best
+def _split_roi(roi):
+    """Halbiert eine ROI mit zwei zusammengewachsenen Ziffern und normiert beide Hälften neu."""
+    h,w = roi.shape
+    halves = []
+    for part in (roi[:, :w//2], roi[:, w//2:]):
+        ys, xs = np.nonzero(part)
+        if len(xs) == 0:
+            return []
+        halves.append(_normalize_roi(part[ys.min():ys.max()+1, xs.min():xs.max()+1]))
+    return halves
 
-# ---------- Öffentliche API ----------
+@_profiled
+def _segment_board(board_bgr, boxes, skip=((2,2),)):
+    """
+    Ziffern aller Zellen auf einmal: Board einmal binarisieren + öffnen,
+    eine Komponenten-Analyse, Zuordnung der Komponenten zu Zellen über
+    ihren Mittelpunkt (Innenbereich je Zelle ohne 10% Rand).
+    Gibt rois[r][c] (Liste von 28x28-ROIs) zurück.
+    """
+    grid = len(boxes)
+    bw = _preprocess(board_bgr)
 
-def train_templates_from_board(image_path:str, labels_25:list):
+    # Innenbereiche der Zeilen/Spalten (je 10% Rand weg) -> Gitterlinien fallen raus
+    rows = [(y1+(y2-y1)//10, y2-(y2-y1)//10) for (y1,y2,_,_) in (boxes[r][0] for r in range(grid))]
+    cols = [(x1+(x2-x1)//10, x2-(x2-x1)//10) for (_,_,x1,x2) in boxes[0]]
+    mask = np.zeros_like(bw)
+    for r,(iy1,iy2) in enumerate(rows):
+        for c,(ix1,ix2) in enumerate(cols):
+            if (r,c) not in skip:
+                mask[iy1:iy2, ix1:ix2] = 255
+    bw = cv2.bitwise_and(bw, mask)
+
+    # kleine Punkte entfernen
+    bw = cv2.morphologyEx(bw, cv2.MORPH_OPEN, np.ones((3,3),np.uint8))
+
+    # eine Komponenten-Analyse fürs ganze Board, Zuordnung über den Mittelpunkt
+    cnts,_ = cv2.findContours(bw, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    row_starts = [a for a,_ in rows]
+    col_starts = [a for a,_ in cols]
+    found = {}
+    for cnt in cnts:
+        x,y,wc,hc = cv2.boundingRect(cnt)
+        r = bisect_right(row_starts, y + hc//2) - 1
+        c = bisect_right(col_starts, x + wc//2) - 1
+        if r < 0 or c < 0:
+            continue
+        (iy1,iy2),(ix1,ix2) = rows[r], cols[c]
+        if wc*hc < 0.01*(iy2-iy1)*(ix2-ix1):
+            continue
+        found.setdefault((r,c), []).append((x-ix1, y-iy1, wc, hc))
+
+    rois = [[[] for _ in range(grid)] for _ in range(grid)]
+    for (r,c), cell_boxes in found.items():
+        (iy1,iy2),(ix1,ix2) = rows[r], cols[c]
+        rois[r][c] = _pick_rois(bw[iy1:iy2, ix1:ix2], cell_boxes)
+    return rois
+
+@_profiled
+def _classify(store, rois):
+    return store.rank(rois)
+
+# ---------- Dekodierung mit Spalten-Constraints ----------
+
+MIN_SCORE = 0.60  # darunter gilt eine Ziffer als unsicher
+
+def _cell_readings(rois, col):
+    """Mögliche Lesarten einer Zelle als Listen von Ziffern-ROIs."""
+    readings = [rois]
+    if len(rois) == 1 and COLUMN_RANGES[col][0] >= 10:
+        # zusammengewachsene Ziffern: zusätzlich halbiert versuchen
+        halves = _split_roi(rois[0])
+        if halves:
+            readings.append(halves)
+    return readings
+
+def _cell_candidates(ranked_readings, col, top_k=3):
     """
-    Trainiert Templates (0-9), indem es aus einem sauberen Board die Ziffern extrahiert.
-    labels_25: 25 Strings (Zahl oder 'FREE'), zeilenweise.
+    Kandidaten (Zahl, Score) einer Zelle, nur innerhalb des Spaltenbereichs.
+    ranked_readings: pro Lesart die Rangliste jeder Ziffer.
+    Score einer Zahl = schwächste ihrer Ziffern.
+    """
+    lo, hi = COLUMN_RANGES[col]
+    cands = {}
+    for ranked in ranked_readings:
+        combos = [(0, 1.0)]
+        for digit_scores in ranked:
+            combos = [(v*10 + d, min(s, sd)) for v, s in combos for d, sd in digit_scores[:top_k]]
+        for v, s in combos:
+            if lo <= v <= hi and s > cands.get(v, -1.0):
+                cands[v] = s
+    return sorted(cands.items(), key=lambda x: -x[1])[:top_k]
+
+def _resolve_grid(candidates):
+    """
+    Greedy nach Konfidenz: jede Zelle bekommt ihren besten Kandidaten >= MIN_SCORE,
+    der im Bereich ihrer Spalte liegt und dort noch nicht vergeben ist. Rest bleibt 'ERR'.
+    """
+    grid = [[None]*5 for _ in range(5)]
+    cells = [(r,c) for r in range(5) for c in range(5) if candidates[r][c] is not None]
+    cells.sort(key=lambda rc: -(candidates[rc[0]][rc[1]][0][1] if candidates[rc[0]][rc[1]] else -1.0))
+    used = [set() for _ in range(5)]
+    for r, c in cells:
+        grid[r][c] = 'ERR'
+        lo, hi = COLUMN_RANGES[c]
+        for v, s in candidates[r][c]:
+            if s < MIN_SCORE:
+                break
+            if lo <= v <= hi and v not in used[c]:
+                grid[r][c] = v
+                used[c].add(v)
+                break
+    return grid
+
+# ---------- Korpus (Bild + 25 Labels) ----------
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+def parse_labels(text:str):
+    """25 Werte (Zahlen/'FREE'), zeilenweise -> 5x5 Grid (None für FREE)."""
+    vals = text.replace(",", " ").split()
+    if len(vals) != 25:
+        raise ValueError(f"Need 25 values, got {len(vals)}.")
+    flat = [None if v.lower() in ("free", "x") else int(v) for v in vals]
+    return [flat[i*5:(i+1)*5] for i in range(5)]
+
+def iter_corpus(corpus_dir:str):
     """
+    Liefert (Bildpfad, 5x5-Labels) für jedes Bild im Korpus, das eine
+    Label-Datei '<bild>.txt' daneben hat (z.B. 'u123.jpg' + 'u123.jpg.txt').
+    """
+    for name in sorted(os.listdir(corpus_dir)):
+        if not name.lower().endswith(IMAGE_EXTS):
+            continue
+        path = os.path.join(corpus_dir, name)
+        label_path = path + ".txt"
+        if not os.path.exists(label_path):
+            continue
+        with open(label_path, encoding="utf-8") as f:
+            yield path, parse_labels(f.read())
+
+def score_corpus(corpus, store=None, workers=None):
+    """
+    Liest alle Boards von corpus ([(Bildpfad, Labels)], siehe iter_corpus) und zählt
+    richtige Zellen/Boards; store: anderer _DigitStore als der gespeicherte (z.B. Trainingskandidat).
+    """
+    corpus = list(corpus)
+    res = {"boards": len(corpus), "boards_ok": 0, "cells": 24 * len(corpus), "cells_ok": 0, "unresolved": 0}
+    results = read_boards([path for path, _ in corpus], workers=workers, store=store)
+    for (_, labels), out in zip(corpus, results):
+        grid = out.get("grid") or [[None]*5 for _ in range(5)]
+        wrong = sum(1 for r in range(5) for c in range(5)
+                    if (r, c) != (2, 2) and grid[r][c] != labels[r][c])
+        res["cells_ok"] += 24 - wrong
+        res["boards_ok"] += 0 if wrong else 1
+        res["unresolved"] += sum(1 for row in grid for v in row if v == "ERR")
+    return res
+
+# ---------- Öffentliche API ----------
+
+def _extract_samples(image_path:str, labels_25:list):
+    """Gelabelte Ziffern-ROIs eines Boards: dict[digit] -> list[28x28]."""
     img = cv2.imread(image_path)
     if img is None:
         raise ValueError("Could not read training image.")
     board = _find_board_roi(img)
-    cells = _extract_cells(board, 5)
+    board_rois = _segment_board(board, _cell_boxes(board, 5))
 
-    means = {d:[] for d in range(10)}
+    samples = {d:[] for d in range(10)}
     idx = 0
     for r in range(5):
         for c in range(5):
@@ -173,7 +677,7 @@ def train_templates_from_board(image_path:str, labels_25:list):
                 continue
             if lab == "FREE":
                 continue
-            rois = _segment_digits(cells[r][c])
+            rois = board_rois[r][c]
             if len(rois)==0:
                 continue
             digits = list(lab)
@@ -182,63 +686,199 @@ def train_templates_from_board(image_path:str, labels_25:list):
             if len(digits) != len(rois):
                 # Fallback: 2-stellig aber 1 ROI -> halbieren
                 if len(digits)==2 and len(rois)==1:
-                    h,w = rois[0].shape
-                    rois = [rois[0][:, :w//2], rois[0][:, w//2:]]
+                    rois = _split_roi(rois[0])
                 else:
                     continue
             for ch, roi in zip(digits, rois):
                 d = int(ch)
-                means[d].append(roi)
-    _save_templates(means)
+                samples[d].append(roi)
+    return samples
+
+def _extract_samples_job(job):
+    """Worker für train_templates_from_dir (muss für den Prozess-Pool top-level sein)."""
+    path, labels_25 = job
+    try:
+        samples = _extract_samples(path, labels_25)
+    except Exception as e:
+        return path, None, None, str(e)
+    return path, samples, _accumulate(samples), None
+
+def train_templates_from_board(image_path:str, labels_25:list):
+    """
+    Trainiert Templates (0-9), indem es aus einem sauberen Board die Ziffern extrahiert.
+    labels_25: 25 Strings (Zahl oder 'FREE'), zeilenweise.
+    Das Training ist inkrementell: frühere Läufe bleiben in den Templates erhalten.
+    """
+    _save_templates(_extract_samples(image_path, labels_25))
     return templates_available()
 
-def image_to_grid(image_path:str):
+def train_templates_from_dir(corpus_dir:str, workers=None, accept=None):
     """
-    Liest ein Board mit Template-Matching (wenn Templates vorhanden),
-    sonst konservativ 'ERR'. Mitte (2,2) ist immer None (FREE).
+    Trainiert mit allen gelabelten Boards eines Verzeichnisses (Korpus-Format,
+    siehe iter_corpus). Die Boards werden parallel in einem Prozess-Pool
+    ausgewertet, Summen und Samples danach zusammengeführt und einmal gespeichert.
+    accept: wie bei _save_templates – prüft den neuen Store vor dem Speichern.
     """
-    img = cv2.imread(image_path)
+    jobs = [(path, ["FREE" if v is None else str(v) for row in labels for v in row])
+            for path, labels in iter_corpus(corpus_dir)]
+
+    samples = {d:[] for d in range(10)}
+    sums = np.zeros((10,28,28), dtype=np.float64)
+    counts = np.zeros(10, dtype=np.int64)
+    failed = []
+
+    def merge(results):
+        nonlocal sums, counts
+        for path, board_samples, acc, err in results:
+            if err:
+                failed.append((path, err))
+                continue
+            for d in range(10):
+                samples[d].extend(board_samples[d])
+            sums += acc[0]
+            counts += acc[1]
+
+    if workers == 1 or len(jobs) < 2:
+        merge(map(_extract_samples_job, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            merge(ex.map(_extract_samples_job, jobs, chunksize=4))
+
+    saved = bool(counts.sum()) and _save_templates(samples, (sums, counts), accept)
+    return {
+        "boards": len(jobs),
+        "failed": failed,
+        "samples": int(counts.sum()),
+        "saved": saved,
+        "ready": templates_available(),
+    }
+
+@_profiled
+def _load_image(src):
+    """Bild von Pfad oder aus Bytes (z.B. Telegram-Download / ZIP-Eintrag)."""
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        img = cv2.imdecode(np.frombuffer(src, np.uint8), cv2.IMREAD_COLOR)
+    else:
+        img = cv2.imread(src)
     if img is None:
         raise ValueError("Could not read image.")
-    board = _find_board_roi(img)
-    cells = _extract_cells(board, 5)
+    return img
+
+def _board_readings(src, store):
+    """Bild -> Lesarten je Zelle + flache ROI-Liste für einen gemeinsamen _classify-Aufruf."""
+    trace = getattr(_TLS, "trace", None) if _PROFILING else None
+    debug = {}
+    if trace is not None and OCR_DEBUG_DIR:
+        trace["_debug"] = debug  # schon vorher anhängen, damit auch Fehlschläge gedumpt werden
+    img = debug["img"] = _load_image(src)
+    board = debug["board"] = _find_board_roi(img)
+    boxes = debug["boxes"] = _cell_boxes(board, 5)
+    board_rois = _segment_board(board, boxes)
+    readings = {}
+    flat = []
+    for r in range(5):
+        for c in range(5):
+            if (r,c) == (2,2) or not board_rois[r][c] or not store.ready:
+                continue
+            readings[(r,c)] = _cell_readings(board_rois[r][c], c)
+            for parts in readings[(r,c)]:
+                flat.extend(parts)
 
-    templs = _load_templates()
-    use_templates = len(templs) == 10
+    if trace is not None:
+        trace["image"] = img.shape[:2]
+        trace["rois"] = len(flat)
+        debug["rois"] = flat
+    return readings, flat
 
-    grid = []
+def _decode_board(readings, ranked, top_k):
+    """Verteilt die klassifizierten ROIs (Iterator, Reihenfolge wie flat) zurück auf die Zellen."""
+    candidates = []
     for r in range(5):
         row = []
         for c in range(5):
             if r==2 and c==2:
                 row.append(None)  # FREE (Roboter)
                 continue
-            rois = _segment_digits(cells[r][c])
-            if len(rois)==0:
-                row.append('ERR'); continue
-            digits = []
-            for roi in rois:
-                if use_templates:
-                    d, score = _match_digit(roi, templs)
-                    if d is None or score < 0.60:
-                        digits = ['ERR']; break
-                    digits.append(str(d))
-                else:
-                    digits = ['ERR']; break
-            if 'ERR' in digits or len(digits)==0:
-                row.append('ERR')
-            else:
-                try:
-                    row.append(int("".join(digits)))
-                except:
-                    row.append('ERR')
-        grid.append(row)
-    # Plausibilitäts-Check 1..75
-    for r in range(5):
-        for c in range(5):
-            v = grid[r][c]
-            if v is None:
-                continue
-            if not isinstance(v, int) or v < 1 or v > 75:
-                grid[r][c] = 'ERR'
-    return grid
+            if (r,c) not in readings:
+                row.append([]); continue
+            ranked_readings = [[next(ranked) for _ in parts] for parts in readings[(r,c)]]
+            row.append(_cell_candidates(ranked_readings, c, top_k))
+        candidates.append(row)
+
+    grid = _resolve_grid(candidates)
+    unresolved = [(r,c) for r in range(5) for c in range(5) if grid[r][c] == 'ERR']
+    return {"grid": grid, "candidates": candidates, "unresolved": unresolved}
+
+def read_board(image_path, top_k:int=3):
+    """
+    Liest ein Board per Nächster-Nachbar-Suche über die Ziffern-Samples und löst Mehrdeutigkeiten über die
+    B-I-N-G-O-Spaltenbereiche und Eindeutigkeit auf der Karte. image_path darf auch Bild-Bytes sein.
+    Rückgabe: {"grid": 5x5 (int / None für FREE / 'ERR'),
+               "candidates": 5x5 Listen [(Zahl, Score), ...] (None für FREE),
+               "unresolved": [(r,c), ...]}
+    """
+    trace = _start_trace(image_path)
+    try:
+        store = _load_store()
+        readings, flat = _board_readings(image_path, store)
+        res = _decode_board(readings, iter(_classify(store, flat)), top_k)
+    except Exception as e:
+        _finish_trace(trace, error=e)
+        raise
+    _finish_trace(trace, res)
+    return res
+
+def read_boards(sources, top_k:int=3, workers=None, store=None):
+    """
+    Liest viele Boards (Pfade oder Bytes) auf einmal. Decodieren/Segmentieren läuft in einem
+    Thread-Pool (cv2 gibt den GIL frei), alle Ziffern werden danach mit dem einmal geladenen
+    Sample-Store in einem einzigen _classify-Aufruf bewertet.
+    Rückgabe in Eingabereihenfolge: read_board-Dicts bzw. {"error": "..."} für unlesbare Bilder.
+    Mit Profiling enthält "trace" die Zeiten pro Board (ohne das gemeinsame _classify).
+    store: statt des gespeicherten Sample-Stores (score_corpus).
+    """
+    sources = list(sources)
+    store = _load_store() if store is None else store
+
+    def prepare(src):
+        trace = _start_trace(src)
+        try:
+            res = _board_readings(src, store)
+            if trace is not None:
+                trace["prep_s"] = time.perf_counter() - trace["t0"]
+            return res, None, trace
+        except Exception as e:
+            _finish_trace(trace, error=e)
+            return None, str(e), trace
+        finally:
+            _TLS.trace = None
+
+    workers = workers or min(8, os.cpu_count() or 1)
+    if workers == 1 or len(sources) < 2:
+        prepared = [prepare(src) for src in sources]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            prepared = list(ex.map(prepare, sources))
+
+    flat = [roi for res, _, _ in prepared if res for roi in res[1]]
+    ranked = iter(_classify(store, flat))
+    results = []
+    for res, err, trace in prepared:
+        out = {"error": err} if err else _decode_board(res[0], ranked, top_k)
+        if trace is not None:
+            if not err:
+                _finish_trace(trace, out, elapsed=trace.pop("prep_s"))
+            out["trace"] = trace
+        results.append(out)
+    return results
+
+def image_to_grid(image_path:str):
+    """
+    Liest ein Board mit Template-Matching (wenn Templates vorhanden),
+    unsichere Zellen werden 'ERR'. Mitte (2,2) ist immer None (FREE).
+    """
+    return read_board(image_path)["grid"]
+
+def image_to_grid_batch(sources, workers=None):
+    """Wie image_to_grid für viele Bilder (siehe read_boards); None für unlesbare Bilder."""
+    return [res.get("grid") for res in read_boards(sources, workers=workers)]
@@ -0,0 +1,256 @@
+"""
+Zentraler Rate-Limiter für alle ausgehenden Bot-Requests (Token-Buckets).
+
+Wird per ApplicationBuilder().rate_limiter(Outbox()) installiert und sieht damit
+jeden API-Call. Telegram erlaubt grob ~30 Nachrichten/s insgesamt, ~1/s pro
+Privat-Chat und ~20/min pro Gruppe:
+
+  * Nachrichten (send*/copy/forward/edit*) warten auf einen Token ihres Chats
+    und einen globalen Token, alles andere (answerCallbackQuery, get*) nur global.
+  * Lanes: "high" (Callback-Antworten, Abfragen) vor "normal" (Antworten, Host-
+    Feedback) vor "low" (DMs, Deko-Bilder) – pro Bucket per Heap.
+  * Coalescing: gleicher "coalesce"-Schlüssel, solange der ältere Request noch
+    wartet -> der ältere entfällt und bekommt das Ergebnis des neueren.
+  * RetryAfter: Bucket (Chat bzw. global) wird pausiert, Request neu eingereiht.
+
+Aufrufer geben Hinweise über rate_limit_args:
+
+    await ctx.bot.send_message(chat_id, text, rate_limit_args={"lane": "low", "coalesce": "dm:42"})
+
+stats() liefert die Zahl offener Requests (wartend oder unterwegs) je Lane und
+Zähler für gesendete, wiederholte und zusammengefasste Requests (Logs / Metriken).
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger("bingo-bot.outbox")
+
+# .env wird vom Aufrufer vor dem Import geladen (bot.py)
+
+GLOBAL_RATE = float(os.getenv("OUTBOX_GLOBAL_RATE", "25"))         # Nachrichten/s gesamt
+PRIVATE_RATE = float(os.getenv("OUTBOX_PRIVATE_RATE", "1"))        # Nachrichten/s pro Privat-Chat
+PRIVATE_BURST = float(os.getenv("OUTBOX_PRIVATE_BURST", "3"))      # z.B. /start schickt 3 Nachrichten am Stück
+GROUP_RATE = float(os.getenv("OUTBOX_GROUP_PER_MIN", "20")) / 60  # Nachrichten/s pro Gruppe
+GROUP_BURST = float(os.getenv("OUTBOX_GROUP_BURST", "5"))
+MAX_RETRIES = int(os.getenv("OUTBOX_MAX_RETRIES", "3"))
+WARN_DEPTH = int(os.getenv("OUTBOX_WARN_DEPTH", "50"))  # ab dieser Queue-Tiefe warnen
+
+MAX_IDLE_BUCKETS = 5000  # volle (= unbenutzte) Chat-Buckets ab dieser Anzahl verwerfen
+
+LANES = {"high": 0, "normal": 1, "low": 2}
+
+# Endpunkte, die gegen das Nachrichten-Limit eines Chats zählen
+_CHAT_LIMITED_PREFIXES = ("send", "copyMessage", "forwardMessage", "editMessage")
+# ohne Angabe sofort dran (Nutzer wartet auf Spinner bzw. Handler auf die Antwort)
+_HIGH_ENDPOINTS = {"answerCallbackQuery", "getChatMember", "getChat", "getFile", "getMe"}
+
+_SUPERSEDED = object()
+
+
+class TokenBucket:
+    """
+    rate Tokens pro Sekunde, höchstens capacity auf Vorrat. Wartende liegen in
+    einem Heap (lane, seq) und werden per call_later freigegeben – ohne eigenen Task.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+        self.waiters = []  # heap (lane, seq, future)
+        self._timer = None
+        self._seq = itertools.count()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def full(self) -> bool:
+        self._refill()
+        return not self.waiters and self.tokens >= self.capacity
+
+    def pause(self, seconds: float):
+        """Nach RetryAfter: die nächsten `seconds` keine Tokens ausgeben."""
+        self._refill()
+        self.tokens = min(self.tokens, 1.0 - seconds * self.rate)
+
+    def wait(self, lane: int = 1) -> asyncio.Future:
+        """Future, das mit None erfüllt wird, sobald ein Token für diesen Wartenden frei ist."""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._refill()
+        if not self.waiters and self.tokens >= 1.0:
+            self.tokens -= 1.0
+            fut.set_result(None)
+            return fut
+        heapq.heappush(self.waiters, (lane, next(self._seq), fut))
+        self._schedule(loop)
+        return fut
+
+    def _schedule(self, loop):
+        if self._timer is None and self.waiters:
+            delay = max(0.0, (1.0 - self.tokens) / self.rate)
+            self._timer = loop.call_later(delay, self._release)
+
+    def _release(self):
+        self._timer = None
+        self._refill()
+        while self.waiters and (self.waiters[0][2].done() or self.tokens >= 1.0):
+            _, _, fut = heapq.heappop(self.waiters)
+            if fut.done():  # abgebrochen oder per Coalescing erledigt
+                continue
+            self.tokens -= 1.0
+            fut.set_result(None)
+        if self.waiters:
+            self._schedule(asyncio.get_running_loop())
+
+
+class _Request:
+    __slots__ = ("fut", "result", "superseded_by")
+
+    def __init__(self, loop):
+        self.fut = None  # Future, auf das gerade gewartet wird (Bucket-Token)
+        self.result = loop.create_future()  # Ergebnis für ersetzte Vorgänger
+        self.superseded_by = None
+
+
+class Outbox(BaseRateLimiter):
+    def __init__(self, global_rate=GLOBAL_RATE, private_rate=PRIVATE_RATE, private_burst=PRIVATE_BURST,
+                 group_rate=GROUP_RATE, group_burst=GROUP_BURST, max_retries=MAX_RETRIES):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.private_rate = private_rate
+        self.private_burst = private_burst
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.max_retries = max_retries
+        self.chats = {}  # chat_id -> TokenBucket
+        self._coalesce = {}  # key -> _Request (noch wartend)
+        self.queued = {lane: 0 for lane in LANES}
+        self.max_queued = 0
+        self.sent = 0
+        self.retries = 0
+        self.coalesced = 0
+        self._last_warn = 0.0
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        for req in list(self._coalesce.values()):
+            if req.fut is not None and not req.fut.done():
+                req.fut.cancel()
+        self._coalesce.clear()
+
+    # ---------- Buckets ----------
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self.chats.get(chat_id)
+        if bucket is None:
+            if len(self.chats) >= MAX_IDLE_BUCKETS:
+                self.chats = {cid: b for cid, b in self.chats.items() if not b.full()}
+            # Gruppen/Kanäle haben negative IDs bzw. @username
+            if not isinstance(chat_id, int) or chat_id < 0:
+                bucket = TokenBucket(self.group_rate, self.group_burst)
+            else:
+                bucket = TokenBucket(self.private_rate, self.private_burst)
+            self.chats[chat_id] = bucket
+        return bucket
+
+    async def _take(self, bucket, lane, req):
+        req.fut = bucket.wait(lane)
+        return await req.fut
+
+    # ---------- Metriken ----------
+
+    def stats(self) -> dict:
+        return {
+            "queued": sum(self.queued.values()),
+            "queued_by_lane": dict(self.queued),
+            "max_queued": self.max_queued,
+            "sent": self.sent,
+            "retries": self.retries,
+            "coalesced": self.coalesced,
+            "chat_buckets": len(self.chats),
+        }
+
+    def _track(self, lane_name, delta):
+        self.queued[lane_name] += delta
+        depth = sum(self.queued.values())
+        if depth > self.max_queued:
+            self.max_queued = depth
+        if depth >= WARN_DEPTH and time.monotonic() - self._last_warn > 30:
+            self._last_warn = time.monotonic()
+            logger.warning(f"Outbox queue depth {depth}: {self.queued}")
+
+    # ---------- BaseRateLimiter ----------
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        rla = rate_limit_args if isinstance(rate_limit_args, dict) else {}
+        lane_name = rla.get("lane") or ("high" if endpoint in _HIGH_ENDPOINTS else "normal")
+        if lane_name not in LANES:
+            lane_name = "normal"
+        lane = LANES[lane_name]
+        chat_id = data.get("chat_id") if endpoint.startswith(_CHAT_LIMITED_PREFIXES) else None
+
+        req = _Request(asyncio.get_running_loop())
+        key = rla.get("coalesce")
+        if key is not None:
+            prev = self._coalesce.get(key)
+            if prev is not None and prev.fut is not None and not prev.fut.done():
+                prev.superseded_by = req
+                prev.fut.set_result(_SUPERSEDED)
+            self._coalesce[key] = req
+
+        self._track(lane_name, +1)
+        try:
+            result = await self._send(req, key, callback, args, kwargs, endpoint, chat_id, lane)
+        except asyncio.CancelledError:
+            req.result.cancel()
+            raise
+        except Exception as e:
+            req.result.set_exception(e)
+            req.result.exception()  # gilt als abgerufen, auch wenn keiner ersetzt wurde
+            raise
+        finally:
+            self._track(lane_name, -1)
+            if key is not None and self._coalesce.get(key) is req:
+                del self._coalesce[key]
+        req.result.set_result(result)
+        return result
+
+    async def _send(self, req, key, callback, args, kwargs, endpoint, chat_id, lane):
+        chat_bucket = self._chat_bucket(chat_id) if chat_id is not None else None
+        for attempt in range(self.max_retries + 1):
+            if chat_bucket is not None and await self._take(chat_bucket, lane, req) is _SUPERSEDED:
+                self.coalesced += 1
+                return await asyncio.shield(req.superseded_by.result)
+            if await self._take(self.global_bucket, lane, req) is _SUPERSEDED:
+                self.coalesced += 1
+                if chat_bucket is not None:
+                    chat_bucket.tokens += 1.0  # Chat-Token zurückgeben, gesendet wird ja nichts
+                return await asyncio.shield(req.superseded_by.result)
+
+            if key is not None and self._coalesce.get(key) is req:
+                del self._coalesce[key]  # ab jetzt wird gesendet, nicht mehr ersetzbar
+            try:
+                result = await callback(*args, **kwargs)
+            except RetryAfter as e:
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                delay = e.retry_after
+                delay = delay.total_seconds() if hasattr(delay, "total_seconds") else float(delay)
+                logger.warning(f"RetryAfter {delay}s on {endpoint} (chat {chat_id}), attempt {attempt + 1}")
+                (chat_bucket or self.global_bucket).pause(delay)
+                continue
+            self.sent += 1
+            return result
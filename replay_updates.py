@@ -0,0 +1,131 @@
+"""
+Spielt aufgezeichnete Telegram-Updates gegen den Webhook des Bots ab.
+
+    python replay_updates.py updates.jsonl [--url URL] [--secret S] [-c 8] [--repeat N] [--rate R]
+
+Eingabe: JSON-Zeilen (wie sie der Bot mit UPDATE_LOG=... mitschreibt) oder eine
+JSON-Liste von Updates. Jedes Update wird als POST mit dem Header
+X-Telegram-Bot-Api-Secret-Token an den Webhook geschickt (BOT_MODE=webhook);
+update_ids werden fortlaufend neu vergeben, damit Wiederholungen eindeutig bleiben.
+
+Ausgabe: Statuscodes, Durchsatz und p50/p95/p99 der Antwortzeit des Webhooks.
+Die Antworten des Bots gehen an TELEGRAM_BASE_URL – für Tests ohne Netz dort
+einen lokalen Bot-API-Server bzw. eine Attrappe eintragen.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def load_updates(path):
+    with open(path, encoding="utf-8") as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _pct(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q / 100 * len(values)))] * 1000, 2)
+
+
+def replay(updates, url, secret=None, concurrency=8, repeat=1, rate=None, first_id=1, timeout=30):
+    """Schickt alle Updates (repeat-mal) und gibt eine Zusammenfassung als dict zurück."""
+    payloads = []
+    update_id = first_id
+    for _ in range(repeat):
+        for upd in updates:
+            upd = dict(upd)
+            upd["update_id"] = update_id
+            update_id += 1
+            payloads.append(json.dumps(upd).encode("utf-8"))
+
+    headers = {"Content-Type": "application/json"}
+    if secret:
+        headers["X-Telegram-Bot-Api-Secret-Token"] = secret
+
+    statuses = Counter()
+    latencies = []
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def post(i, body):
+        if rate:
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        req = urllib.request.Request(url, data=body, headers=headers, method="POST")
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                status = resp.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except OSError as e:
+            status = type(e).__name__
+        dt = time.perf_counter() - t0
+        with lock:
+            statuses[status] += 1
+            latencies.append(dt)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(post, range(len(payloads)), payloads))
+    wall = time.perf_counter() - start
+
+    return {
+        "sent": len(payloads),
+        "status": dict(statuses),
+        "seconds": round(wall, 3),
+        "updates_per_s": round(len(payloads) / wall, 1) if wall else None,
+        "p50_ms": _pct(latencies, 50),
+        "p95_ms": _pct(latencies, 95),
+        "p99_ms": _pct(latencies, 99),
+        "max_ms": round(max(latencies) * 1000, 2) if latencies else None,
+    }
+
+
+def main(argv=None):
+    default_url = "http://{}:{}/{}".format(
+        os.getenv("WEBHOOK_LISTEN", "127.0.0.1"), os.getenv("WEBHOOK_PORT", "8080"),
+        os.getenv("WEBHOOK_PATH", "telegram").lstrip("/"),
+    )
+    ap = argparse.ArgumentParser(description="Replay recorded Telegram updates against the bot's webhook.")
+    ap.add_argument("updates", help="JSON lines (UPDATE_LOG) or a JSON list of updates")
+    ap.add_argument("--url", default=default_url)
+    ap.add_argument("--secret", default=os.getenv("WEBHOOK_SECRET"), help="X-Telegram-Bot-Api-Secret-Token")
+    ap.add_argument("-c", "--concurrency", type=int, default=8)
+    ap.add_argument("--repeat", type=int, default=1, help="send the whole file N times")
+    ap.add_argument("--rate", type=float, default=None, help="updates per second (default: as fast as possible)")
+    ap.add_argument("--first-id", type=int, default=1, help="first update_id to assign")
+    ap.add_argument("--json", help="write the summary as JSON to this file")
+    args = ap.parse_args(argv)
+
+    updates = load_updates(args.updates)
+    if not updates:
+        print(f"No updates in {args.updates}")
+        return 1
+    result = replay(updates, args.url, args.secret, args.concurrency, args.repeat, args.rate, args.first_id)
+    for key, value in result.items():
+        print(f"{key:>14}: {value}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0 if set(result["status"]) == {200} else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Synthetische Bingo-Karten im KasBots-Layout für OCR-Tests.
+
+    python synth_cards.py out_dir [-n 100] [--seed 1] [--clean]
+
+Erzeugt zufällige gültige 5x5-Karten (B 1-15, I 16-30, ..., Mitte FREE) mit
+variierender Schrift, Größe, Rotation, Perspektive, JPEG-Qualität und
+Rauschen. Neben jedes Bild wird '<bild>.txt' mit den 25 Werten geschrieben
+(Korpus-Format von bench_ocr.py / train_ocr.py).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from utils import COLUMN_RANGES
+
+FONTS = (
+    cv2.FONT_HERSHEY_SIMPLEX,
+    cv2.FONT_HERSHEY_DUPLEX,
+    cv2.FONT_HERSHEY_TRIPLEX,
+    cv2.FONT_HERSHEY_COMPLEX,
+)
+
+# Grundlayout (989 x 1280 wie die Original-Uploads), Gitter in Anteilen der Bildgröße
+CARD_W, CARD_H = 989, 1280
+GRID_TOP, GRID_BOTTOM = 0.215, 0.905
+GRID_LEFT, GRID_RIGHT = 0.04, 0.955
+
+
+def random_card(rng):
+    """Gültige Karte: pro Spalte 5 verschiedene Zahlen aus ihrem Bereich, Mitte None."""
+    cols = [rng.sample(range(lo, hi + 1), 5) for lo, hi in COLUMN_RANGES]
+    grid = [[cols[c][r] for c in range(5)] for r in range(5)]
+    grid[2][2] = None
+    return grid
+
+
+def _put_centered(img, text, center, font, height_px, thickness, color, max_width=None):
+    scale = cv2.getFontScaleFromHeight(font, height_px, thickness)
+    (tw, th), _ = cv2.getTextSize(text, font, scale, thickness)
+    if max_width and tw > max_width:
+        scale *= max_width / tw
+        (tw, th), _ = cv2.getTextSize(text, font, scale, thickness)
+    org = (int(center[0] - tw / 2), int(center[1] + th / 2))
+    cv2.putText(img, text, org, font, scale, color, thickness, cv2.LINE_AA)
+
+
+def render_card(grid, rng, card_number=None):
+    """Zeichnet eine Karte ohne Störungen (BGR, CARD_W x CARD_H)."""
+    img = np.full((CARD_H, CARD_W, 3), 255, np.uint8)
+
+    # Hintergrund-Deko: verstreute rosa 0/1 wie auf den echten Karten
+    for _ in range(rng.randint(40, 120)):
+        x, y = rng.randrange(CARD_W), rng.randrange(CARD_H)
+        cv2.putText(img, rng.choice("01"), (x, y), cv2.FONT_HERSHEY_SIMPLEX,
+                    rng.uniform(0.4, 1.0), (190, 140, 235), 1, cv2.LINE_AA)
+
+    # Kopfzeile
+    _put_centered(img, "KASBOTS", (int(CARD_W * 0.25), int(CARD_H * 0.125)),
+                  cv2.FONT_HERSHEY_DUPLEX, 22, 2, (0, 0, 0))
+    _put_centered(img, "BINGO", (int(CARD_W * 0.48), int(CARD_H * 0.16)),
+                  cv2.FONT_HERSHEY_TRIPLEX, 60, 4, (60, 60, 60))
+
+    x0, x1 = int(CARD_W * GRID_LEFT), int(CARD_W * GRID_RIGHT)
+    y0, y1 = int(CARD_H * GRID_TOP), int(CARD_H * GRID_BOTTOM)
+    cw, ch = (x1 - x0) / 5.0, (y1 - y0) / 5.0
+    cv2.rectangle(img, (x0, y0), (x1, y1), (255, 255, 255), -1)
+
+    font = rng.choice(FONTS)
+    thickness = rng.randint(5, 9)
+    gray = rng.randint(60, 100)
+    digit_h = int(ch * rng.uniform(0.42, 0.55))
+    for r in range(5):
+        for c in range(5):
+            cx, cy = x0 + (c + 0.5) * cw, y0 + (r + 0.5) * ch
+            v = grid[r][c]
+            if v is None:
+                # FREE-Feld: dunkles Quadrat mit Beschriftung
+                m = 0.12
+                p1 = (int(x0 + (c + m) * cw), int(y0 + (r + m) * ch))
+                p2 = (int(x0 + (c + 1 - m) * cw), int(y0 + (r + 1 - m) * ch))
+                cv2.rectangle(img, p1, p2, (70, 90, 20), -1)
+                cv2.circle(img, (int(cx), int(cy)), int(ch * 0.28), (180, 180, 180), -1)
+                _put_centered(img, "FREE", (cx, cy - ch * 0.3), cv2.FONT_HERSHEY_SIMPLEX, 12, 1, (255, 255, 255))
+                continue
+            _put_centered(img, str(v), (cx, cy), font, digit_h, thickness, (gray, gray, gray),
+                          max_width=cw * 0.78)
+
+    line = rng.randint(3, 5)
+    for i in range(6):
+        x = int(x0 + i * cw)
+        y = int(y0 + i * ch)
+        cv2.line(img, (x, y0), (x, y1), (0, 0, 0), line)
+        cv2.line(img, (x0, y), (x1, y), (0, 0, 0), line)
+
+    if card_number is not None:
+        cv2.putText(img, f"CARD {card_number}", (x0, int(CARD_H * 0.93)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 0), 2, cv2.LINE_AA)
+    return img
+
+
+def distort(img, rng):
+    """Skalierung, Rotation, Perspektive, Unschärfe und Rauschen."""
+    h, w = img.shape[:2]
+    scale = rng.uniform(0.5, 1.6)
+    out_w, out_h = int(w * scale), int(h * scale)
+
+    # Perspektive + Rotation: Bildecken verschieben, auf etwas größere Fläche mit Rand legen
+    margin = 0.08
+    angle = np.deg2rad(rng.uniform(-4, 4))
+    src = np.float32([[0, 0], [w, 0], [w, h], [0, h]])
+    center = np.float32([w / 2, h / 2])
+    rot = np.float32([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    dst = (src - center) @ rot.T + center
+    dst += np.float32([[rng.uniform(-0.03, 0.03) * w, rng.uniform(-0.03, 0.03) * h] for _ in range(4)])
+    dst = (dst + np.float32([margin * w, margin * h])) * scale / (1 + 2 * margin)
+    M = cv2.getPerspectiveTransform(src, dst)
+    bg = tuple(rng.randint(150, 255) for _ in range(3))
+    img = cv2.warpPerspective(img, M, (out_w, out_h), flags=cv2.INTER_AREA,
+                              borderMode=cv2.BORDER_CONSTANT, borderValue=bg)
+
+    if rng.random() < 0.5:
+        img = cv2.GaussianBlur(img, (0, 0), rng.uniform(0.3, 1.5))
+    sigma = rng.uniform(0, 12)
+    if sigma > 1:
+        cv2.setRNGSeed(rng.randrange(2**31))
+        noise = np.empty(img.shape, np.int16)
+        cv2.randn(noise, 0, sigma)
+        img = cv2.add(img, noise, dtype=cv2.CV_8U)
+    return img
+
+
+def write_card(out_dir, name, img, grid, jpeg_quality):
+    path = os.path.join(out_dir, name)
+    cv2.imwrite(path, img, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+    with open(path + ".txt", "w", encoding="utf-8") as f:
+        f.write("\n".join(" ".join("FREE" if v is None else str(v) for v in row) for row in grid) + "\n")
+    return path
+
+
+def generate(out_dir, n, seed=None, clean=False):
+    """Erzeugt n Karten in out_dir, gibt die Bildpfade zurück."""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(n):
+        grid = random_card(rng)
+        img = render_card(grid, rng, card_number=rng.randint(1, 9999))
+        quality = 95
+        if not clean:
+            img = distort(img, rng)
+            quality = rng.randint(35, 95)
+        paths.append(write_card(out_dir, f"synth_{i:05d}.jpg", img, grid, quality))
+    return paths
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Render synthetic KasBots bingo cards with labels.")
+    ap.add_argument("out_dir")
+    ap.add_argument("-n", type=int, default=100, help="number of cards")
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--clean", action="store_true", help="no distortions (e.g. for training)")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    paths = generate(args.out_dir, args.n, args.seed, args.clean)
+    print(f"Wrote {len(paths)} cards to {args.out_dir} in {time.perf_counter() - t0:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
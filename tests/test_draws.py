@@ -0,0 +1,33 @@
+"""Mehrere Zahlen pro /call: db.insert_draws + completion_index wie in _process_called_numbers."""
+import pytest
+
+import db
+from utils import completion_index
+
+from test_utils import GRID
+
+
+@pytest.fixture
+def sid(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "test.db"))
+    db.init_db()
+    return db.create_session(-100, 1)
+
+
+def test_insert_draws_numbers_consecutively_and_skips_repeats(sid):
+    assert db.insert_draws(sid, [5, 12]) == [(1, 5), (2, 12)]
+    assert db.insert_draws(sid, [12, 33, 33, 61]) == [(3, 33), (4, 61)]
+    assert db.insert_draws(sid, [5]) == []
+    assert db.get_draw_order(sid) == {5: 1, 12: 2, 33: 3, 61: 4}
+
+
+def test_multi_number_call_credits_the_completing_number(sid):
+    db.insert_draws(sid, [1, 16, 31])
+    new = db.insert_draws(sid, [70, 46, 61, 2])  # Zeile 0 wird mit 61 fertig, nicht mit 2
+    done_at = completion_index(GRID, db.get_draw_order(sid), "standard")
+    assert dict(new)[done_at] == 61
+
+
+def test_multi_number_call_without_win(sid):
+    db.insert_draws(sid, [1, 16, 31, 46])
+    assert completion_index(GRID, db.get_draw_order(sid), "standard") is None
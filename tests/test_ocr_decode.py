@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip("cv2")
+import ocr  # noqa: E402
+
+
+def candidates_with(cells):
+    """5x5-Kandidaten: FREE in der Mitte, sonst leer außer den gegebenen {(r,c): [(Zahl, Score)]}."""
+    cands = [[[] for _ in range(5)] for _ in range(5)]
+    cands[2][2] = None
+    for rc, cand in cells.items():
+        cands[rc[0]][rc[1]] = cand
+    return cands
+
+
+def test_resolve_grid_accepts_in_range():
+    grid = ocr._resolve_grid(candidates_with({(0, 0): [(7, 0.95)], (0, 1): [(23, 0.9)]}))
+    assert grid[0][0] == 7 and grid[0][1] == 23
+    assert grid[2][2] is None
+
+
+def test_resolve_grid_flags_column_range_violation():
+    # 42 gehört in N, nicht in B – auch bei hohem Score nicht übernehmen
+    grid = ocr._resolve_grid(candidates_with({(0, 0): [(42, 0.99)]}))
+    assert grid[0][0] == "ERR"
+
+
+def test_resolve_grid_falls_back_to_next_in_range_candidate():
+    grid = ocr._resolve_grid(candidates_with({(0, 0): [(42, 0.99), (12, 0.8)]}))
+    assert grid[0][0] == 12
+
+
+def test_resolve_grid_duplicate_and_low_score():
+    grid = ocr._resolve_grid(candidates_with({
+        (0, 0): [(7, 0.95)],
+        (1, 0): [(7, 0.90), (1, 0.7)],  # 7 schon vergeben -> nächster Kandidat
+        (2, 0): [(7, 0.85), (9, 0.5)],  # Rest unter MIN_SCORE
+    }))
+    assert [grid[r][0] for r in range(3)] == [7, 1, "ERR"]
+
+
+def test_out_of_range_reading_has_no_candidates():
+    # Ziffern "4","2" in Spalte B: keine Lesart liegt in 1-15
+    ranked = [[[(4, 0.99), (5, 0.6)], [(2, 0.99)]]]
+    assert ocr._cell_candidates(ranked, 0) == []
+    assert ocr._cell_candidates(ranked, 2) == [(42, 0.99)]  # 52 gehört nach G
+
+
+def test_decode_board_reports_unresolved():
+    readings = {(0, 0): [["roi4", "roi2"]]}
+    ranked = iter([[(4, 0.99)], [(2, 0.99)]])
+    res = ocr._decode_board(readings, ranked, top_k=3)
+    assert res["grid"][0][0] == "ERR"
+    assert (0, 0) in res["unresolved"]
@@ -0,0 +1,41 @@
+import pytest
+
+from router import CallbackRouter
+
+
+@pytest.fixture
+def router():
+    r = CallbackRouter()
+
+    @r.route("p_join")
+    async def p_join(update, ctx):
+        pass
+
+    @r.route("view_board:{bid:int}", invalid="Invalid board ID.")
+    async def view_board(update, ctx, bid):
+        pass
+
+    return r
+
+
+def test_exact_and_prefixed(router):
+    route, params = router.resolve("p_join")
+    assert route.pattern == "p_join" and params == {}
+    route, params = router.resolve("view_board:42")
+    assert route.pattern == "view_board:{bid:int}" and params == {"bid": 42}
+
+
+def test_bad_parameter_keeps_route_for_invalid_reply(router):
+    route, params = router.resolve("view_board:abc")
+    assert route.invalid == "Invalid board ID." and params is None
+    assert router.resolve("view_board:1:2") == (route, None)
+
+
+def test_unknown(router):
+    assert router.resolve("nope") == (None, None)
+    assert router.resolve("p_join:1") == (None, None)
+
+
+def test_duplicate_route_rejected(router):
+    with pytest.raises(ValueError):
+        router.route("p_join")
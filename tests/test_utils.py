@@ -0,0 +1,58 @@
+from utils import completion_index, winning_lines
+
+# Zeile r: B=1+r, I=16+r, N=31+r, G=46+r, O=61+r; Mitte FREE
+GRID = [[15*c + 1 + r for c in range(5)] for r in range(5)]
+GRID[2][2] = None
+CORNERS = [GRID[0][0], GRID[0][4], GRID[4][0], GRID[4][4]]
+
+
+def order_of(numbers):
+    """{Zahl: Draw-Index} wie db.get_draw_order, Indizes ab 1."""
+    return {n: i for i, n in enumerate(numbers, 1)}
+
+
+def test_not_complete():
+    assert completion_index(GRID, order_of([1, 16, 31, 46]), "standard") is None
+    assert completion_index(GRID, {}, "standard") is None
+
+
+def test_index_of_completing_number():
+    # Rauschen vorher/nachher ändert nichts: Zeile 0 ist mit 61 (Index 7) fertig
+    order = order_of([70, 1, 16, 31, 2, 46, 61, 75])
+    assert completion_index(GRID, order, "standard") == 7
+
+
+def test_earliest_line_wins():
+    # Spalte B (1-5) fertig bei Index 5, Zeile 0 erst bei Index 9
+    order = order_of([1, 2, 3, 4, 5, 16, 31, 46, 61])
+    assert completion_index(GRID, order, "standard") == 5
+
+
+def test_free_cell_counts():
+    order = order_of([3, 18, 48, 63])  # Zeile 2 ohne Mitte
+    assert completion_index(GRID, order, "standard") == 4
+
+
+def test_four_corners_win_with_every_pattern():
+    order = order_of(CORNERS)
+    for pattern in ("standard", "x", "corners", "unknown"):
+        assert completion_index(GRID, order, pattern) == 4, pattern
+
+
+def test_corners_pattern_ignores_rows():
+    order = order_of(GRID[0])
+    assert completion_index(GRID, order, "standard") == 5
+    assert completion_index(GRID, order, "corners") is None
+
+
+def test_x_pattern_needs_both_diagonals():
+    diag = [GRID[i][i] for i in range(5) if i != 2]
+    anti = [GRID[i][4 - i] for i in range(5) if i != 2]
+    assert completion_index(GRID, order_of(diag), "standard") == 4
+    assert completion_index(GRID, order_of(diag), "x") is None
+    assert completion_index(GRID, order_of(GRID[0]), "x") is None
+    assert completion_index(GRID, order_of(diag + anti), "x") == 8
+
+
+def test_unknown_pattern_is_standard():
+    assert winning_lines("nope") is winning_lines("standard")
@@ -0,0 +1,81 @@
+"""
+Trainiert die Ziffern-Templates mit allen gelabelten Boards eines Verzeichnisses.
+
+    python train_ocr.py [corpus_dir] [--workers N] [--check DIR | --no-check] [--force]
+
+Korpus-Format wie bench_ocr.py: Bild + '<bild>.txt' mit 25 Werten.
+Das Training ist inkrementell – jeder Lauf ergänzt die bisherigen Templates.
+Vor dem Speichern wird der neue Store auf dem Prüfkorpus (--check, Standard
+OCR_CORPUS_DIR) gegen den bisherigen gemessen; liest er weniger Zellen oder
+Boards richtig, bleibt der alte Store stehen (--force speichert trotzdem).
+"""
+import argparse
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import ocr  # noqa: E402 – TEMPL_DIR & Co. kommen ggf. aus .env
+
+
+def _fmt(score):
+    return (f"cells {score['cells_ok']}/{score['cells']}, boards {score['boards_ok']}/{score['boards']}, "
+            f"unresolved {score['unresolved']}")
+
+
+def _regression_check(corpus, force):
+    """accept-Callback für train_templates_from_dir: neuer Store darf nicht schlechter lesen."""
+    old = ocr.score_corpus(corpus) if ocr.templates_available() else None
+    print(f"Check corpus before: {_fmt(old) if old else 'no usable store yet'}")
+
+    def accept(store):
+        new = ocr.score_corpus(corpus, store=store)
+        print(f"Check corpus after:  {_fmt(new)}")
+        if old is None or (new["cells_ok"] >= old["cells_ok"] and new["boards_ok"] >= old["boards_ok"]):
+            return True
+        if force:
+            print("  ⚠️ worse than the current store – saving anyway (--force)")
+            return True
+        print("  ✗ worse than the current store – not saved (use --force to override)")
+        return False
+    return accept
+
+
+def main(argv=None):
+    default_corpus = os.getenv("OCR_CORPUS_DIR", "storage/corpus")
+    ap = argparse.ArgumentParser(description="Train OCR digit templates from a labeled directory.")
+    ap.add_argument("corpus", nargs="?", default=default_corpus)
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    ap.add_argument("--check", default=default_corpus, help="labeled corpus the new store must not score worse on")
+    ap.add_argument("--no-check", action="store_true", help="skip the regression check")
+    ap.add_argument("--force", action="store_true", help="save even if the check corpus scores worse")
+    args = ap.parse_args(argv)
+
+    accept = None
+    if not args.no_check:
+        check = list(ocr.iter_corpus(args.check)) if os.path.isdir(args.check) else []
+        if check:
+            accept = _regression_check(check, args.force)
+        else:
+            print(f"No labeled images in {args.check!r} – skipping regression check")
+
+    t0 = time.perf_counter()
+    res = ocr.train_templates_from_dir(args.corpus, workers=args.workers, accept=accept)
+    dt = time.perf_counter() - t0
+
+    print(f"Trained on {res['boards'] - len(res['failed'])}/{res['boards']} boards "
+          f"({res['samples']} digit samples) in {dt:.2f}s")
+    for path, err in res["failed"]:
+        print(f"  ✗ {path}: {err}")
+    if not res["saved"]:
+        print("Templates: unchanged")
+        return 1
+    print("Templates: ✅ ready" if res["ready"] else "Templates: ❌ incomplete (missing digits)")
+    return 0 if res["ready"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
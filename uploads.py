@@ -0,0 +1,130 @@
+"""
+Content-adressierte Ablage der Board-Uploads (nur mit UPLOAD_AUDIT=1).
+
+    UPLOAD_DIR/ab/abcdef0123....jpg   (sha256 des Inhalts, Duplikate nur einmal)
+
+Der Bot liest Uploads direkt aus dem Speicher; hier landet nur eine Kopie für
+spätere Audits / Korpus-Pflege. prune() hält UPLOAD_DIR unter UPLOAD_QUOTA_MB
+(LRU über die mtime, erneute Uploads frischen sie auf) und läuft als
+Hintergrund-Job – Upload-Handler löschen und scannen nie selbst.
+migrate_legacy() verschiebt die alten u<id>.jpg-Uploads einmalig hierher.
+"""
+import hashlib
+import logging
+import os
+import re
+import tempfile
+
+logger = logging.getLogger("bingo-bot.uploads")
+
+# .env wird vom Aufrufer vor dem Import geladen (bot.py), sonst gelten die Defaults
+UPLOAD_AUDIT = os.getenv("UPLOAD_AUDIT", "0") == "1"
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "storage/uploads")
+UPLOAD_QUOTA_MB = float(os.getenv("UPLOAD_QUOTA_MB", "500"))
+UPLOAD_PRUNE_INTERVAL = int(os.getenv("UPLOAD_PRUNE_INTERVAL", "900"))  # Sekunden
+
+# Alte, pro User überschriebene Upload-Dateien im IMAGES_DIR (u123.jpg, u123_last.png, train_123.png)
+_LEGACY_MARKER = ".legacy_migrated"  # in UPLOAD_DIR, sobald migrate_legacy() durch ist
+_LEGACY_RE = re.compile(r"^(?:u|train_)\d+(?:_last)?\.(?:jpe?g|png|webp|bmp)$", re.IGNORECASE)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _path_for(digest: str, ext: str) -> str:
+    ext = (ext or ".jpg").lower()
+    if not ext.startswith("."):
+        ext = "." + ext
+    return os.path.join(UPLOAD_DIR, digest[:2], digest + ext)
+
+
+def store(data: bytes, ext: str = ".jpg"):
+    """
+    Legt einen Upload unter seinem Hash ab (nur mit UPLOAD_AUDIT=1) und gibt den
+    Pfad zurück, sonst None. Schon vorhandene Inhalte werden nicht neu
+    geschrieben, nur ihre mtime aufgefrischt (LRU). Blockierend -> im Worker-Thread aufrufen.
+    """
+    if not UPLOAD_AUDIT:
+        return None
+    return _write(data, ext)
+
+
+def _write(data: bytes, ext: str) -> str:
+    path = _path_for(content_hash(data), ext)
+    try:
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return path
+
+
+def _scan():
+    """[(mtime, size, path)] aller abgelegten Uploads."""
+    files = []
+    if not os.path.isdir(UPLOAD_DIR):
+        return files
+    for sub in os.scandir(UPLOAD_DIR):
+        if not sub.is_dir():
+            continue
+        for entry in os.scandir(sub.path):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                st = entry.stat()
+                files.append((st.st_mtime, st.st_size, entry.path))
+    return files
+
+
+def prune(quota_bytes=None):
+    """
+    Löscht die am längsten nicht benutzten Uploads, bis UPLOAD_DIR unter der
+    Quota liegt. Rückgabe: (gelöschte Dateien, freigegebene Bytes, verbleibende Bytes).
+    """
+    if quota_bytes is None:
+        quota_bytes = int(UPLOAD_QUOTA_MB * 1024 * 1024)
+    files = _scan()
+    total = sum(size for _, size, _ in files)
+    removed = freed = 0
+    for _, size, path in sorted(files):
+        if total <= quota_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        freed += size
+        removed += 1
+    return removed, freed, total
+
+
+def migrate_legacy(images_dir: str):
+    """
+    Einmalige Migration: verschiebt die alten u<id>.jpg/.png-Uploads aus IMAGES_DIR
+    in die Ablage (unabhängig von UPLOAD_AUDIT, Deko-Bilder bleiben). Das Original
+    wird erst gelöscht, wenn die Kopie geschrieben ist; danach markiert
+    UPLOAD_DIR/.legacy_migrated die Migration als erledigt.
+    Rückgabe: [(alter Pfad, neuer Pfad)], None wenn schon migriert.
+    """
+    marker = os.path.join(UPLOAD_DIR, _LEGACY_MARKER)
+    if os.path.exists(marker):
+        return None
+    moved = []
+    if os.path.isdir(images_dir):
+        for entry in os.scandir(images_dir):
+            if not (entry.is_file() and _LEGACY_RE.match(entry.name)):
+                continue
+            with open(entry.path, "rb") as f:
+                path = _write(f.read(), os.path.splitext(entry.name)[1])
+            os.remove(entry.path)
+            logger.info(f"Moved legacy upload {entry.path} -> {path}")
+            moved.append((entry.path, path))
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    with open(marker, "w", encoding="utf-8") as f:
+        f.write(f"{len(moved)} file(s) from {images_dir}\n")
+    return moved
@@ -1,36 +1,85 @@
-from typing import List, Optional, Set
+import time
+from collections import OrderedDict
+from typing import Optional
 
-def mark_hits(grid:List[List[Optional[int]]], drawn:Set[int]):
-    hit = [[False]*5 for _ in range(5)]
-    for r in range(5):
-        for c in range(5):
+# B-I-N-G-O: Spalte c erlaubt 15*c+1 .. 15*c+15
+COLUMN_RANGES = [(15*c + 1, 15*c + 15) for c in range(5)]
+COLUMN_LETTERS = "BINGO"
+
+def cell_name(r:int, c:int) -> str:
+    """Zellname im Bingo-Stil, z.B. (0,1) -> 'I1'."""
+    return f"{COLUMN_LETTERS[c]}{r+1}"
+
+
+# Zellmengen, die einen Bingo ergeben – Four Corners zählt bei jedem Pattern
+_CORNERS = ((0, 0), (0, 4), (4, 0), (4, 4))
+_ROWS = [tuple((r, c) for c in range(5)) for r in range(5)]
+_COLS = [tuple((r, c) for r in range(5)) for c in range(5)]
+_DIAG = tuple((i, i) for i in range(5))
+_ANTI = tuple((i, 4 - i) for i in range(5))
+_WINNING_LINES = {
+    "standard": _ROWS + _COLS + [_DIAG, _ANTI, _CORNERS],
+    "x": [_DIAG + _ANTI, _CORNERS],
+    "corners": [_CORNERS],
+}
+
+def winning_lines(pattern:str):
+    """Alle Zellmengen, die bei `pattern` gewinnen (unbekanntes Pattern = standard)."""
+    return _WINNING_LINES.get(pattern, _WINNING_LINES["standard"])
+
+def completion_index(grid, order:dict, pattern:str) -> Optional[int]:
+    """
+    Draw-Index, mit dem das Board nach `pattern` erstmals gewinnt – None, wenn es
+    (noch) nicht gewinnt. order = {Zahl: Draw-Index}; FREE-Felder zählen immer.
+    """
+    best = None
+    for line in winning_lines(pattern):
+        done_at = -1
+        for r, c in line:
             v = grid[r][c]
-            if v is None or v in drawn:
-                hit[r][c] = True
-    return hit
-
-def has_bingo_standard(hit)->bool:
-    for r in range(5):
-        if all(hit[r][c] for c in range(5)): return True
-    for c in range(5):
-        if all(hit[r][c] for r in range(5)): return True
-    if all(hit[i][i] for i in range(5)): return True
-    if all(hit[i][4-i] for i in range(5)): return True
-    return False
-
-def has_bingo_corners(hit)->bool:
-    return hit[0][0] and hit[0][4] and hit[4][0] and hit[4][4]
-
-def has_bingo_x(hit)->bool:
-    return all(hit[i][i] for i in range(5)) and all(hit[i][4-i] for i in range(5))
-
-def check_bingo(hit, pattern:str)->bool:
-    # Four Corners ist IMMER ein gültiger Bingo, egal welches Pattern
-    if has_bingo_corners(hit):
-        return True
-    if pattern == 'x':
-        return has_bingo_x(hit)
-    if pattern == 'corners':
-        return has_bingo_corners(hit)
-    # default: Standard-Regelwerk (Zeile, Spalte, Diagonale)
-    return has_bingo_standard(hit)
+            if v is None:
+                continue
+            i = order.get(v)
+            if i is None:
+                break
+            if i > done_at:
+                done_at = i
+        else:
+            if best is None or done_at < best:
+                best = done_at
+    return best
+
+
+class TTLCache:
+    """
+    LRU-Cache mit Ablaufzeit: höchstens maxsize Einträge, jeder gilt ttl Sekunden
+    ab dem letzten set(). Nicht threadsicher – nur aus dem Event-Loop benutzen.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+        if item[0] < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return item[1]
+
+    def set(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def __len__(self):
+        return len(self._data)